@@ -1,92 +1,514 @@
 """The BitAxe integration."""
 from __future__ import annotations
 
-import asyncio
 import logging
-from datetime import timedelta
+import time
+from typing import Any
 
-import aiohttp
+import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.exceptions import HomeAssistantError
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
-from .const import DEFAULT_SCAN_INTERVAL, DOMAIN, PLATFORMS
+from .bulk import async_apply_settings, async_restart
+from .capabilities import async_get_capability_store
+from .ceilings import async_get_ceiling_store
+from .const import (
+    ATTR_FILE,
+    ATTR_GOAL,
+    ATTR_HALT_ON_FAILURE,
+    ATTR_MAX_PARALLEL,
+    ATTR_MAX_TEMP,
+    ATTR_MAX_VR_TEMP,
+    ATTR_MEASURE_TIME,
+    ATTR_SETTINGS,
+    ATTR_SETTLE_TIME,
+    ATTR_SPEED,
+    ATTR_TIMEOUT,
+    ATTR_WAVE_DELAY,
+    ATTR_WAVE_SIZE,
+    ATTR_WWW_FILE,
+    CONF_FLEET,
+    CONF_GOVERNOR,
+    CONF_HISTORY_IMPORT,
+    CONF_POWER_BUDGET,
+    CONF_POWER_BUDGET_ENTITY,
+    CONF_PUSH_UPDATES,
+    DATA_FLEET,
+    DATA_GOVERNORS,
+    DATA_POWER_BUDGET,
+    DATA_SCHEDULER,
+    DEFAULT_FIRMWARE_PARALLEL,
+    DEFAULT_MAX_TEMP,
+    DEFAULT_MAX_VR_TEMP,
+    DEFAULT_MEASURE_TIME,
+    DEFAULT_REPLAY_SPEED,
+    DEFAULT_RESTART_TIMEOUT,
+    DEFAULT_ROLLOUT_PARALLEL,
+    DEFAULT_SETTLE_TIME,
+    DEFAULT_TUNING_PARALLEL,
+    DEFAULT_WAVE_SIZE,
+    DISPLAY_SLEEP_OPTIONS,
+    DOMAIN,
+    FLEET_PLATFORMS,
+    GOAL_EFFICIENCY,
+    GOAL_HASHRATE,
+    PLATFORMS,
+    SERVICE_APPLY_SETTINGS,
+    SERVICE_AUTOTUNE,
+    SERVICE_DUMP_PAYLOADS,
+    SERVICE_IMPORT_DEVICES,
+    SERVICE_REPLAY_PAYLOADS,
+    SERVICE_RESTART,
+    SERVICE_UPDATE_FIRMWARE,
+)
+from .coordinator import (
+    BitAxeDataUpdateCoordinator,
+    async_get_device_coordinators,
+    async_get_target_coordinators,
+)
+from .firmware import async_update_firmware
+from .fleet import BitAxeFleetAggregator
+from .flight_recorder import async_dump_payloads, async_replay_payloads
+from .governor import GOVERNOR, BitAxeThermalGovernor
+from .importer import async_import_devices
+from .power_budget import POWER_BUDGET, BitAxePowerBudgetController
+from .push import BitAxePushListener
+from .rollout import RolloutParameters
+from .scheduler import BitAxeFleetScheduler
+from .snapshot import async_get_snapshot_store
+from .tuning import TuningParameters, async_get_tuner
 
 _LOGGER = logging.getLogger(__name__)
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+IMPORT_DEVICES_SCHEMA = vol.Schema({vol.Required(ATTR_FILE): cv.string})
+DUMP_PAYLOADS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_FILE): cv.string,
+    }
+)
+REPLAY_PAYLOADS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): cv.string,
+        vol.Required(ATTR_FILE): cv.string,
+        vol.Optional(ATTR_SPEED, default=DEFAULT_REPLAY_SPEED): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+    }
+)
+AUTOTUNE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_GOAL, default=GOAL_EFFICIENCY): vol.In(
+            [GOAL_EFFICIENCY, GOAL_HASHRATE]
+        ),
+        vol.Optional(ATTR_SETTLE_TIME, default=DEFAULT_SETTLE_TIME): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+        vol.Optional(ATTR_MEASURE_TIME, default=DEFAULT_MEASURE_TIME): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+        vol.Optional(ATTR_MAX_TEMP, default=DEFAULT_MAX_TEMP): vol.All(
+            vol.Coerce(float), vol.Range(min=30, max=100)
+        ),
+        vol.Optional(ATTR_MAX_VR_TEMP, default=DEFAULT_MAX_VR_TEMP): vol.All(
+            vol.Coerce(float), vol.Range(min=30, max=120)
+        ),
+        vol.Optional(ATTR_MAX_PARALLEL, default=DEFAULT_TUNING_PARALLEL): vol.All(
+            vol.Coerce(int), vol.Range(min=1)
+        ),
+    }
+)
+
+
+def _rollout_fields(max_parallel: int) -> dict[vol.Marker, Any]:
+    """Return the fields of a rolled out service."""
+    return {
+        vol.Optional(ATTR_WAVE_SIZE, default=DEFAULT_WAVE_SIZE): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=100)
+        ),
+        vol.Optional(ATTR_MAX_PARALLEL, default=max_parallel): vol.All(
+            vol.Coerce(int), vol.Range(min=1)
+        ),
+        vol.Optional(ATTR_WAVE_DELAY, default=0): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+        vol.Optional(ATTR_HALT_ON_FAILURE, default=True): cv.boolean,
+    }
+
+
+_FLAG = vol.All(cv.boolean, vol.Coerce(int))
+# Settings a bulk change may write, checked like their entities check them
+SETTINGS_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Optional("frequency"): vol.All(vol.Coerce(int), vol.Range(min=1)),
+            vol.Optional("coreVoltage"): vol.All(vol.Coerce(int), vol.Range(min=1)),
+            vol.Optional("overclockEnabled"): _FLAG,
+            vol.Optional("autofanspeed"): _FLAG,
+            vol.Optional("fanspeed"): vol.All(
+                vol.Coerce(int), vol.Range(min=0, max=100)
+            ),
+            vol.Optional("minFanSpeed"): vol.All(
+                vol.Coerce(int), vol.Range(min=0, max=100)
+            ),
+            vol.Optional("temptarget"): vol.All(
+                vol.Coerce(int), vol.Range(min=30, max=90)
+            ),
+            vol.Optional("rotation"): vol.All(vol.Coerce(int), vol.In([0, 90, 180, 270])),
+            vol.Optional("invertscreen"): _FLAG,
+            vol.Optional("displayTimeout"): vol.All(
+                vol.Coerce(int), vol.In(list(DISPLAY_SLEEP_OPTIONS.values()))
+            ),
+        }
+    ),
+    vol.Length(min=1),
+)
+APPLY_SETTINGS_SCHEMA = vol.Schema(
+    {
+        **cv.TARGET_SERVICE_FIELDS,
+        vol.Required(ATTR_SETTINGS): SETTINGS_SCHEMA,
+        **_rollout_fields(DEFAULT_ROLLOUT_PARALLEL),
+    }
+)
+RESTART_SCHEMA = vol.Schema(
+    {
+        **cv.TARGET_SERVICE_FIELDS,
+        vol.Optional(ATTR_TIMEOUT, default=DEFAULT_RESTART_TIMEOUT): vol.All(
+            vol.Coerce(float), vol.Range(min=10)
+        ),
+        **_rollout_fields(DEFAULT_ROLLOUT_PARALLEL),
+    }
+)
+UPDATE_FIRMWARE_SCHEMA = vol.Schema(
+    {
+        **cv.TARGET_SERVICE_FIELDS,
+        vol.Required(ATTR_FILE): cv.string,
+        vol.Optional(ATTR_WWW_FILE): cv.string,
+        vol.Optional(ATTR_TIMEOUT, default=DEFAULT_RESTART_TIMEOUT): vol.All(
+            vol.Coerce(float), vol.Range(min=10)
+        ),
+        **_rollout_fields(DEFAULT_FIRMWARE_PARALLEL),
+    }
+)
+
+
+def _rollout_parameters(call: ServiceCall) -> RolloutParameters:
+    """Return the rollout fields of a service call."""
+    return RolloutParameters(
+        wave_size=call.data[ATTR_WAVE_SIZE],
+        max_parallel=call.data[ATTR_MAX_PARALLEL],
+        wave_delay=call.data[ATTR_WAVE_DELAY],
+        halt_on_failure=call.data[ATTR_HALT_ON_FAILURE],
+    )
+
+
+@callback
+def _async_power_budget_enabled(hass: HomeAssistant) -> bool:
+    """Return True if the fleet entry runs, or is about to run, a power budget."""
+    return any(
+        entry.data.get(CONF_FLEET)
+        and not entry.disabled_by
+        and bool(
+            entry.options.get(CONF_POWER_BUDGET)
+            or entry.options.get(CONF_POWER_BUDGET_ENTITY)
+        )
+        for entry in hass.config_entries.async_entries(DOMAIN)
+    )
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the fleet aggregates and register the BitAxe services."""
+    hass.data[DATA_FLEET] = BitAxeFleetAggregator(hass)
+
+    async def _async_import_devices(call: ServiceCall) -> ServiceResponse:
+        return await async_import_devices(hass, call.data[ATTR_FILE])
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_DEVICES,
+        _async_import_devices,
+        schema=IMPORT_DEVICES_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def _async_dump_payloads(call: ServiceCall) -> ServiceResponse:
+        return await async_dump_payloads(
+            hass, call.data.get(ATTR_DEVICE_ID), call.data.get(ATTR_FILE)
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_DUMP_PAYLOADS,
+        _async_dump_payloads,
+        schema=DUMP_PAYLOADS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def _async_replay_payloads(call: ServiceCall) -> ServiceResponse:
+        return await async_replay_payloads(
+            hass,
+            call.data[ATTR_DEVICE_ID],
+            call.data[ATTR_FILE],
+            call.data[ATTR_SPEED],
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REPLAY_PAYLOADS,
+        _async_replay_payloads,
+        schema=REPLAY_PAYLOADS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def _async_autotune(call: ServiceCall) -> ServiceResponse:
+        coordinators = async_get_device_coordinators(hass, call.data[ATTR_DEVICE_ID])
+        tuner = await async_get_tuner(hass)
+        return tuner.async_start(
+            coordinators,
+            TuningParameters(
+                goal=call.data[ATTR_GOAL],
+                settle_time=call.data[ATTR_SETTLE_TIME],
+                measure_time=call.data[ATTR_MEASURE_TIME],
+                max_temp=call.data[ATTR_MAX_TEMP],
+                max_vr_temp=call.data[ATTR_MAX_VR_TEMP],
+                max_parallel=call.data[ATTR_MAX_PARALLEL],
+            ),
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_AUTOTUNE,
+        _async_autotune,
+        schema=AUTOTUNE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def _async_apply_settings(call: ServiceCall) -> ServiceResponse:
+        return await async_apply_settings(
+            hass,
+            await async_get_target_coordinators(hass, call),
+            call.data[ATTR_SETTINGS],
+            _rollout_parameters(call),
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_APPLY_SETTINGS,
+        _async_apply_settings,
+        schema=APPLY_SETTINGS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def _async_restart(call: ServiceCall) -> ServiceResponse:
+        return await async_restart(
+            hass,
+            await async_get_target_coordinators(hass, call),
+            _rollout_parameters(call),
+            call.data[ATTR_TIMEOUT],
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RESTART,
+        _async_restart,
+        schema=RESTART_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def _async_update_firmware(call: ServiceCall) -> ServiceResponse:
+        return await async_update_firmware(
+            hass,
+            await async_get_target_coordinators(hass, call),
+            call.data[ATTR_FILE],
+            call.data.get(ATTR_WWW_FILE),
+            _rollout_parameters(call),
+            call.data[ATTR_TIMEOUT],
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_UPDATE_FIRMWARE,
+        _async_update_firmware,
+        schema=UPDATE_FIRMWARE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: config_entries.ConfigEntry) -> bool:
     """Set up BitAxe from a config entry."""
-    ip_address = entry.data["ip_address"]
-
-    coordinator = DataUpdateCoordinator(
-        hass,
-        _LOGGER,
-        name=f"BitAxe ({ip_address})",
-        update_method=lambda: fetch_bitaxe_data(hass, ip_address),
-        update_interval=timedelta(seconds=DEFAULT_SCAN_INTERVAL),
-    )
+    if entry.data.get(CONF_FLEET):
+        await hass.config_entries.async_forward_entry_setups(entry, FLEET_PLATFORMS)
+        ceilings = await async_get_ceiling_store(hass)
+        if entry.options.get(CONF_POWER_BUDGET) or entry.options.get(
+            CONF_POWER_BUDGET_ENTITY
+        ):
+            controller = BitAxePowerBudgetController(
+                hass, entry, await async_get_capability_store(hass), ceilings
+            )
+            controller.async_start()
+            hass.data[DATA_POWER_BUDGET] = controller
+
+            @callback
+            def _async_stop_controller() -> None:
+                controller.async_stop()
+                hass.data.pop(DATA_POWER_BUDGET, None)
+
+            entry.async_on_unload(_async_stop_controller)
+        else:
+            # Turned off: hand back the settings the user chose. Devices that
+            # load later are released as they are set up.
+            for entry_id, coordinator in hass.data.get(DOMAIN, {}).items():
+                ceilings.async_release(entry_id, POWER_BUDGET, coordinator)
+        entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+        return True
+
+    started = time.perf_counter()
+    coordinator = BitAxeDataUpdateCoordinator(hass, entry)
+    snapshots = await async_get_snapshot_store(hass)
+
+    if (snapshot := snapshots.async_get(entry.entry_id)) is not None:
+        # Come up from the last good payload; the live refresh runs behind it
+        coordinator.async_set_snapshot(snapshot)
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"bitaxe first refresh {entry.entry_id}"
+        )
+    else:
+        await coordinator.async_config_entry_first_refresh()
+
+    @callback
+    def _async_save_snapshot() -> None:
+        if (
+            coordinator.last_update_success
+            and not coordinator.stale
+            and not coordinator.replaying
+        ):
+            snapshots.async_set(entry.entry_id, coordinator.async_get_snapshot())
 
-    await coordinator.async_config_entry_first_refresh()
+    entry.async_on_unload(coordinator.async_add_listener(_async_save_snapshot))
+
+    aggregator: BitAxeFleetAggregator = hass.data[DATA_FLEET]
+    entry.async_on_unload(
+        coordinator.async_add_listener(
+            lambda: aggregator.async_update(entry.entry_id, coordinator)
+        )
+    )
+    entry.async_on_unload(lambda: aggregator.async_remove(entry.entry_id))
+    aggregator.async_update(entry.entry_id, coordinator)
 
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
+    if (scheduler := hass.data.get(DATA_SCHEDULER)) is None:
+        scheduler = hass.data[DATA_SCHEDULER] = BitAxeFleetScheduler(hass)
+        scheduler.async_start()
+    scheduler.async_add(entry.entry_id, coordinator)
+
+    if entry.options.get(CONF_PUSH_UPDATES, False):
+        listener = BitAxePushListener(
+            hass,
+            coordinator,
+            on_connection_change=lambda: scheduler.async_reschedule(entry.entry_id),
+        )
+        listener.async_start()
+        entry.async_on_unload(listener.async_stop)
+
+    if (
+        entry.options.get(CONF_HISTORY_IMPORT, True)
+        and "recorder" in hass.config.components
+    ):
+        # Imported here so the recorder is only loaded when it is in use
+        from .history import BitAxeHistoryImporter
+
+        importer = BitAxeHistoryImporter(hass, entry, coordinator)
+        importer.async_start()
+        entry.async_on_unload(importer.async_stop)
+
+    ceilings = await async_get_ceiling_store(hass)
+    if entry.options.get(CONF_GOVERNOR, False):
+        governor = BitAxeThermalGovernor(
+            hass,
+            entry,
+            coordinator,
+            await async_get_capability_store(hass),
+            ceilings,
+        )
+        governor.async_start()
+        governors = hass.data.setdefault(DATA_GOVERNORS, {})
+        governors[entry.entry_id] = governor
+
+        @callback
+        def _async_stop_governor() -> None:
+            governor.async_stop()
+            governors.pop(entry.entry_id, None)
+
+        entry.async_on_unload(_async_stop_governor)
+    else:
+        # Turned off while throttled: hand back the frequency the user set
+        ceilings.async_release(entry.entry_id, GOVERNOR, coordinator)
+    if not _async_power_budget_enabled(hass):
+        # The budget was turned off or removed while this device was not loaded
+        ceilings.async_release(entry.entry_id, POWER_BUDGET, coordinator)
+
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # Entities are subscribed now, so the snapshot covers every key they read
+    _async_save_snapshot()
+    _LOGGER.debug(
+        "Set up %s in %.3f s (from snapshot: %s)",
+        entry.title,
+        time.perf_counter() - started,
+        snapshot is not None,
+    )
     return True
 
 
+async def async_reload_entry(hass: HomeAssistant, entry: config_entries.ConfigEntry) -> None:
+    """Reload a BitAxe config entry after its options changed."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: config_entries.ConfigEntry) -> bool:
     """Unload a BitAxe config entry."""
+    if entry.data.get(CONF_FLEET):
+        return await hass.config_entries.async_unload_platforms(entry, FLEET_PLATFORMS)
+
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        scheduler: BitAxeFleetScheduler = hass.data[DATA_SCHEDULER]
+        scheduler.async_remove(entry.entry_id)
+        coordinator: BitAxeDataUpdateCoordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_shutdown()
         if not hass.data[DOMAIN]:
             hass.data.pop(DOMAIN)
+            scheduler.async_stop()
+            hass.data.pop(DATA_SCHEDULER)
     return unload_ok
 
 
-async def fetch_bitaxe_data(hass: HomeAssistant, ip_address: str) -> dict:
-    """Fetch data from the BitAxe API."""
-    url = f"http://{ip_address}/api/system/info"
-    session = async_get_clientsession(hass)
-    try:
-        async with asyncio.timeout(10):
-            response = await session.get(url)
-            response.raise_for_status()
-            data = await response.json()
-            _LOGGER.debug("Fetched data: %s", data)
-            return data
-    except (aiohttp.ClientError, TimeoutError) as err:
-        _LOGGER.error("Error fetching data from BitAxe API: %s", err)
-        raise UpdateFailed(f"Error communicating with BitAxe: {err}") from err
-
-
-async def post_bitaxe_command(hass: HomeAssistant, ip_address: str, endpoint: str) -> None:
-    """Send a POST command to the BitAxe device."""
-    url = f"http://{ip_address}{endpoint}"
-    session = async_get_clientsession(hass)
-    try:
-        async with asyncio.timeout(10):
-            response = await session.post(url)
-            response.raise_for_status()
-    except (aiohttp.ClientError, TimeoutError) as err:
-        _LOGGER.error("Error sending POST to BitAxe (%s): %s", endpoint, err)
-        raise HomeAssistantError(f"Error communicating with BitAxe: {err}") from err
-
-
-async def patch_bitaxe_system(
-    hass: HomeAssistant, ip_address: str, payload: dict
-) -> None:
-    """Send a PATCH request to update settings on the BitAxe device."""
-    url = f"http://{ip_address}/api/system"
-    session = async_get_clientsession(hass)
-    try:
-        async with asyncio.timeout(10):
-            response = await session.patch(url, json=payload)
-            response.raise_for_status()
-    except (aiohttp.ClientError, TimeoutError) as err:
-        _LOGGER.error("Error sending PATCH to BitAxe: %s", err)
-        raise HomeAssistantError(f"Error communicating with BitAxe: {err}") from err
+async def async_remove_entry(hass: HomeAssistant, entry: config_entries.ConfigEntry) -> None:
+    """Forget the stored state of a removed BitAxe config entry."""
+    if entry.data.get(CONF_FLEET):
+        ceilings = await async_get_ceiling_store(hass)
+        for entry_id, coordinator in hass.data.get(DOMAIN, {}).items():
+            ceilings.async_release(entry_id, POWER_BUDGET, coordinator)
+        return
+    snapshots = await async_get_snapshot_store(hass)
+    snapshots.async_remove(entry.entry_id)
+    ceilings = await async_get_ceiling_store(hass)
+    ceilings.async_remove(entry.entry_id)
+    tuner = await async_get_tuner(hass)
+    tuner.async_remove(entry.entry_id)
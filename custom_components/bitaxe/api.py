@@ -0,0 +1,303 @@
+"""Per-device HTTP client for the BitAxe integration."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterable, Iterable
+from contextlib import AbstractAsyncContextManager
+import heapq
+import itertools
+import logging
+import time
+from typing import Any
+
+import aiohttp
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util.json import JSON_DECODE_EXCEPTIONS, json_loads
+from yarl import URL
+
+from .const import (
+    DISCOVERY_MAX_CONCURRENT,
+    DISCOVERY_TIMEOUT,
+    OTA_TIMEOUT,
+    PROBE_TIMEOUT,
+    REQUEST_TIMEOUT,
+    WS_HEARTBEAT,
+)
+from .instrumentation import (
+    FAILURE_INVALID_PAYLOAD,
+    FlightRecorder,
+    PollStats,
+    failure_kind,
+)
+from .models import SystemInfo
+
+_LOGGER = logging.getLogger(__name__)
+
+# Lower value = served first
+PRIORITY_WRITE = 0
+PRIORITY_POLL = 1
+
+
+class BitaxeConnectionError(HomeAssistantError):
+    """Error raised when the BitAxe device cannot be reached."""
+
+
+class BitaxeNotSupportedError(BitaxeConnectionError):
+    """Error raised when the firmware does not provide an endpoint."""
+
+
+class _PriorityLock:
+    """Mutex that hands itself to the waiter with the lowest priority value.
+
+    Waiters of equal priority are served in arrival order.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the lock."""
+        self._locked = False
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._counter = itertools.count()
+
+    async def acquire(self, priority: int) -> None:
+        """Wait until the lock is handed to this caller."""
+        if not self._locked and not self._waiters:
+            self._locked = True
+            return
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The lock may have been handed over just before cancellation
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Hand the lock to the next live waiter, or unlock it."""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._locked = False
+
+
+class BitaxeClient:
+    """Talk to one BitAxe device over Home Assistant's shared HTTP session.
+
+    The ESP32 web server handles concurrent connections poorly, so requests
+    to the device are serialized, which keeps at most one request connection
+    open to it, and user-initiated writes jump ahead of queued polls. System
+    info polls are instrumented in `stats`, and their raw responses kept in
+    `flight_recorder`.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, host: str) -> None:
+        """Initialize the client."""
+        self.host = host
+        self.stats = PollStats()
+        self.flight_recorder = FlightRecorder()
+        self._lock = _PriorityLock()
+        self._session = session
+
+    def ws_connect(
+        self,
+    ) -> AbstractAsyncContextManager[aiohttp.ClientWebSocketResponse]:
+        """Open the AxeOS WebSocket.
+
+        The socket is not serialized with requests, so it never holds them up.
+        """
+        return self._session.ws_connect(
+            f"http://{self.host}/api/ws", heartbeat=WS_HEARTBEAT
+        )
+
+    async def _async_request(
+        self,
+        method: str,
+        path: str,
+        priority: int,
+        timeout: float = REQUEST_TIMEOUT,
+        stats: PollStats | None = None,
+        **kwargs: Any,
+    ) -> bytes:
+        """Send one request to the device and return the response body.
+
+        Failed polls are left to the caller to log, which rate-limits them.
+        With `stats`, the latency, size or failure of the request is recorded.
+        """
+        url = f"http://{self.host}{path}"
+        await self._lock.acquire(priority)
+        started = time.monotonic()
+        try:
+            async with asyncio.timeout(timeout):
+                async with self._session.request(
+                    method, url, **kwargs
+                ) as response:
+                    response.raise_for_status()
+                    body = await response.read()
+            if stats is not None:
+                stats.record_response(time.monotonic() - started, len(body))
+            return body
+        except (aiohttp.ClientError, TimeoutError) as err:
+            if stats is not None:
+                stats.record_failure(failure_kind(err))
+            if isinstance(err, aiohttp.ClientResponseError) and err.status == 404:
+                raise BitaxeNotSupportedError(
+                    f"BitAxe firmware does not support {path}"
+                ) from err
+            if priority != PRIORITY_POLL:
+                _LOGGER.error("Error sending %s %s to BitAxe: %s", method, path, err)
+            raise BitaxeConnectionError(
+                f"Error communicating with BitAxe: {err!r}"
+            ) from err
+        finally:
+            self._lock.release()
+
+    async def async_probe(self) -> bool:
+        """Return True if the device accepts a TCP connection."""
+        url = URL(f"http://{self.host}")
+        try:
+            async with asyncio.timeout(PROBE_TIMEOUT):
+                _, writer = await asyncio.open_connection(url.host, url.port)
+        except (OSError, TimeoutError):
+            return False
+        writer.close()
+        return True
+
+    async def async_get_system_info(
+        self, timeout: float = REQUEST_TIMEOUT
+    ) -> SystemInfo:
+        """Fetch the system info fields the integration uses."""
+        stats = self.stats
+        try:
+            body = await self._async_request(
+                "GET", "/api/system/info", PRIORITY_POLL, timeout, stats
+            )
+        except BitaxeConnectionError as err:
+            self.flight_recorder.record_failure(str(err))
+            raise
+        self.flight_recorder.record(stats.last_latency or 0.0, body)
+        started = time.perf_counter()
+        try:
+            data = SystemInfo.from_json(body)
+        except JSON_DECODE_EXCEPTIONS as err:
+            stats.record_failure(FAILURE_INVALID_PAYLOAD)
+            raise BitaxeConnectionError(f"Invalid system info payload: {err}") from err
+        stats.record_parse(time.perf_counter() - started)
+        _LOGGER.debug(
+            "Fetched %d bytes from %s in %.3f s (parsed in %.3f ms): %s",
+            stats.last_payload_bytes,
+            self.host,
+            stats.last_latency,
+            stats.last_parse_time * 1000,
+            data,
+        )
+        return data
+
+    async def _async_get_json(self, path: str, **kwargs: Any) -> dict[str, Any]:
+        """Fetch a JSON object from a read-only endpoint."""
+        body = await self._async_request("GET", path, PRIORITY_POLL, **kwargs)
+        try:
+            data = json_loads(body)
+        except JSON_DECODE_EXCEPTIONS as err:
+            raise BitaxeConnectionError(f"Invalid payload from {path}: {err}") from err
+        if not isinstance(data, dict):
+            raise BitaxeConnectionError(f"Invalid payload from {path}")
+        return data
+
+    async def async_get_statistics(self, columns: Iterable[str]) -> dict[str, Any]:
+        """Fetch the history the firmware keeps of some telemetry columns.
+
+        Raises BitaxeNotSupportedError on firmware without a history.
+        """
+        return await self._async_get_json(
+            "/api/system/statistics", params={"columns": ",".join(columns)}
+        )
+
+    async def async_get_asic_info(self) -> dict[str, Any]:
+        """Fetch the ASIC capabilities, such as the supported frequencies.
+
+        Raises BitaxeNotSupportedError on firmware without the endpoint.
+        """
+        return await self._async_get_json("/api/system/asic")
+
+    async def async_post_command(self, endpoint: str) -> None:
+        """Send a POST command such as restart or identify."""
+        await self._async_request("POST", endpoint, PRIORITY_WRITE)
+
+    async def async_upload_ota(
+        self, endpoint: str, chunks: AsyncIterable[bytes | memoryview], size: int
+    ) -> None:
+        """Stream a firmware or web UI image to an OTA endpoint.
+
+        The body is sent as it is read, so the image is never copied into
+        one buffer. Uploading the firmware makes the device reboot.
+        """
+        await self._async_request(
+            "POST",
+            endpoint,
+            PRIORITY_WRITE,
+            OTA_TIMEOUT,
+            data=chunks,
+            headers={
+                "Content-Type": "application/octet-stream",
+                "Content-Length": str(size),
+            },
+        )
+
+    async def async_patch_system(
+        self, payload: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        """Update settings on the device.
+
+        Returns the settings echoed back by the firmware, if any.
+        """
+        body = await self._async_request(
+            "PATCH", "/api/system", PRIORITY_WRITE, json=payload
+        )
+        if not body:
+            return None
+        try:
+            echo = json_loads(body)
+        except JSON_DECODE_EXCEPTIONS:
+            return None
+        return echo if isinstance(echo, dict) else None
+
+
+async def async_fetch_device_info(
+    session: aiohttp.ClientSession, host: str, timeout: float = REQUEST_TIMEOUT
+) -> SystemInfo | None:
+    """Return the system info of a host, or None if it is not a BitAxe.
+
+    Used before a device has a client of its own, so no error is logged.
+    """
+    try:
+        async with asyncio.timeout(timeout):
+            async with session.get(f"http://{host}/api/system/info") as response:
+                response.raise_for_status()
+                body = await response.read()
+        data = json_loads(body)
+    except (aiohttp.ClientError, TimeoutError, *JSON_DECODE_EXCEPTIONS):
+        return None
+    if not isinstance(data, dict) or "ASICModel" not in data:
+        return None
+    return SystemInfo.from_dict(data)
+
+
+async def async_discover_devices(
+    session: aiohttp.ClientSession,
+    hosts: Iterable[str],
+    timeout: float = DISCOVERY_TIMEOUT,
+    max_concurrent: int = DISCOVERY_MAX_CONCURRENT,
+) -> dict[str, SystemInfo]:
+    """Probe hosts concurrently and return the BitAxe devices that answered."""
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def _async_probe(host: str) -> tuple[str, SystemInfo | None]:
+        async with semaphore:
+            return host, await async_fetch_device_info(session, host, timeout)
+
+    results = await asyncio.gather(*(_async_probe(host) for host in hosts))
+    return {host: info for host, info in results if info is not None}
@@ -0,0 +1,85 @@
+"""Settings changes and restarts of many BitAxe devices at once."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .capabilities import (
+    BitAxeCapabilityStore,
+    async_get_capability_store,
+    fallback_capabilities,
+    option_value,
+)
+from .const import RESTART_ENDPOINT
+from .coordinator import BitAxeDataUpdateCoordinator
+from .rollout import (
+    RolloutError,
+    RolloutParameters,
+    async_rollout,
+    async_wait_for_reboot,
+)
+
+
+def _check_supported(
+    coordinator: BitAxeDataUpdateCoordinator,
+    settings: dict[str, Any],
+    capabilities: BitAxeCapabilityStore,
+) -> None:
+    """Refuse a frequency or core voltage the device's ASIC does not offer.
+
+    Devices with overclocking enabled accept any value, like in AxeOS.
+    """
+    data = coordinator.data
+    assert data is not None
+    if data.get("overclockEnabled") or settings.get("overclockEnabled"):
+        return
+    model = data.get("ASICModel")
+    supported = capabilities.async_get_cached(
+        model, data.get("version")
+    ) or fallback_capabilities(model)
+    for key, options, unit in (
+        ("frequency", supported.frequency, "MHz"),
+        ("coreVoltage", supported.voltage, "mV"),
+    ):
+        if key in settings and settings[key] not in map(option_value, options):
+            raise RolloutError(f"{model} does not support {settings[key]} {unit}")
+
+
+async def async_apply_settings(
+    hass: HomeAssistant,
+    coordinators: dict[str, BitAxeDataUpdateCoordinator],
+    settings: dict[str, Any],
+    parameters: RolloutParameters,
+) -> dict[str, Any]:
+    """Write the same settings to devices, one PATCH per device."""
+    capabilities = await async_get_capability_store(hass)
+
+    async def _async_apply(
+        entry_id: str, coordinator: BitAxeDataUpdateCoordinator
+    ) -> None:
+        _check_supported(coordinator, settings, capabilities)
+        await coordinator.async_write(settings)
+
+    return await async_rollout(
+        hass, coordinators, _async_apply, parameters, "Applying settings"
+    )
+
+
+async def async_restart(
+    hass: HomeAssistant,
+    coordinators: dict[str, BitAxeDataUpdateCoordinator],
+    parameters: RolloutParameters,
+    timeout: float,
+) -> dict[str, Any]:
+    """Restart devices, each wave only once the previous one is back online."""
+
+    async def _async_restart(
+        entry_id: str, coordinator: BitAxeDataUpdateCoordinator
+    ) -> None:
+        assert coordinator.data is not None
+        uptime = coordinator.data.get_number("uptimeSeconds")
+        await coordinator.client.async_post_command(RESTART_ENDPOINT)
+        await async_wait_for_reboot(coordinator, uptime, timeout)
+
+    return await async_rollout(hass, coordinators, _async_restart, parameters, "Restart")
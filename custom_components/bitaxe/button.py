@@ -8,7 +8,7 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN
+from .const import DOMAIN, TIER_CONFIG
 from .entity import BitAxeEntity
 
 
@@ -53,6 +53,7 @@ class BitAxeButton(BitAxeEntity, ButtonEntity):
     """Representation of a BitAxe button."""
 
     entity_description: BitAxeButtonEntityDescription
+    _refresh_tier = TIER_CONFIG
 
     def __init__(
         self,
@@ -61,16 +62,13 @@ class BitAxeButton(BitAxeEntity, ButtonEntity):
         entry: ConfigEntry,
     ) -> None:
         """Initialize the button."""
-        super().__init__(coordinator, entry)
+        super().__init__(coordinator, entry, ())
         self.entity_description = description
         self._attr_unique_id = f"{entry.entry_id}_{description.key}"
 
     async def async_press(self) -> None:
         """Handle the button press."""
-        from . import post_bitaxe_command
-
-        ip_address = self._entry.data["ip_address"]
-        await post_bitaxe_command(
-            self.hass, ip_address, self.entity_description.endpoint
+        await self.coordinator.client.async_post_command(
+            self.entity_description.endpoint
         )
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_request_config_refresh()
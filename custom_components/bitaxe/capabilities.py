@@ -0,0 +1,149 @@
+"""ASIC capabilities of BitAxe devices, cached per model and firmware."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, NamedTuple
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .api import BitaxeClient, BitaxeConnectionError, BitaxeNotSupportedError
+from .const import (
+    ASIC_FREQUENCY,
+    ASIC_VOLTAGE,
+    CAPABILITIES_SAVE_DELAY,
+    CAPABILITIES_STORAGE_VERSION,
+    DATA_CAPABILITIES,
+    DOMAIN,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Model of the fallback tables used when the model is unknown as well
+_FALLBACK_MODEL = "BM1370"
+
+
+class AsicCapabilities(NamedTuple):
+    """Settings an ASIC model supports."""
+
+    frequency: list[str]
+    voltage: list[str]
+
+
+def _options(values: Any) -> list[str] | None:
+    """Return the select options of a list of numbers from the device."""
+    if not isinstance(values, list) or not values:
+        return None
+    if not all(
+        isinstance(value, (int, float)) and not isinstance(value, bool)
+        for value in values
+    ):
+        return None
+    return [f"{value:g}" for value in values]
+
+
+def option_value(option: str) -> int | float:
+    """Return the API value of a frequency or voltage option."""
+    number = float(option)
+    return int(number) if number.is_integer() else number
+
+
+def fallback_capabilities(model: str | None) -> AsicCapabilities:
+    """Return the capabilities of a model from the built-in tables."""
+    if model not in ASIC_FREQUENCY or model not in ASIC_VOLTAGE:
+        model = _FALLBACK_MODEL
+    return AsicCapabilities(list(ASIC_FREQUENCY[model]), list(ASIC_VOLTAGE[model]))
+
+
+class BitAxeCapabilityStore:
+    """Cache the ASIC capabilities reported by /api/system/asic on disk.
+
+    Entries are keyed by ASIC model and firmware version, so a fleet of
+    identical miners costs one request per firmware release, once. Firmware
+    without the endpoint is remembered too and served from the built-in
+    tables. Concurrent lookups of the same key share one request.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the capability store."""
+        self._store: Store[dict[str, dict[str, list[str]] | None]] = Store(
+            hass, CAPABILITIES_STORAGE_VERSION, f"{DOMAIN}.capabilities"
+        )
+        self._capabilities: dict[str, dict[str, list[str]] | None] = {}
+        self._pending: dict[str, asyncio.Future[AsicCapabilities]] = {}
+        self.hass = hass
+
+    async def async_load(self) -> BitAxeCapabilityStore:
+        """Load the cached capabilities from disk."""
+        self._capabilities = await self._store.async_load() or {}
+        return self
+
+    @callback
+    def async_get_cached(
+        self, model: str | None, version: str | None
+    ) -> AsicCapabilities | None:
+        """Return the cached capabilities of a firmware, if it was seen."""
+        key = f"{model}|{version}"
+        if key not in self._capabilities:
+            return None
+        if (cached := self._capabilities[key]) is None:
+            return fallback_capabilities(model)
+        return AsicCapabilities(cached["frequency"], cached["voltage"])
+
+    async def async_get(
+        self, client: BitaxeClient, model: str | None, version: str | None
+    ) -> AsicCapabilities:
+        """Return the capabilities of a firmware, asking the device if needed."""
+        if model is None or version is None:
+            return fallback_capabilities(model)
+        if (cached := self.async_get_cached(model, version)) is not None:
+            return cached
+
+        key = f"{model}|{version}"
+        if (future := self._pending.get(key)) is None:
+            future = self._pending[key] = self.hass.async_create_task(
+                self._async_fetch(client, key, model), f"bitaxe capabilities {key}"
+            )
+            future.add_done_callback(lambda _: self._pending.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def _async_fetch(
+        self, client: BitaxeClient, key: str, model: str
+    ) -> AsicCapabilities:
+        """Ask a device for its capabilities and cache the answer."""
+        try:
+            data = await client.async_get_asic_info()
+        except BitaxeNotSupportedError:
+            _LOGGER.debug("Firmware %s has no ASIC capabilities endpoint", key)
+            self._async_save(key, None)
+            return fallback_capabilities(model)
+        except BitaxeConnectionError as err:
+            # Not cached, so the next setup asks again
+            _LOGGER.debug("Error fetching ASIC capabilities of %s: %s", key, err)
+            return fallback_capabilities(model)
+
+        fallback = fallback_capabilities(model)
+        capabilities = AsicCapabilities(
+            _options(data.get("frequencyOptions")) or fallback.frequency,
+            _options(data.get("voltageOptions")) or fallback.voltage,
+        )
+        self._async_save(key, capabilities._asdict())
+        return capabilities
+
+    @callback
+    def _async_save(self, key: str, value: dict[str, list[str]] | None) -> None:
+        """Remember the capabilities of a firmware."""
+        self._capabilities[key] = value
+        self._store.async_delay_save(
+            lambda: self._capabilities, CAPABILITIES_SAVE_DELAY
+        )
+
+
+async def async_get_capability_store(hass: HomeAssistant) -> BitAxeCapabilityStore:
+    """Return the capability store, loading it on first use."""
+    if (task := hass.data.get(DATA_CAPABILITIES)) is None:
+        task = hass.data[DATA_CAPABILITIES] = hass.async_create_task(
+            BitAxeCapabilityStore(hass).async_load()
+        )
+    return await asyncio.shield(task)
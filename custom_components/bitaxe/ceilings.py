@@ -0,0 +1,211 @@
+"""Settings the user chose for devices whose settings the controllers lowered."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, NamedTuple
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .api import BitaxeConnectionError
+from .const import CEILINGS_SAVE_DELAY, CEILINGS_STORAGE_VERSION, DATA_CEILINGS, DOMAIN
+from .coordinator import BitAxeDataUpdateCoordinator
+from .models import SystemInfo
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def settings_match(data: SystemInfo | None, settings: dict[str, float]) -> bool:
+    """Return True if a payload reports all of the given settings."""
+    return data is not None and all(
+        data.get_number(key) == value for key, value in settings.items()
+    )
+
+
+async def async_write_settings(
+    coordinator: BitAxeDataUpdateCoordinator, settings: dict[str, Any], owner: str
+) -> bool:
+    """Write settings on behalf of a controller; return False if it failed."""
+    # Settings read back from a payload are floats; the API takes integers
+    settings = {
+        key: int(value) if isinstance(value, float) and value.is_integer() else value
+        for key, value in settings.items()
+    }
+    try:
+        await coordinator.async_write(settings)
+    except BitaxeConnectionError as err:
+        _LOGGER.warning(
+            "Error applying %s to BitAxe %s for the %s: %s",
+            settings,
+            coordinator.client.host,
+            owner,
+            err,
+        )
+        return False
+    return True
+
+
+class Ceiling(NamedTuple):
+    """The settings a controller may run a device at."""
+
+    # What the user chose
+    user: dict[str, float]
+    # What the user chose, lowered where the other controllers hold it
+    limit: dict[str, float]
+
+
+class BitAxeCeilingStore:
+    """Remember the settings of devices the controllers moved away from them.
+
+    The thermal governor and the power budget both lower the settings of a
+    device, and each must tell its own and the other's writes apart from a
+    change by the user. They share one record per device: the user's
+    settings, what each controller holds the device at and what the device
+    runs as a result. Settings that differ from the latter were changed by
+    the user and become the new ceiling. Keeping the records on disk means a
+    device that is throttled when Home Assistant restarts is not mistaken
+    for one the user throttled, and the user's settings can be written back
+    once the controllers are turned off.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the store."""
+        self._store: Store[dict[str, dict[str, Any]]] = Store(
+            hass, CEILINGS_STORAGE_VERSION, f"{DOMAIN}.ceilings"
+        )
+        self._states: dict[str, dict[str, Any]] = {}
+
+    async def async_load(self) -> BitAxeCeilingStore:
+        """Load the saved records from disk."""
+        self._states = await self._store.async_load() or {}
+        return self
+
+    @callback
+    def async_get(self, entry_id: str) -> dict[str, Any] | None:
+        """Return the record of a device, if a controller holds it."""
+        return self._states.get(entry_id)
+
+    @callback
+    def async_observe(
+        self, entry_id: str, data: SystemInfo, owner: str
+    ) -> Ceiling | None:
+        """Return what a controller may run a device at, given its payload.
+
+        A device that no longer runs what the controllers left it at was
+        changed by the user; its record is dropped and the settings it runs
+        become the ceiling. None is returned if the payload lacks them.
+        """
+        current = _current_settings(data)
+        if current is None:
+            return None
+        state = self._states.get(entry_id)
+        if state is not None and not settings_match(data, state["running"]):
+            self.async_remove(entry_id)
+            state = None
+        if state is None:
+            return Ceiling(current, current)
+        return Ceiling(state["ceiling"], self._limit(state, owner))
+
+    @callback
+    def async_hold(
+        self,
+        entry_id: str,
+        owner: str,
+        data: SystemInfo | None,
+        settings: dict[str, float],
+    ) -> None:
+        """Record the settings a controller is about to write to a device.
+
+        Call right before the write, so the optimistic update it causes is
+        not taken for a change by the user. A hold at the limit of the
+        controller is no hold, and a device no controller holds is forgotten.
+        """
+        if (state := self._states.get(entry_id)) is None:
+            if data is None or (current := _current_settings(data)) is None:
+                return
+            state = self._states[entry_id] = {
+                "ceiling": current,
+                "running": dict(current),
+                "holds": {},
+            }
+        state["running"] = {**state["running"], **settings}
+        limit = self._limit(state, owner)
+        if all(limit[key] == value for key, value in settings.items()):
+            state["holds"].pop(owner, None)
+        else:
+            state["holds"][owner] = settings
+        if not state["holds"] and state["running"] == state["ceiling"]:
+            del self._states[entry_id]
+        self._async_save()
+
+    @callback
+    def async_remove(self, entry_id: str) -> None:
+        """Forget a device."""
+        if self._states.pop(entry_id, None) is not None:
+            self._async_save()
+
+    @callback
+    def async_release(
+        self, entry_id: str, owner: str, coordinator: BitAxeDataUpdateCoordinator
+    ) -> None:
+        """Drop the hold of a controller that stopped on a device.
+
+        The device gets the user's settings back, or the ones the other
+        controller holds it at. Nothing is written if the device no longer
+        runs what the controllers left it at, since the user changed it since.
+        """
+        state = self._states.get(entry_id)
+        if state is None or owner not in state["holds"]:
+            return
+        del state["holds"][owner]
+        if not settings_match(coordinator.data, state["running"]):
+            self.async_remove(entry_id)
+            return
+        target = self._limit(state, owner)
+        settings = {
+            key: value
+            for key, value in target.items()
+            if state["running"].get(key) != value
+        }
+        state["running"] = target
+        if not state["holds"]:
+            del self._states[entry_id]
+        self._async_save()
+        if settings:
+            coordinator.hass.async_create_background_task(
+                async_write_settings(coordinator, settings, owner.replace("_", " ")),
+                f"bitaxe {owner} release {entry_id}",
+            )
+
+    @staticmethod
+    def _limit(state: dict[str, Any], owner: str) -> dict[str, float]:
+        """Return the user's settings with the holds of the other controllers."""
+        limit = dict(state["ceiling"])
+        for holder, held in state["holds"].items():
+            if holder != owner:
+                limit.update(held)
+        return limit
+
+    @callback
+    def _async_save(self) -> None:
+        """Save the records after a delay."""
+        self._store.async_delay_save(lambda: self._states, CEILINGS_SAVE_DELAY)
+
+
+def _current_settings(data: SystemInfo) -> dict[str, float] | None:
+    """Return the settings of a payload that the controllers change."""
+    frequency = data.get_number("frequency")
+    voltage = data.get_number("coreVoltage")
+    if frequency is None or voltage is None:
+        return None
+    return {"frequency": frequency, "coreVoltage": voltage}
+
+
+async def async_get_ceiling_store(hass: HomeAssistant) -> BitAxeCeilingStore:
+    """Return the ceiling store, loading it on first use."""
+    if (task := hass.data.get(DATA_CEILINGS)) is None:
+        task = hass.data[DATA_CEILINGS] = hass.async_create_task(
+            BitAxeCeilingStore(hass).async_load()
+        )
+    return await asyncio.shield(task)
@@ -1,16 +1,46 @@
 """Config flow for the BitAxe integration."""
 from __future__ import annotations
 
-import asyncio
 import ipaddress
 
-import aiohttp
 import voluptuous as vol
 from homeassistant import config_entries
+from homeassistant.components import network
 from homeassistant.core import callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv, selector
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .const import DOMAIN
+from .api import async_discover_devices, async_fetch_device_info
+from .const import (
+    CONF_DEADBAND,
+    CONF_DEVICES,
+    CONF_FLEET,
+    CONF_GOVERNOR,
+    CONF_GOVERNOR_HYSTERESIS,
+    CONF_GOVERNOR_MAX_TEMP,
+    CONF_GOVERNOR_MAX_VR_TEMP,
+    CONF_HISTORY_IMPORT,
+    CONF_MAX_AGE,
+    CONF_NETWORK,
+    CONF_POWER_BUDGET,
+    CONF_POWER_BUDGET_ENTITY,
+    CONF_PUSH_UPDATES,
+    CONF_SCAN_INTERVAL,
+    DEFAULT_GOVERNOR_HYSTERESIS,
+    DEFAULT_MAX_AGE,
+    DEFAULT_MAX_TEMP,
+    DEFAULT_MAX_VR_TEMP,
+    DEFAULT_SCAN_INTERVAL,
+    DISCOVERY_MAX_HOSTS,
+    DOMAIN,
+    FLEET_UNIQUE_ID,
+    MIN_SCAN_INTERVAL,
+)
+from .coordinator import BitAxeDataUpdateCoordinator
+from .models import SystemInfo
+from .push import async_probe_push_fields
+from .sensor import SENSOR_DESCRIPTIONS
 
 
 class BitAxeConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -18,8 +48,18 @@ class BitAxeConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    def __init__(self) -> None:
+        """Initialize the config flow."""
+        self._discovered: dict[str, SystemInfo] = {}
+
     async def async_step_user(self, user_input=None):
-        """Handle the initial step."""
+        """Let the user add one device by address or scan a network."""
+        return self.async_show_menu(
+            step_id="user", menu_options=["manual", "scan", "fleet"]
+        )
+
+    async def async_step_manual(self, user_input=None):
+        """Handle a device entered by IP address."""
         errors = {}
 
         if user_input is not None:
@@ -32,21 +72,17 @@ class BitAxeConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             except ValueError:
                 errors["base"] = "invalid_ip"
                 return self.async_show_form(
-                    step_id="user",
+                    step_id="manual",
                     data_schema=self._get_data_schema(),
                     errors=errors,
                 )
 
             # Test connection to the device
             session = async_get_clientsession(self.hass)
-            try:
-                async with asyncio.timeout(10):
-                    resp = await session.get(f"http://{ip_address}/api/system/info")
-                    resp.raise_for_status()
-            except (aiohttp.ClientError, TimeoutError):
+            if await async_fetch_device_info(session, ip_address) is None:
                 errors["base"] = "cannot_connect"
                 return self.async_show_form(
-                    step_id="user",
+                    step_id="manual",
                     data_schema=self._get_data_schema(),
                     errors=errors,
                 )
@@ -61,11 +97,114 @@ class BitAxeConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             )
 
         return self.async_show_form(
-            step_id="user",
+            step_id="manual",
             data_schema=self._get_data_schema(),
             errors=errors,
         )
 
+    async def async_step_scan(self, user_input=None):
+        """Scan a network range for devices."""
+        errors = {}
+
+        if user_input is not None:
+            try:
+                network = ipaddress.ip_network(user_input[CONF_NETWORK], strict=False)
+            except ValueError:
+                errors["base"] = "invalid_network"
+            else:
+                if network.num_addresses > DISCOVERY_MAX_HOSTS:
+                    errors["base"] = "network_too_large"
+                else:
+                    configured = self._async_current_ids(include_ignore=False)
+                    hosts = [
+                        str(host)
+                        for host in network.hosts()
+                        if str(host) not in configured
+                    ]
+                    self._discovered = await async_discover_devices(
+                        async_get_clientsession(self.hass), hosts
+                    )
+                    if not self._discovered:
+                        return self.async_abort(reason="no_devices_found")
+                    return await self.async_step_select()
+        else:
+            user_input = {CONF_NETWORK: await self._async_default_network()}
+
+        return self.async_show_form(
+            step_id="scan",
+            data_schema=vol.Schema({
+                vol.Required(CONF_NETWORK, default=user_input[CONF_NETWORK]): str,
+            }),
+            errors=errors,
+            description_placeholders={"max_hosts": str(DISCOVERY_MAX_HOSTS)},
+        )
+
+    async def async_step_select(self, user_input=None):
+        """Add the discovered devices the user picked."""
+        if user_input is not None:
+            for ip_address in user_input[CONF_DEVICES]:
+                info = self._discovered[ip_address]
+                self.hass.async_create_task(
+                    self.hass.config_entries.flow.async_init(
+                        DOMAIN,
+                        context={"source": config_entries.SOURCE_IMPORT},
+                        data={
+                            "ip_address": ip_address,
+                            "device_name": info.get("hostname", ip_address),
+                        },
+                    )
+                )
+            return self.async_abort(
+                reason="devices_added",
+                description_placeholders={"count": str(len(user_input[CONF_DEVICES]))},
+            )
+
+        devices = {
+            ip_address: (
+                f"{info.get('hostname', ip_address)} "
+                f"({info.get('ASICModel', 'unknown')}, {ip_address})"
+            )
+            for ip_address, info in sorted(
+                self._discovered.items(),
+                key=lambda item: ipaddress.ip_address(item[0]),
+            )
+        }
+        return self.async_show_form(
+            step_id="select",
+            data_schema=vol.Schema({
+                vol.Required(CONF_DEVICES, default=list(devices)): cv.multi_select(
+                    devices
+                ),
+            }),
+            description_placeholders={"count": str(len(devices))},
+        )
+
+    async def async_step_fleet(self, user_input=None):
+        """Add the entry that holds the fleet-wide sensors."""
+        await self.async_set_unique_id(FLEET_UNIQUE_ID)
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(title="BitAxe Fleet", data={CONF_FLEET: True})
+
+    async def async_step_import(self, import_data):
+        """Create an entry for a device that was already validated."""
+        await self.async_set_unique_id(import_data["ip_address"])
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(
+            title=import_data["device_name"],
+            data={
+                "ip_address": import_data["ip_address"],
+                "device_name": import_data["device_name"],
+            },
+        )
+
+    async def _async_default_network(self) -> str:
+        """Suggest the /24 that Home Assistant itself is on."""
+        try:
+            source_ip = await network.async_get_source_ip(self.hass)
+        except HomeAssistantError:
+            return ""
+        return str(ipaddress.ip_network(f"{source_ip}/24", strict=False))
+
     @staticmethod
     def _get_data_schema():
         """Return the schema for user input."""
@@ -90,4 +229,97 @@ class BitAxeOptionsFlowHandler(config_entries.OptionsFlow):
 
     async def async_step_init(self, user_input=None):
         """Manage the options."""
-        return self.async_show_form(step_id="init")
+        if self.config_entry.data.get(CONF_FLEET):
+            return await self.async_step_fleet()
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        schema = {
+            vol.Optional(
+                CONF_SCAN_INTERVAL,
+                default=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+            ): vol.All(vol.Coerce(int), vol.Range(min=MIN_SCAN_INTERVAL)),
+        }
+        if options.get(CONF_PUSH_UPDATES, False) or await self._async_push_supported():
+            schema[
+                vol.Optional(
+                    CONF_PUSH_UPDATES,
+                    default=options.get(CONF_PUSH_UPDATES, False),
+                )
+            ] = bool
+        schema |= {
+            vol.Optional(
+                CONF_HISTORY_IMPORT,
+                default=options.get(CONF_HISTORY_IMPORT, True),
+            ): bool,
+            vol.Optional(
+                CONF_MAX_AGE,
+                default=options.get(CONF_MAX_AGE, DEFAULT_MAX_AGE),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+            vol.Optional(
+                CONF_GOVERNOR,
+                default=options.get(CONF_GOVERNOR, False),
+            ): bool,
+            vol.Optional(
+                CONF_GOVERNOR_MAX_TEMP,
+                default=options.get(CONF_GOVERNOR_MAX_TEMP, DEFAULT_MAX_TEMP),
+            ): vol.All(vol.Coerce(float), vol.Range(min=30, max=100)),
+            vol.Optional(
+                CONF_GOVERNOR_MAX_VR_TEMP,
+                default=options.get(CONF_GOVERNOR_MAX_VR_TEMP, DEFAULT_MAX_VR_TEMP),
+            ): vol.All(vol.Coerce(float), vol.Range(min=30, max=120)),
+            vol.Optional(
+                CONF_GOVERNOR_HYSTERESIS,
+                default=options.get(
+                    CONF_GOVERNOR_HYSTERESIS, DEFAULT_GOVERNOR_HYSTERESIS
+                ),
+            ): vol.All(vol.Coerce(float), vol.Range(min=1, max=20)),
+        }
+        for description in SENSOR_DESCRIPTIONS:
+            if description.deadband is None:
+                continue
+            key = f"{CONF_DEADBAND}_{description.key}"
+            schema[
+                vol.Optional(key, default=options.get(key, description.deadband))
+            ] = vol.All(vol.Coerce(float), vol.Range(min=0))
+        return self.async_show_form(step_id="init", data_schema=vol.Schema(schema))
+
+    async def _async_push_supported(self) -> bool:
+        """Return True if the device's firmware streams field updates."""
+        coordinator: BitAxeDataUpdateCoordinator | None = self.hass.data.get(
+            DOMAIN, {}
+        ).get(self.config_entry.entry_id)
+        if coordinator is None:
+            return False
+        if coordinator.push_supported is None:
+            coordinator.push_supported = await async_probe_push_fields(
+                coordinator.client
+            )
+        return coordinator.push_supported
+
+    async def async_step_fleet(self, user_input=None):
+        """Manage the power budget of the fleet."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="fleet",
+            data_schema=vol.Schema({
+                vol.Optional(
+                    CONF_POWER_BUDGET,
+                    default=options.get(CONF_POWER_BUDGET, 0),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_POWER_BUDGET_ENTITY,
+                    description={
+                        "suggested_value": options.get(CONF_POWER_BUDGET_ENTITY)
+                    },
+                ): selector.EntitySelector(
+                    selector.EntitySelectorConfig(
+                        domain=["sensor", "number", "input_number"]
+                    )
+                ),
+            }),
+        )
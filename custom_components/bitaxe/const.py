@@ -1,9 +1,262 @@
 """Constants for the BitAxe integration."""
 
 DOMAIN = "bitaxe"
-PLATFORMS: list[str] = ["sensor", "button", "switch", "number", "select", "text"]
+PLATFORMS: list[str] = [
+    "sensor",
+    "button",
+    "switch",
+    "number",
+    "select",
+    "text",
+    "update",
+]
 DEFAULT_SCAN_INTERVAL = 30  # seconds
 
+# Fields of /api/system/info consumed by the entity description tables (and
+# ASICModel and version for the model-specific options). Everything else is
+# dropped when the payload is parsed, so a field must be listed here before an
+# entity can read it.
+SYSTEM_INFO_KEYS: tuple[str, ...] = (
+    # sensor
+    "power",
+    "temp",
+    "vrTemp",
+    "hashRate",
+    "bestDiff",
+    "bestSessionDiff",
+    "sharesAccepted",
+    "sharesRejected",
+    "fanspeed",
+    "fanrpm",
+    "uptimeSeconds",
+    # tuning
+    "expectedHashrate",
+    # number
+    "temptarget",
+    "minFanSpeed",
+    # select
+    "frequency",
+    "coreVoltage",
+    "rotation",
+    "displayTimeout",
+    # switch
+    "autofanspeed",
+    "invertscreen",
+    "overclockEnabled",
+    # text
+    "hostname",
+    # device
+    "ASICModel",
+    "version",
+)
+
+# Options
+CONF_PUSH_UPDATES = "push_updates"
+CONF_SCAN_INTERVAL = "scan_interval"
+MIN_SCAN_INTERVAL = 5  # seconds
+# Noisy sensors publish a new state only when the value moved by more than its
+# deadband (option f"{CONF_DEADBAND}_{key}") or the last state is MAX_AGE old
+CONF_DEADBAND = "deadband"
+CONF_MAX_AGE = "max_age"
+DEFAULT_MAX_AGE = 300  # seconds
+
+# Last boot sensor: boot times computed from uptimeSeconds within this
+# tolerance are treated as the same boot, absorbing poll and clock skew
+BOOT_TIME_TOLERANCE = 60  # seconds
+EVENT_REBOOT = f"{DOMAIN}_reboot"
+
+# Import of the on-device history into long-term statistics
+CONF_HISTORY_IMPORT = "history_import"
+HISTORY_IMPORT_INTERVAL = 600  # seconds
+
+# State write diagnostics
+STATE_WRITES_WINDOW = (86400, 24)  # seconds, buckets
+
+# Poll instrumentation: latency histogram bucket upper bounds
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)  # seconds
+DIAGNOSTICS_SLOWEST_DEVICES = 10
+
+# Flight recorder of raw system info payloads, per device
+FLIGHT_RECORDER_SIZE = 120  # polls
+SERVICE_DUMP_PAYLOADS = "dump_payloads"
+SERVICE_REPLAY_PAYLOADS = "replay_payloads"
+ATTR_SPEED = "speed"
+DEFAULT_REPLAY_SPEED = 10
+# Raw payloads carry the network and pool credentials; diagnostics and
+# dumps redact them
+TO_REDACT = {
+    "ip_address",
+    "host",
+    "hostname",
+    "ipv4",
+    "macAddr",
+    "ssid",
+    "wifiPass",
+    "stratumUser",
+    "stratumPassword",
+    "fallbackStratumUser",
+    "fallbackStratumPassword",
+}
+
+# Refresh tiers: telemetry entities render on every poll, config entities
+# only every CONFIG_SCAN_INTERVAL or right after a write
+TIER_TELEMETRY = "telemetry"
+TIER_CONFIG = "config"
+CONFIG_SCAN_INTERVAL = 300  # seconds
+
+# WebSocket push updates
+PUSH_FALLBACK_SCAN_INTERVAL = 300  # seconds, polling while the push stream is up
+WS_HEARTBEAT = 30  # seconds
+WS_RECONNECT_MIN = 1  # seconds
+WS_RECONNECT_MAX = 300  # seconds
+WS_PROBE_TIMEOUT = 5  # seconds the options flow listens for field updates
+WS_FIELDS_TIMEOUT = 60  # seconds without field updates before push gives up
+
+# Device HTTP client
+REQUEST_TIMEOUT = 10  # seconds
+MIN_REQUEST_TIMEOUT = 2  # seconds
+PROBE_TIMEOUT = 2  # seconds
+
+# Network discovery in the config flow
+CONF_NETWORK = "network"
+CONF_DEVICES = "devices"
+DISCOVERY_TIMEOUT = 1.5  # seconds per host
+DISCOVERY_MAX_CONCURRENT = 128
+DISCOVERY_MAX_HOSTS = 1024
+
+# Bulk import from an inventory file
+SERVICE_IMPORT_DEVICES = "import_devices"
+ATTR_FILE = "file"
+IMPORT_TIMEOUT = 5  # seconds per device
+
+# Setting writes issued within this window are sent as one PATCH
+WRITE_COALESCE_WINDOW = 0.25  # seconds
+
+# Startup snapshots
+DATA_SNAPSHOTS = f"{DOMAIN}_snapshots"
+SNAPSHOT_STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 60  # seconds
+# Read at setup rather than through a listener
+SNAPSHOT_EXTRA_KEYS: tuple[str, ...] = ("ASICModel", "version")
+
+# ASIC capabilities (/api/system/asic), cached per model and firmware version
+DATA_CAPABILITIES = f"{DOMAIN}_capabilities"
+CAPABILITIES_STORAGE_VERSION = 1
+CAPABILITIES_SAVE_DELAY = 10  # seconds
+
+# Device health
+CIRCUIT_OPEN_THRESHOLD = 3  # consecutive failures
+MAX_BACKOFF_INTERVAL = 600  # seconds
+ERROR_LOG_INTERVAL = 3600  # seconds between repeated error logs per device
+
+# Rolling window metrics: window → (length, number of ring buffer buckets)
+ROLLING_WINDOWS: dict[str, tuple[int, int]] = {
+    "1m": (60, 12),
+    "10m": (600, 20),
+    "1h": (3600, 60),
+}
+EFFICIENCY_WINDOW = "10m"
+REJECT_RATIO_WINDOW = "1h"
+
+# Fleet entry with aggregate sensors
+CONF_FLEET = "fleet"
+FLEET_UNIQUE_ID = "fleet"
+FLEET_PLATFORMS: list[str] = ["sensor"]
+DATA_FLEET = f"{DOMAIN}_fleet"
+FLEET_UPDATE_INTERVAL = 5  # seconds between aggregate state writes
+
+# Fleet polling scheduler
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+DEFAULT_MAX_CONCURRENT_POLLS = 16
+POLL_JITTER = 0.05  # fraction of the scan interval
+THROUGHPUT_WINDOW = 60  # seconds
+
+# Automatic tuning of frequency and core voltage
+DATA_TUNER = f"{DOMAIN}_tuner"
+TUNING_STORAGE_VERSION = 1
+TUNING_SAVE_DELAY = 10  # seconds
+TUNING_SAMPLE_INTERVAL = 10  # seconds between readings while tuning
+# An operating point is stable when it reaches this share of the hash rate
+# the firmware expects from the frequency
+TUNING_STABLE_HASHRATE_RATIO = 0.9
+SERVICE_AUTOTUNE = "autotune"
+ATTR_GOAL = "goal"
+ATTR_SETTLE_TIME = "settle_time"
+ATTR_MEASURE_TIME = "measure_time"
+ATTR_MAX_TEMP = "max_temp"
+ATTR_MAX_VR_TEMP = "max_vr_temp"
+ATTR_MAX_PARALLEL = "max_parallel"
+GOAL_EFFICIENCY = "efficiency"
+GOAL_HASHRATE = "hashrate"
+DEFAULT_SETTLE_TIME = 120  # seconds
+DEFAULT_MEASURE_TIME = 120  # seconds
+DEFAULT_MAX_TEMP = 65  # °C, ASIC
+DEFAULT_MAX_VR_TEMP = 80  # °C
+DEFAULT_TUNING_PARALLEL = 4
+EVENT_AUTOTUNE_FINISHED = f"{DOMAIN}_autotune_finished"
+
+# Settings the user chose for devices a controller throttled
+DATA_CEILINGS = f"{DOMAIN}_ceilings"
+CEILINGS_STORAGE_VERSION = 1
+CEILINGS_SAVE_DELAY = 10  # seconds
+
+# Thermal governor: steps the frequency down through the ASIC's options when
+# the device runs hot and back up to the user's setting once it cooled down
+CONF_GOVERNOR = "thermal_governor"
+CONF_GOVERNOR_MAX_TEMP = "governor_max_temp"
+CONF_GOVERNOR_MAX_VR_TEMP = "governor_max_vr_temp"
+CONF_GOVERNOR_HYSTERESIS = "governor_hysteresis"
+DEFAULT_GOVERNOR_HYSTERESIS = 5  # °C below the limits before stepping up
+DATA_GOVERNORS = f"{DOMAIN}_governors"
+GOVERNOR_STEP_DOWN_INTERVAL = 60  # seconds between steps down
+GOVERNOR_STEP_UP_INTERVAL = 300  # seconds, doubled after each failed climb
+GOVERNOR_MAX_STEP_UP_INTERVAL = 3600  # seconds
+GOVERNOR_FAN_HEADROOM = 90  # %, no step up while the fan runs faster
+GOVERNOR_HISTORY_SIZE = 50  # actions kept for diagnostics
+EVENT_GOVERNOR_ACTION = f"{DOMAIN}_governor_action"
+
+# Fleet power budget, in the options of the fleet entry: a fixed wattage or
+# the state of an entity (W or kW), shared out for the most hash rate
+CONF_POWER_BUDGET = "power_budget"
+CONF_POWER_BUDGET_ENTITY = "power_budget_entity"
+DATA_POWER_BUDGET = f"{DOMAIN}_power_budget"
+POWER_BUDGET_INTERVAL = 30  # seconds between allocations
+POWER_BUDGET_COOLDOWN = 10  # seconds, at most one allocation per budget change
+POWER_BUDGET_SETTLE_TIME = 60  # seconds a changed device is left alone
+POWER_BUDGET_HEADROOM = 0.03  # share of the budget kept free for noise
+POWER_BUDGET_MIN_GAIN = 0.01  # share of the hash rate a rebalance must add
+POWER_BUDGET_MAX_PARALLEL_WRITES = 8
+
+# Bulk settings changes and restarts, rolled out in waves
+SERVICE_APPLY_SETTINGS = "apply_settings"
+SERVICE_RESTART = "restart"
+ATTR_SETTINGS = "settings"
+ATTR_WAVE_SIZE = "wave_size"
+ATTR_WAVE_DELAY = "wave_delay"
+ATTR_HALT_ON_FAILURE = "halt_on_failure"
+ATTR_TIMEOUT = "timeout"
+DEFAULT_WAVE_SIZE = 10  # % of the targeted devices
+DEFAULT_ROLLOUT_PARALLEL = 16
+DEFAULT_RESTART_TIMEOUT = 180  # seconds for a device to come back
+ROLLOUT_POLL_INTERVAL = 5  # seconds between checks while a device reboots
+RESTART_ENDPOINT = "/api/system/restart"
+
+# Firmware updates over the AxeOS OTA endpoints, rolled out like the above
+SERVICE_UPDATE_FIRMWARE = "update_firmware"
+ATTR_WWW_FILE = "www_file"
+DATA_FIRMWARE = f"{DOMAIN}_firmware"
+FIRMWARE_STORAGE_VERSION = 1
+DEFAULT_FIRMWARE_PARALLEL = 4
+OTA_ENDPOINT = "/api/system/OTA"
+OTA_WWW_ENDPOINT = "/api/system/OTAWWW"
+OTA_CHUNK_SIZE = 64 * 1024  # bytes
+OTA_TIMEOUT = 240  # seconds for one image to upload and flash
+SIGNAL_FIRMWARE_PROGRESS = f"{DOMAIN}_firmware_progress_{{}}"
+SIGNAL_FIRMWARE_STAGED = f"{DOMAIN}_firmware_staged"
+
+# Fallback for firmware without /api/system/asic
 # Valid frequency options per ASIC model (MHz)
 ASIC_FREQUENCY: dict[str, list[str]] = {
     "BM1397": ["400", "425", "450", "475", "485", "500", "525", "550", "575", "600"],
@@ -0,0 +1,340 @@
+"""Data update coordinator for the BitAxe integration."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+import logging
+import time
+from typing import Any, NamedTuple
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.service import async_extract_config_entry_ids
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .api import BitaxeClient, BitaxeConnectionError
+from .const import (
+    CONF_SCAN_INTERVAL,
+    CONFIG_SCAN_INTERVAL,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    PUSH_FALLBACK_SCAN_INTERVAL,
+    SNAPSHOT_EXTRA_KEYS,
+    STATE_WRITES_WINDOW,
+    TIER_CONFIG,
+    TIER_TELEMETRY,
+    WRITE_COALESCE_WINDOW,
+)
+from .health import DeviceHealth
+from .instrumentation import FAILURE_UNREACHABLE
+from .models import EMPTY_SYSTEM_INFO, SystemInfo
+from .window import RingWindow
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ListenerContext(NamedTuple):
+    """What a coordinator listener depends on."""
+
+    tier: str
+    keys: frozenset[str]
+
+
+class BitAxeDataUpdateCoordinator(DataUpdateCoordinator[SystemInfo]):
+    """Hold the latest system info of one BitAxe device.
+
+    Refreshes are triggered by the fleet scheduler, so the coordinator has
+    no update interval of its own. Listeners subscribe with a
+    ListenerContext and are only called when one of their keys changed since
+    their tier was last notified, or when availability changes. The config
+    tier is notified every CONFIG_SCAN_INTERVAL or right after a write;
+    listeners without a context are called on every update.
+
+    At startup the coordinator may be seeded from a snapshot of the last good
+    payload; its data is then `stale` until the first live refresh succeeds.
+    While a flight recorder dump is `replaying`, refreshes and push updates
+    are dropped.
+    While firmware is uploaded, `firmware_progress` is the percentage sent.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the coordinator."""
+        ip_address = entry.data["ip_address"]
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"BitAxe ({ip_address})",
+            update_interval=None,
+        )
+        self.client = BitaxeClient(async_get_clientsession(hass), ip_address)
+        self.health = DeviceHealth()
+        self.push_connected = False
+        # None until the WebSocket was seen to carry field updates, or not
+        self.push_supported: bool | None = None
+        self.stale = False
+        self.replaying = False
+        self._refresh_lock = asyncio.Lock()
+        self.firmware_progress: int | None = None
+        self._scan_interval: float = entry.options.get(
+            CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL
+        )
+        self._config_tier_notified: float | None = None
+        self._config_tier_forced = False
+        self._notified_status: tuple[bool, bool] | None = None
+        self._notified_data: dict[str, SystemInfo] = {}
+        self.state_writes_last_update = 0
+        self.state_writes_total = 0
+        self._state_writes = 0
+        self._state_writes_window = RingWindow(*STATE_WRITES_WINDOW)
+        self._pending_write: dict[str, Any] = {}
+        self._inflight_write: dict[str, Any] = {}
+        self._write_rollback: dict[str, Any] = {}
+        self._write_future: asyncio.Future[None] | None = None
+
+    @property
+    def poll_interval(self) -> float:
+        """Return the number of seconds between scheduled polls."""
+        if self.push_connected:
+            return PUSH_FALLBACK_SCAN_INTERVAL
+        return self.health.poll_interval(self._scan_interval)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Call the listeners whose keys changed in a due refresh tier."""
+        started = time.perf_counter()
+        now = time.monotonic()
+        status = (self.last_update_success, self.stale)
+        availability_changed = status != self._notified_status
+        self._notified_status = status
+        due_tiers = [TIER_TELEMETRY]
+        if (
+            self._config_tier_forced
+            or self._config_tier_notified is None
+            or now - self._config_tier_notified >= CONFIG_SCAN_INTERVAL
+            or availability_changed
+        ):
+            self._config_tier_notified = now
+            self._config_tier_forced = False
+            due_tiers.append(TIER_CONFIG)
+
+        data = self.data if self.data is not None else EMPTY_SYSTEM_INFO
+        previous: dict[str, SystemInfo | None] = {}
+        for tier in due_tiers:
+            previous[tier] = self._notified_data.get(tier)
+            self._notified_data[tier] = data
+
+        self._state_writes = 0
+        for update_callback, context in list(self._listeners.values()):
+            if context is None:
+                update_callback()
+                continue
+            if context.tier not in previous:
+                continue
+            old = previous[context.tier]
+            if (
+                availability_changed
+                or old is None
+                or any(data.get(key) != old.get(key) for key in context.keys)
+            ):
+                update_callback()
+
+        self.state_writes_last_update = self._state_writes
+        self.client.stats.record_dispatch(time.perf_counter() - started)
+
+    @callback
+    def async_count_state_write(self) -> None:
+        """Count a state written by one of the device's entities."""
+        self._state_writes += 1
+        self.state_writes_total += 1
+        self._state_writes_window.add(time.monotonic(), 1, 1)
+
+    @property
+    def state_writes_per_day(self) -> int:
+        """Return the number of states written over the last 24 hours."""
+        return round(self._state_writes_window.total(time.monotonic()))
+
+    @callback
+    def async_set_snapshot(self, snapshot: dict[str, Any]) -> None:
+        """Seed the coordinator with a saved payload until a live refresh."""
+        self.data = SystemInfo.from_dict(snapshot)
+        self.stale = True
+
+    @callback
+    def async_get_snapshot(self) -> dict[str, Any]:
+        """Return the part of the data that entities consume."""
+        keys = set(SNAPSHOT_EXTRA_KEYS)
+        for _, context in self._listeners.values():
+            if context is not None:
+                keys.update(context.keys)
+        data = self.data if self.data is not None else EMPTY_SYSTEM_INFO
+        return {key: data[key] for key in keys if key in data}
+
+    async def async_request_config_refresh(self) -> None:
+        """Request a refresh that also updates the config tier."""
+        self._config_tier_forced = True
+        await self.async_request_refresh()
+
+    async def async_write(self, payload: dict[str, Any]) -> None:
+        """Change settings on the device.
+
+        The new values are shown right away. Writes issued within
+        WRITE_COALESCE_WINDOW are merged into a single PATCH, followed by one
+        confirming refresh unless the firmware echoes the values back.
+        """
+        data = self.data if self.data is not None else EMPTY_SYSTEM_INFO
+        for key in payload:
+            self._write_rollback.setdefault(key, data.get(key))
+        self._pending_write.update(payload)
+        self._async_apply_settings(payload)
+
+        if self._write_future is None:
+            self._write_future = self.hass.loop.create_future()
+            self.hass.async_create_background_task(
+                self._async_flush_writes(), f"bitaxe write {self.client.host}"
+            )
+        await asyncio.shield(self._write_future)
+
+    async def _async_flush_writes(self) -> None:
+        """Send the coalesced settings in one PATCH."""
+        await asyncio.sleep(WRITE_COALESCE_WINDOW)
+        payload, self._pending_write = self._pending_write, {}
+        rollback, self._write_rollback = self._write_rollback, {}
+        future, self._write_future = self._write_future, None
+        assert future is not None
+
+        self._inflight_write = payload
+        try:
+            echo = await self.client.async_patch_system(payload)
+        except BitaxeConnectionError as err:
+            self._async_apply_settings(rollback)
+            future.set_exception(err)
+            return
+        finally:
+            self._inflight_write = {}
+        future.set_result(None)
+
+        if echo is None or any(
+            echo.get(key) != value for key, value in payload.items()
+        ):
+            await self.async_request_config_refresh()
+
+    @callback
+    def _async_apply_settings(self, settings: dict[str, Any]) -> None:
+        """Show settings without waiting for the device to report them."""
+        if self.data is None:
+            return
+        self.data = self.data.replace(settings)
+        self._config_tier_forced = True
+        self.async_update_listeners()
+
+    @callback
+    def async_push_update(self, fields: dict[str, Any]) -> None:
+        """Merge fields received over the push stream into the current data."""
+        if self.replaying:
+            return
+        data = self.data if self.data is not None else EMPTY_SYSTEM_INFO
+        self.async_set_updated_data(data.replace(fields))
+
+    async def async_refresh(self) -> None:
+        """Refresh data, unless a flight recorder dump is replaying."""
+        if self.replaying:
+            return
+        async with self._refresh_lock:
+            await super().async_refresh()
+
+    @asynccontextmanager
+    async def async_replay(self) -> AsyncIterator[None]:
+        """Hold off refreshes while recorded payloads are fed in.
+
+        Waits for a refresh already in flight, so a live payload cannot land
+        in the middle of the replay.
+        """
+        self.replaying = True
+        try:
+            async with self._refresh_lock:
+                yield
+        finally:
+            self.replaying = False
+
+    async def _async_update_data(self) -> SystemInfo:
+        """Fetch data from the BitAxe API."""
+        health = self.health
+        if health.circuit_open and not await self.client.async_probe():
+            self.client.stats.record_failure(FAILURE_UNREACHABLE)
+            self._async_record_failure("device does not accept connections")
+            raise UpdateFailed(f"BitAxe {self.client.host} is unreachable")
+
+        started = time.monotonic()
+        try:
+            data = await self.client.async_get_system_info(health.request_timeout)
+        except BitaxeConnectionError as err:
+            self._async_record_failure(str(err))
+            raise UpdateFailed(str(err)) from err
+        if health.record_success(time.monotonic() - started):
+            _LOGGER.info("BitAxe %s is back online", self.client.host)
+        self.stale = False
+        if self._pending_write or self._inflight_write:
+            # Keep showing settings the device has not applied yet
+            data = data.replace({**self._inflight_write, **self._pending_write})
+        return data
+
+    @callback
+    def _async_record_failure(self, error: str) -> None:
+        """Track a failed poll and log it at a limited rate."""
+        health = self.health
+        if health.record_failure(error):
+            _LOGGER.error(
+                "Error fetching data from BitAxe %s (%d consecutive failures, "
+                "next attempt in %.0f s): %s",
+                self.client.host,
+                health.consecutive_failures,
+                self.poll_interval,
+                error,
+            )
+        else:
+            _LOGGER.debug(
+                "Error fetching data from BitAxe %s: %s", self.client.host, error
+            )
+
+
+@callback
+def async_get_device_coordinators(
+    hass: HomeAssistant, device_ids: list[str] | None
+) -> dict[str, BitAxeDataUpdateCoordinator]:
+    """Return the coordinators of some devices by entry ID, or all of them."""
+    coordinators: dict[str, BitAxeDataUpdateCoordinator] = hass.data.get(DOMAIN, {})
+    if device_ids is None:
+        return dict(coordinators)
+    registry = dr.async_get(hass)
+    selected: dict[str, BitAxeDataUpdateCoordinator] = {}
+    for device_id in device_ids:
+        device = registry.async_get(device_id)
+        entry_ids = device.config_entries if device else set()
+        matches = [entry_id for entry_id in entry_ids if entry_id in coordinators]
+        if not matches:
+            raise ServiceValidationError(f"{device_id} is not a loaded BitAxe device")
+        for entry_id in matches:
+            selected[entry_id] = coordinators[entry_id]
+    return selected
+
+
+async def async_get_target_coordinators(
+    hass: HomeAssistant, call: ServiceCall
+) -> dict[str, BitAxeDataUpdateCoordinator]:
+    """Return the coordinators a service call targets, or all without a target."""
+    coordinators: dict[str, BitAxeDataUpdateCoordinator] = hass.data.get(DOMAIN, {})
+    if not any(key in call.data for key in cv.TARGET_SERVICE_FIELDS):
+        return dict(coordinators)
+    entry_ids = await async_extract_config_entry_ids(hass, call)
+    selected = {
+        entry_id: coordinator
+        for entry_id, coordinator in coordinators.items()
+        if entry_id in entry_ids
+    }
+    if not selected:
+        raise ServiceValidationError("The target holds no loaded BitAxe device")
+    return selected
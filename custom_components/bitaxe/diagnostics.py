@@ -0,0 +1,134 @@
+"""Diagnostics support for the BitAxe integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.util.json import JSON_DECODE_EXCEPTIONS, json_loads
+
+from .const import (
+    CONF_FLEET,
+    DATA_FLEET,
+    DATA_GOVERNORS,
+    DATA_POWER_BUDGET,
+    DATA_SCHEDULER,
+    DIAGNOSTICS_SLOWEST_DEVICES,
+    DOMAIN,
+    TO_REDACT,
+)
+from .coordinator import BitAxeDataUpdateCoordinator
+from .fleet import BitAxeFleetAggregator
+from .instrumentation import FlightRecord, milliseconds
+from .tuning import async_get_tuner
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a device or the fleet entry."""
+    if entry.data.get(CONF_FLEET):
+        return _fleet_diagnostics(hass)
+
+    coordinator: BitAxeDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    health = coordinator.health
+    tuner = await async_get_tuner(hass)
+    governor = hass.data.get(DATA_GOVERNORS, {}).get(entry.entry_id)
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "stale": coordinator.stale,
+            "push_connected": coordinator.push_connected,
+            "poll_interval": coordinator.poll_interval,
+            "state_writes_last_update": coordinator.state_writes_last_update,
+            "state_writes_per_day": coordinator.state_writes_per_day,
+        },
+        "health": {
+            "consecutive_failures": health.consecutive_failures,
+            "circuit_open": health.circuit_open,
+            "latency_avg_ms": milliseconds(health.latency_avg),
+            "request_timeout": health.request_timeout,
+            "last_error": health.last_error,
+            "suppressed_errors": health.suppressed_errors,
+        },
+        "polls": coordinator.client.stats.as_dict(),
+        "tuning": {
+            "running": tuner.async_is_running(entry.entry_id),
+            "last_result": tuner.async_get_result(entry.entry_id),
+        },
+        "governor": None if governor is None else governor.as_dict(),
+        "data": async_redact_data(dict(coordinator.data or {}), TO_REDACT),
+        "flight_recorder": [
+            _flight_record(record)
+            for record in coordinator.client.flight_recorder.records()
+        ],
+    }
+
+
+def _flight_record(record: FlightRecord) -> dict[str, Any]:
+    """Return a recorded poll with its payload decoded and redacted."""
+    if record.error is not None:
+        return {"time": record.time, "error": record.error}
+    try:
+        payload = json_loads(record.payload or b"")
+    except JSON_DECODE_EXCEPTIONS:
+        payload = (record.payload or b"").decode("utf-8", "replace")
+    return {
+        "time": record.time,
+        "latency_ms": milliseconds(record.latency),
+        "payload": async_redact_data(payload, TO_REDACT),
+    }
+
+
+def _fleet_diagnostics(hass: HomeAssistant) -> dict[str, Any]:
+    """Summarize every device, slowest first."""
+    aggregator: BitAxeFleetAggregator = hass.data[DATA_FLEET]
+    devices: list[dict[str, Any]] = []
+    for entry_id, coordinator in hass.data.get(DOMAIN, {}).items():
+        entry = hass.config_entries.async_get_entry(entry_id)
+        summary = coordinator.client.stats.as_dict()
+        devices.append(
+            {
+                "name": entry.title if entry else entry_id,
+                "online": coordinator.last_update_success,
+                "latency_p95_ms": summary["latency_ms"]["p95"],
+                "latency_last_ms": summary["latency_ms"]["last"],
+                "payload_bytes": summary["payload_bytes"]["last"],
+                "failures": summary["failures"],
+                "seconds_since_last_success": summary["seconds_since_last_success"],
+            }
+        )
+    # Devices without a completed poll sort as slowest
+    devices.sort(
+        key=lambda device: (
+            device["latency_p95_ms"] is None,
+            device["latency_p95_ms"] or 0,
+            device["latency_last_ms"] or 0,
+        ),
+        reverse=True,
+    )
+
+    scheduler = hass.data.get(DATA_SCHEDULER)
+    controller = hass.data.get(DATA_POWER_BUDGET)
+    return {
+        "fleet": {
+            "devices": aggregator.device_count,
+            "online": aggregator.online_count,
+            "total_hashrate": aggregator.total_hashrate,
+            "total_power": aggregator.total_power,
+        },
+        "scheduler": None
+        if scheduler is None
+        else {
+            "devices": scheduler.device_count,
+            "polls_total": scheduler.polls_total,
+            "polls_per_second": scheduler.polls_per_second,
+        },
+        "power_budget": None if controller is None else controller.as_dict(),
+        "slowest_devices": devices[:DIAGNOSTICS_SLOWEST_DEVICES],
+    }
@@ -1,24 +1,38 @@
 """Base entity for the BitAxe integration."""
 from __future__ import annotations
 
+from collections.abc import Iterable
+from typing import Any
+
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.helpers.update_coordinator import CoordinatorEntity, DataUpdateCoordinator
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN, TIER_TELEMETRY
+from .coordinator import BitAxeDataUpdateCoordinator, ListenerContext
 
-from .const import DOMAIN
 
+class BitAxeEntity(CoordinatorEntity[BitAxeDataUpdateCoordinator]):
+    """Base class for all BitAxe entities.
 
-class BitAxeEntity(CoordinatorEntity):
-    """Base class for all BitAxe entities."""
+    `source_keys` are the system info keys the entity renders; the entity is
+    only updated when one of them changes. None updates it on every refresh.
+    """
 
     _attr_has_entity_name = True
+    _refresh_tier = TIER_TELEMETRY
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator,
+        coordinator: BitAxeDataUpdateCoordinator,
         entry: ConfigEntry,
+        source_keys: Iterable[str] | None,
     ) -> None:
         """Initialize the base BitAxe entity."""
-        super().__init__(coordinator)
+        context = None
+        if source_keys is not None:
+            context = ListenerContext(self._refresh_tier, frozenset(source_keys))
+        super().__init__(coordinator, context=context)
         self._entry = entry
         self._device_name = entry.data.get("device_name", "BitAxe Miner")
 
@@ -31,3 +45,16 @@ class BitAxeEntity(CoordinatorEntity):
             "manufacturer": "Open Source Hardware",
             "model": "BitAxe Miner",
         }
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state and count it in the write diagnostics."""
+        super().async_write_ha_state()
+        self.coordinator.async_count_state_write()
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Flag values restored from the startup snapshot."""
+        if self.coordinator.stale:
+            return {"stale": True}
+        return None
@@ -0,0 +1,31 @@
+"""Access to user-supplied files for the BitAxe services."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from pathlib import Path
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.util.yaml import SECRET_YAML
+
+
+def resolve_service_path(
+    hass: HomeAssistant, file_name: str, suffixes: Iterable[str]
+) -> Path:
+    """Resolve a file named in a service call, relative to the config dir.
+
+    Only files with one of `suffixes` inside the configuration directory or
+    an allowlisted external directory are accepted, and never secrets.yaml.
+    """
+    path = Path(hass.config.path(file_name)).resolve()
+    if not path.name.lower().endswith(tuple(suffixes)):
+        raise ServiceValidationError(
+            f"{file_name} is not a {' or '.join(suffixes)} file"
+        )
+    in_config_dir = path.is_relative_to(Path(hass.config.config_dir).resolve())
+    if (
+        not (in_config_dir or hass.config.is_allowed_path(str(path)))
+        or path.name == SECRET_YAML
+    ):
+        raise ServiceValidationError(f"Access to {file_name} is not allowed")
+    return path
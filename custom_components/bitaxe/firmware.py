@@ -0,0 +1,294 @@
+"""Firmware and web UI updates of BitAxe devices over the AxeOS OTA endpoints."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Callable
+import os
+from pathlib import Path
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DATA_FIRMWARE,
+    DATA_SCHEDULER,
+    DEFAULT_RESTART_TIMEOUT,
+    DOMAIN,
+    FIRMWARE_STORAGE_VERSION,
+    OTA_CHUNK_SIZE,
+    OTA_ENDPOINT,
+    OTA_WWW_ENDPOINT,
+    SIGNAL_FIRMWARE_PROGRESS,
+    SIGNAL_FIRMWARE_STAGED,
+)
+from .coordinator import BitAxeDataUpdateCoordinator
+from .files import resolve_service_path
+from .rollout import (
+    RolloutError,
+    RolloutParameters,
+    async_rollout,
+    async_wait_for_reboot,
+)
+from .scheduler import BitAxeFleetScheduler
+
+FIRMWARE_SUFFIX = ".bin"
+
+# ESP-IDF app image: a 24 byte image header and an 8 byte segment header
+# precede the app descriptor, whose version string starts 16 bytes in
+_ESP_IMAGE_MAGIC = 0xE9
+_APP_DESC_OFFSET = 32
+_APP_DESC_MAGIC = 0xABCD5432
+_APP_VERSION_OFFSET = _APP_DESC_OFFSET + 16
+_APP_VERSION_LENGTH = 32
+
+
+def _app_version(header: bytes) -> str | None:
+    """Return the version in the ESP app descriptor, or None if there is none."""
+    if (
+        len(header) < _APP_VERSION_OFFSET + _APP_VERSION_LENGTH
+        or header[0] != _ESP_IMAGE_MAGIC
+        or int.from_bytes(header[_APP_DESC_OFFSET : _APP_DESC_OFFSET + 4], "little")
+        != _APP_DESC_MAGIC
+    ):
+        return None
+    version = header[_APP_VERSION_OFFSET:].split(b"\0", 1)[0]
+    return version.decode("ascii", "replace")
+
+
+class FirmwareImage:
+    """An image file opened once and streamed to any device.
+
+    Concurrent uploads read their chunks from the same file descriptor with
+    positioned reads in the executor, so flashing the fleet costs one file
+    handle, one chunk in memory per upload and no disk reads on the event
+    loop.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Open an image file; call from the executor."""
+        self.path = path
+        self._fd = os.open(path, os.O_RDONLY)
+        try:
+            self.size = os.fstat(self._fd).st_size
+            if not self.size:
+                raise ValueError("empty file")
+            self.version = _app_version(
+                os.pread(self._fd, _APP_VERSION_OFFSET + _APP_VERSION_LENGTH, 0)
+            )
+        except (OSError, ValueError):
+            os.close(self._fd)
+            raise
+
+    async def chunks(
+        self, hass: HomeAssistant, progress: Callable[[int], None] | None = None
+    ) -> AsyncIterator[bytes]:
+        """Yield the image in chunks of OTA_CHUNK_SIZE read in the executor."""
+        for offset in range(0, self.size, OTA_CHUNK_SIZE):
+            chunk = await hass.async_add_executor_job(
+                os.pread, self._fd, OTA_CHUNK_SIZE, offset
+            )
+            if not chunk:
+                raise OSError(f"{self.path.name} was truncated")
+            yield chunk
+            if progress is not None:
+                progress(min(offset + len(chunk), self.size))
+
+    def close(self) -> None:
+        """Close the image file."""
+        os.close(self._fd)
+
+
+async def _async_open_image(hass: HomeAssistant, path: Path) -> FirmwareImage:
+    """Map an image file, turning file errors into validation errors."""
+    try:
+        return await hass.async_add_executor_job(FirmwareImage, path)
+    except (OSError, ValueError) as err:
+        raise ServiceValidationError(f"Cannot read {path.name}: {err}") from err
+
+
+class BitAxeFirmwareStore:
+    """Remember the firmware last pushed to the fleet.
+
+    Update entities offer it to the devices that do not run it yet.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the firmware store."""
+        self.hass = hass
+        self._store: Store[dict[str, str | None]] = Store(
+            hass, FIRMWARE_STORAGE_VERSION, f"{DOMAIN}.firmware"
+        )
+        self.staged: dict[str, str | None] | None = None
+
+    async def async_load(self) -> BitAxeFirmwareStore:
+        """Load the staged firmware from disk."""
+        self.staged = await self._store.async_load()
+        return self
+
+    @property
+    def version(self) -> str | None:
+        """Return the version of the staged firmware."""
+        return self.staged["version"] if self.staged else None
+
+    @callback
+    def async_stage(
+        self, firmware: FirmwareImage, www: FirmwareImage | None
+    ) -> None:
+        """Offer a firmware, and optionally a web UI, to every device."""
+        self.staged = {
+            "version": firmware.version,
+            "firmware": str(firmware.path),
+            "www": str(www.path) if www else None,
+        }
+        self._store.async_delay_save(lambda: self.staged, 0)
+        async_dispatcher_send(self.hass, SIGNAL_FIRMWARE_STAGED)
+
+
+async def async_get_firmware_store(hass: HomeAssistant) -> BitAxeFirmwareStore:
+    """Return the firmware store, loading it on first use."""
+    if (task := hass.data.get(DATA_FIRMWARE)) is None:
+        task = hass.data[DATA_FIRMWARE] = hass.async_create_task(
+            BitAxeFirmwareStore(hass).async_load()
+        )
+    return await asyncio.shield(task)
+
+
+async def _async_flash(
+    hass: HomeAssistant,
+    entry_id: str,
+    coordinator: BitAxeDataUpdateCoordinator,
+    firmware: FirmwareImage,
+    www: FirmwareImage | None,
+    timeout: float,
+) -> dict[str, Any]:
+    """Upload the images to one device and check that it runs the new firmware."""
+    assert coordinator.data is not None
+    if coordinator.firmware_progress is not None:
+        raise RolloutError("A firmware update is already running")
+    installed = coordinator.data.get("version")
+    if installed == firmware.version and www is None:
+        return {"from": installed, "to": installed, "flashed": False}
+    uptime = coordinator.data.get_number("uptimeSeconds")
+    total = firmware.size + (www.size if www else 0)
+    reported = -1
+
+    def _async_progress(sent: int) -> None:
+        nonlocal reported
+        percent = sent * 100 // total
+        if percent // 5 != reported // 5:
+            reported = percent
+            coordinator.firmware_progress = percent
+            async_dispatcher_send(hass, SIGNAL_FIRMWARE_PROGRESS.format(entry_id))
+
+    # Polls would queue up behind the upload and then fail during the reboot
+    scheduler: BitAxeFleetScheduler = hass.data[DATA_SCHEDULER]
+    scheduler.async_remove(entry_id)
+    coordinator.firmware_progress = 0
+    async_dispatcher_send(hass, SIGNAL_FIRMWARE_PROGRESS.format(entry_id))
+    try:
+        if www is not None:
+            # The web UI first: flashing the firmware reboots the device
+            await coordinator.client.async_upload_ota(
+                OTA_WWW_ENDPOINT, www.chunks(hass, _async_progress), www.size
+            )
+        offset = www.size if www else 0
+        await coordinator.client.async_upload_ota(
+            OTA_ENDPOINT,
+            firmware.chunks(hass, lambda sent: _async_progress(offset + sent)),
+            firmware.size,
+        )
+        await async_wait_for_reboot(coordinator, uptime, timeout)
+    finally:
+        coordinator.firmware_progress = None
+        scheduler.async_resume(entry_id, coordinator)
+        async_dispatcher_send(hass, SIGNAL_FIRMWARE_PROGRESS.format(entry_id))
+
+    if not coordinator.last_update_success or coordinator.data is None:
+        raise RolloutError("Not answering after the update")
+    if (running := coordinator.data.get("version")) != firmware.version:
+        raise RolloutError(f"Runs {running} after flashing {firmware.version}")
+    return {"from": installed, "to": running, "flashed": True}
+
+
+async def async_update_firmware(
+    hass: HomeAssistant,
+    coordinators: dict[str, BitAxeDataUpdateCoordinator],
+    firmware_file: str,
+    www_file: str | None,
+    parameters: RolloutParameters,
+    timeout: float,
+) -> dict[str, Any]:
+    """Flash a firmware, and optionally a web UI image, to devices in waves.
+
+    Each device must come back running the version in the firmware's app
+    descriptor; otherwise it counts as failed, which halts the rollout
+    when halt_on_failure is set. Devices already on that version are only
+    flashed if a web UI image is given.
+    """
+    firmware_path = resolve_service_path(hass, firmware_file, (FIRMWARE_SUFFIX,))
+    www_path = None
+    if www_file is not None:
+        www_path = resolve_service_path(hass, www_file, (FIRMWARE_SUFFIX,))
+    firmware = await _async_open_image(hass, firmware_path)
+    www: FirmwareImage | None = None
+    try:
+        if firmware.version is None:
+            raise ServiceValidationError(
+                f"{firmware_file} is not an ESP32 firmware image"
+            )
+        if www_path is not None:
+            www = await _async_open_image(hass, www_path)
+            if www.version is not None:
+                raise ServiceValidationError(
+                    f"{www_file} is a firmware image, not a web UI image"
+                )
+        store = await async_get_firmware_store(hass)
+        store.async_stage(firmware, www)
+
+        async def _async_step(
+            entry_id: str, coordinator: BitAxeDataUpdateCoordinator
+        ) -> Any:
+            return await _async_flash(
+                hass, entry_id, coordinator, firmware, www, timeout
+            )
+
+        result = await async_rollout(
+            hass,
+            coordinators,
+            _async_step,
+            parameters,
+            f"Firmware update to {firmware.version}",
+        )
+    finally:
+        firmware.close()
+        if www is not None:
+            www.close()
+    return {"version": firmware.version, **result}
+
+
+async def async_install_staged(
+    hass: HomeAssistant, entry_id: str, coordinator: BitAxeDataUpdateCoordinator
+) -> None:
+    """Flash the staged firmware, and web UI if any, to one device."""
+    store = await async_get_firmware_store(hass)
+    if store.staged is None:
+        raise HomeAssistantError("No firmware has been staged")
+    images: list[FirmwareImage] = []
+    try:
+        for path in (store.staged["firmware"], store.staged["www"]):
+            if path is not None:
+                images.append(await _async_open_image(hass, Path(path)))
+        firmware, www = images[0], images[1] if len(images) > 1 else None
+        if firmware.version != store.version:
+            raise HomeAssistantError(
+                f"{firmware.path.name} changed since it was staged"
+            )
+        await _async_flash(
+            hass, entry_id, coordinator, firmware, www, DEFAULT_RESTART_TIMEOUT
+        )
+    finally:
+        for image in images:
+            image.close()
@@ -0,0 +1,168 @@
+"""Fleet-wide aggregates of all BitAxe devices."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import NamedTuple
+
+from homeassistant.core import CALLBACK_TYPE, HassJob, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import FLEET_UPDATE_INTERVAL
+from .coordinator import BitAxeDataUpdateCoordinator
+
+
+class _Contribution(NamedTuple):
+    """What one device adds to the fleet totals."""
+
+    online: bool
+    hashrate: float
+    power: float
+    temp: float | None
+
+
+_OFFLINE = _Contribution(False, 0.0, 0.0, None)
+
+
+class BitAxeFleetAggregator:
+    """Keep running totals over every BitAxe device.
+
+    Each device update replaces that device's contribution to the sums, so the
+    cost does not grow with the fleet. Only the maximum temperature has to be
+    recomputed over all devices, and only when the hottest device cooled down
+    or dropped out. Listeners are called at most once every
+    FLEET_UPDATE_INTERVAL.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the aggregator."""
+        self.hass = hass
+        self._devices: dict[str, _Contribution] = {}
+        self._listeners: dict[CALLBACK_TYPE, CALLBACK_TYPE] = {}
+        self._unsub_notify: CALLBACK_TYPE | None = None
+        self._notify_job = HassJob(self._async_notify, "bitaxe fleet notify")
+        self.online_count = 0
+        self.total_hashrate = 0.0
+        self.total_power = 0.0
+        self._temp_sum = 0.0
+        self._temp_count = 0
+        self._max_temp: float | None = None
+        self._max_temp_dirty = False
+
+    @property
+    def device_count(self) -> int:
+        """Return the number of devices that are set up."""
+        return len(self._devices)
+
+    @property
+    def mean_temperature(self) -> float | None:
+        """Return the mean ASIC temperature of the online devices."""
+        if not self._temp_count:
+            return None
+        return self._temp_sum / self._temp_count
+
+    @property
+    def max_temperature(self) -> float | None:
+        """Return the highest ASIC temperature of the online devices."""
+        if self._max_temp_dirty:
+            temps = (device.temp for device in self._devices.values())
+            self._max_temp = max(
+                (temp for temp in temps if temp is not None), default=None
+            )
+            self._max_temp_dirty = False
+        return self._max_temp
+
+    @property
+    def efficiency(self) -> float | None:
+        """Return the fleet efficiency in J/TH."""
+        if self.total_hashrate <= 0:
+            return None
+        # Hash rate is reported in GH/s
+        return self.total_power / (self.total_hashrate / 1000)
+
+    @callback
+    def async_update(
+        self, entry_id: str, coordinator: BitAxeDataUpdateCoordinator
+    ) -> None:
+        """Take the latest data of a device into account.
+
+        A device seeded from its startup snapshot only counts once a live
+        poll succeeded.
+        """
+        new = _OFFLINE
+        if (
+            coordinator.last_update_success
+            and coordinator.data is not None
+            and not coordinator.stale
+        ):
+            data = coordinator.data
+            new = _Contribution(
+                True,
+                data.get_number("hashRate") or 0.0,
+                data.get_number("power") or 0.0,
+                data.get_number("temp"),
+            )
+        self._async_replace(entry_id, new)
+
+    @callback
+    def async_remove(self, entry_id: str) -> None:
+        """Drop a device from the totals."""
+        if entry_id not in self._devices:
+            return
+        self._async_replace(entry_id, _OFFLINE)
+        del self._devices[entry_id]
+        if not self._devices:
+            # Start over from exact zeros instead of accumulated rounding
+            self.total_hashrate = self.total_power = self._temp_sum = 0.0
+        self._async_schedule_notify()
+
+    @callback
+    def _async_replace(self, entry_id: str, new: _Contribution) -> None:
+        """Swap the contribution of a device in the running sums."""
+        old = self._devices.get(entry_id, _OFFLINE)
+        self._devices[entry_id] = new
+        if new == old:
+            return
+
+        self.online_count += new.online - old.online
+        self.total_hashrate += new.hashrate - old.hashrate
+        self.total_power += new.power - old.power
+        if old.temp is not None:
+            self._temp_sum -= old.temp
+            self._temp_count -= 1
+        if new.temp is not None:
+            self._temp_sum += new.temp
+            self._temp_count += 1
+
+        if new.temp is not None and (
+            self._max_temp is None or new.temp >= self._max_temp
+        ):
+            self._max_temp = new.temp
+        elif old.temp is not None and old.temp == self._max_temp:
+            self._max_temp_dirty = True
+        self._async_schedule_notify()
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> Callable[[], None]:
+        """Listen for aggregate changes."""
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.pop(remove_listener)
+
+        self._listeners[remove_listener] = update_callback
+        return remove_listener
+
+    @callback
+    def _async_schedule_notify(self) -> None:
+        """Notify the listeners FLEET_UPDATE_INTERVAL from now, batching updates."""
+        if self._unsub_notify is None and self._listeners:
+            self._unsub_notify = async_call_later(
+                self.hass, FLEET_UPDATE_INTERVAL, self._notify_job
+            )
+
+    @callback
+    def _async_notify(self, _now: object) -> None:
+        """Call the listeners."""
+        self._unsub_notify = None
+        for update_callback in list(self._listeners.values()):
+            update_callback()
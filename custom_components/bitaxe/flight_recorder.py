@@ -0,0 +1,160 @@
+"""Dump and replay of the BitAxe flight recorders."""
+from __future__ import annotations
+
+import asyncio
+import gzip
+from pathlib import Path
+import time
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers.json import json_bytes, json_dumps
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import JSON_DECODE_EXCEPTIONS, json_loads
+
+from .const import DATA_SCHEDULER, TO_REDACT
+from .coordinator import async_get_device_coordinators
+from .files import resolve_service_path
+from .instrumentation import FAILURE_INVALID_PAYLOAD, FlightRecord
+from .models import SystemInfo
+from .scheduler import BitAxeFleetScheduler
+
+DUMP_SUFFIX = ".jsonl.gz"
+
+
+def _dump_line(entry: ConfigEntry, record: FlightRecord) -> dict[str, Any]:
+    """Return the dump line of a record, with the credentials redacted."""
+    line: dict[str, Any] = {
+        "entry_id": entry.entry_id,
+        "name": entry.title,
+        "time": round(record.time, 3),
+    }
+    if record.error is not None:
+        line["error"] = record.error
+        return line
+    try:
+        payload = json_loads(record.payload or b"")
+    except JSON_DECODE_EXCEPTIONS:
+        # What cannot be decoded cannot be redacted either; keep it out
+        line["error"] = FAILURE_INVALID_PAYLOAD
+        return line
+    line["latency"] = round(record.latency or 0, 4)
+    line["payload"] = json_dumps(async_redact_data(payload, TO_REDACT))
+    return line
+
+
+def _write_dump(path: Path, lines: list[dict[str, Any]]) -> None:
+    """Write dump lines as gzipped JSON lines."""
+    with gzip.open(path, "wb") as file:
+        for line in lines:
+            file.write(json_bytes(line) + b"\n")
+
+
+def _read_dump(path: Path) -> list[dict[str, Any]]:
+    """Read the lines of a dump."""
+    with gzip.open(path, "rb") as file:
+        lines = [json_loads(line) for line in file if line.strip()]
+    return [line for line in lines if isinstance(line, dict)]
+
+
+async def async_dump_payloads(
+    hass: HomeAssistant, device_ids: list[str] | None, file_name: str | None
+) -> dict[str, Any]:
+    """Write the flight recorder of some devices to a dump file."""
+    if file_name is None:
+        file_name = (
+            f"bitaxe_flight_recorder_{dt_util.now():%Y%m%d_%H%M%S}{DUMP_SUFFIX}"
+        )
+    path = resolve_service_path(hass, file_name, (DUMP_SUFFIX,))
+
+    lines: list[dict[str, Any]] = []
+    for entry_id, coordinator in async_get_device_coordinators(hass, device_ids).items():
+        entry = hass.config_entries.async_get_entry(entry_id)
+        assert entry is not None
+        lines.extend(
+            _dump_line(entry, record)
+            for record in coordinator.client.flight_recorder.records()
+        )
+    lines.sort(key=lambda line: line["time"])
+    try:
+        await hass.async_add_executor_job(_write_dump, path, lines)
+    except OSError as err:
+        raise ServiceValidationError(f"Cannot write {file_name}: {err}") from err
+    return {"file": str(path), "records": len(lines)}
+
+
+async def async_replay_payloads(
+    hass: HomeAssistant, device_id: str, file_name: str, speed: float
+) -> dict[str, Any]:
+    """Feed a dump through the entities of a device.
+
+    The records of the device itself are replayed if the dump holds any;
+    otherwise the dump must hold a single device. Recorded pauses are
+    shortened by `speed`; 0 replays back to back. Polling and push updates
+    of the device are suspended meanwhile.
+    """
+    path = resolve_service_path(hass, file_name, (DUMP_SUFFIX,))
+    entry_id, coordinator = next(iter(async_get_device_coordinators(hass, [device_id]).items()))
+    if coordinator.replaying:
+        raise ServiceValidationError(f"A replay into {device_id} is already running")
+    try:
+        lines = await hass.async_add_executor_job(_read_dump, path)
+    except (OSError, EOFError, *JSON_DECODE_EXCEPTIONS) as err:
+        raise ServiceValidationError(f"Cannot read {file_name}: {err}") from err
+
+    sources = {line.get("entry_id") for line in lines}
+    if entry_id in sources:
+        lines = [line for line in lines if line.get("entry_id") == entry_id]
+    elif len(sources) > 1:
+        raise ServiceValidationError(
+            f"{file_name} holds several devices; replay it into one of them"
+        )
+
+    scheduler: BitAxeFleetScheduler = hass.data[DATA_SCHEDULER]
+    scheduler.async_remove(entry_id)
+    payloads = failures = 0
+    try:
+        async with coordinator.async_replay():
+            writes_before = coordinator.state_writes_total
+            dispatch_before = coordinator.client.stats.dispatch_time_total
+            started = time.monotonic()
+            previous: float | None = None
+            for line in lines:
+                recorded = line.get("time")
+                if speed and isinstance(recorded, (int, float)):
+                    if previous is not None and recorded > previous:
+                        await asyncio.sleep((recorded - previous) / speed)
+                    previous = recorded
+                else:
+                    # Let the entity writes and anything else queued run in between
+                    await asyncio.sleep(0)
+
+                if isinstance(payload := line.get("payload"), str):
+                    try:
+                        data = SystemInfo.from_json(payload)
+                    except JSON_DECODE_EXCEPTIONS:
+                        data = None
+                    if data is not None:
+                        payloads += 1
+                        coordinator.async_set_updated_data(data)
+                        continue
+                failures += 1
+                coordinator.async_set_update_error(
+                    UpdateFailed(str(line.get("error", "invalid payload")))
+                )
+    finally:
+        scheduler.async_resume(entry_id, coordinator)
+
+    return {
+        "payloads": payloads,
+        "failures": failures,
+        "duration": round(time.monotonic() - started, 3),
+        "state_writes": coordinator.state_writes_total - writes_before,
+        "dispatch_time_ms": round(
+            (coordinator.client.stats.dispatch_time_total - dispatch_before) * 1000, 3
+        ),
+    }
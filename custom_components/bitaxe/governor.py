@@ -0,0 +1,239 @@
+"""Closed-loop thermal governor for BitAxe devices."""
+from __future__ import annotations
+
+from collections import deque
+import logging
+import time
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .capabilities import BitAxeCapabilityStore, fallback_capabilities, option_value
+from .const import (
+    CONF_GOVERNOR_HYSTERESIS,
+    CONF_GOVERNOR_MAX_TEMP,
+    CONF_GOVERNOR_MAX_VR_TEMP,
+    DEFAULT_GOVERNOR_HYSTERESIS,
+    DEFAULT_MAX_TEMP,
+    DEFAULT_MAX_VR_TEMP,
+    EVENT_GOVERNOR_ACTION,
+    GOVERNOR_FAN_HEADROOM,
+    GOVERNOR_HISTORY_SIZE,
+    GOVERNOR_MAX_STEP_UP_INTERVAL,
+    GOVERNOR_STEP_DOWN_INTERVAL,
+    GOVERNOR_STEP_UP_INTERVAL,
+)
+from .ceilings import BitAxeCeilingStore, async_write_settings
+from .coordinator import BitAxeDataUpdateCoordinator
+from .tuning import async_is_tuning
+
+_LOGGER = logging.getLogger(__name__)
+
+ACTION_DOWN = "down"
+ACTION_UP = "up"
+
+# Owner of the governor's holds in the ceiling store
+GOVERNOR = "governor"
+
+
+class BitAxeThermalGovernor:
+    """Step the frequency of a device down when it runs hot, and back up.
+
+    The device's own frequency setting is the ceiling, lowered to what the
+    power budget allows while it holds the device. Above the ASIC or VR
+    limit the governor drops one frequency option at a time, at most every
+    GOVERNOR_STEP_DOWN_INTERVAL. It only climbs back one option once both
+    temperatures are below their limit minus the hysteresis and the fan
+    has headroom, at most every step-up interval. When a climb has to be
+    undone shortly after, the step-up interval doubles, so the governor
+    settles on the highest frequency the device sustains instead of
+    oscillating around it. Every action is logged, kept for diagnostics and
+    fired as an event.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        coordinator: BitAxeDataUpdateCoordinator,
+        capabilities: BitAxeCapabilityStore,
+        store: BitAxeCeilingStore,
+    ) -> None:
+        """Initialize the governor."""
+        self.hass = hass
+        self._entry = entry
+        self._coordinator = coordinator
+        self._capabilities = capabilities
+        self._store = store
+        options = entry.options
+        self.max_temp: float = options.get(CONF_GOVERNOR_MAX_TEMP, DEFAULT_MAX_TEMP)
+        self.max_vr_temp: float = options.get(
+            CONF_GOVERNOR_MAX_VR_TEMP, DEFAULT_MAX_VR_TEMP
+        )
+        self.hysteresis: float = options.get(
+            CONF_GOVERNOR_HYSTERESIS, DEFAULT_GOVERNOR_HYSTERESIS
+        )
+        # Frequency the user set
+        self.ceiling: float | None = None
+        self._last_action: tuple[str, float] | None = None
+        self._step_up_interval = GOVERNOR_STEP_UP_INTERVAL
+        self._busy = False
+        self.actions: deque[dict[str, Any]] = deque(maxlen=GOVERNOR_HISTORY_SIZE)
+        self._unsub: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_start(self) -> None:
+        """Start following the device's temperatures."""
+        self._unsub = self._coordinator.async_add_listener(self._async_evaluate)
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop the governor, leaving the frequency where it is."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state of the governor for diagnostics."""
+        return {
+            "max_temp": self.max_temp,
+            "max_vr_temp": self.max_vr_temp,
+            "hysteresis": self.hysteresis,
+            "ceiling": self.ceiling,
+            "step_up_interval": self._step_up_interval,
+            "actions": list(self.actions),
+        }
+
+    @callback
+    def _async_evaluate(self) -> None:
+        """Decide on one step after each refresh."""
+        coordinator = self._coordinator
+        data = coordinator.data
+        if (
+            self._busy
+            or data is None
+            or not coordinator.last_update_success
+            or coordinator.stale
+            or coordinator.replaying
+            or coordinator.firmware_progress is not None
+            or async_is_tuning(self.hass, self._entry.entry_id)
+        ):
+            return
+        frequency = data.get_number("frequency")
+        temp = data.get_number("temp")
+        vr_temp = data.get_number("vrTemp")
+        if frequency is None or temp is None:
+            return
+        ceiling = self._store.async_observe(self._entry.entry_id, data, GOVERNOR)
+        if ceiling is None:
+            return
+        if ceiling.user["frequency"] != self.ceiling:
+            # Changed by the user: start over from the new ceiling
+            self.ceiling = ceiling.user["frequency"]
+            self._step_up_interval = GOVERNOR_STEP_UP_INTERVAL
+
+        options = sorted(option_value(option) for option in self._frequency_options())
+        lower = [option for option in options if option < frequency]
+        higher = [
+            option
+            for option in options
+            if frequency < option <= ceiling.limit["frequency"]
+        ]
+        since_action = None
+        if self._last_action is not None:
+            since_action = time.monotonic() - self._last_action[1]
+        hot = temp > self.max_temp or (
+            vr_temp is not None and vr_temp > self.max_vr_temp
+        )
+
+        if hot and lower:
+            if since_action is not None and since_action < GOVERNOR_STEP_DOWN_INTERVAL:
+                return
+            if (
+                self._last_action is not None
+                and self._last_action[0] == ACTION_UP
+                and since_action is not None
+                and since_action < 2 * self._step_up_interval
+            ):
+                # The last climb was not sustainable: wait longer next time
+                self._step_up_interval = min(
+                    2 * self._step_up_interval, GOVERNOR_MAX_STEP_UP_INTERVAL
+                )
+            self._async_step(ACTION_DOWN, frequency, lower[-1], temp, vr_temp)
+            return
+
+        fanspeed = data.get_number("fanspeed")
+        cool = temp < self.max_temp - self.hysteresis and (
+            vr_temp is None or vr_temp < self.max_vr_temp - self.hysteresis
+        )
+        if (
+            cool
+            and higher
+            and (fanspeed is None or fanspeed < GOVERNOR_FAN_HEADROOM)
+            and (since_action is None or since_action >= self._step_up_interval)
+        ):
+            self._async_step(ACTION_UP, frequency, higher[0], temp, vr_temp)
+
+    def _frequency_options(self) -> list[str]:
+        """Return the frequency options of the device's ASIC."""
+        data = self._coordinator.data
+        model = data.get("ASICModel") if data else None
+        version = data.get("version") if data else None
+        capabilities = self._capabilities.async_get_cached(model, version)
+        return (capabilities or fallback_capabilities(model)).frequency
+
+    @callback
+    def _async_step(
+        self,
+        action: str,
+        frequency: float,
+        target: float,
+        temp: float,
+        vr_temp: float | None,
+    ) -> None:
+        """Write one frequency step and record it."""
+        self._last_action = (action, time.monotonic())
+        record = {
+            "time": dt_util.utcnow().isoformat(),
+            "action": action,
+            "from": frequency,
+            "to": target,
+            "temp": temp,
+            "vr_temp": vr_temp,
+        }
+        self.actions.append(record)
+        _LOGGER.info(
+            "Thermal governor of %s: frequency %s -> %s MHz "
+            "(ASIC %.1f °C, VR %s °C)",
+            self._entry.title,
+            frequency,
+            target,
+            temp,
+            vr_temp,
+        )
+        self.hass.bus.async_fire(
+            EVENT_GOVERNOR_ACTION,
+            {"entry_id": self._entry.entry_id, "name": self._entry.title, **record},
+        )
+        self._busy = True
+        self._entry.async_create_background_task(
+            self.hass, self._async_write(frequency, target), "bitaxe thermal governor"
+        )
+
+    async def _async_write(self, frequency: float, target: float) -> None:
+        """Send the new frequency to the device."""
+        coordinator = self._coordinator
+        entry_id = self._entry.entry_id
+        self._store.async_hold(
+            entry_id, GOVERNOR, coordinator.data, {"frequency": target}
+        )
+        if not await async_write_settings(
+            coordinator, {"frequency": target}, "thermal governor"
+        ):
+            # Still governed; try again at a later refresh
+            self._store.async_hold(
+                entry_id, GOVERNOR, coordinator.data, {"frequency": frequency}
+            )
+        self._busy = False
@@ -0,0 +1,81 @@
+"""Reachability tracking for BitAxe devices."""
+from __future__ import annotations
+
+import time
+
+from .const import (
+    CIRCUIT_OPEN_THRESHOLD,
+    ERROR_LOG_INTERVAL,
+    MAX_BACKOFF_INTERVAL,
+    MIN_REQUEST_TIMEOUT,
+    REQUEST_TIMEOUT,
+)
+
+
+class DeviceHealth:
+    """Track failures and latency of one device.
+
+    Repeated failures back the poll interval off exponentially and open a
+    circuit: while it is open, polls start with a cheap connection probe and
+    skip the full request if that fails. The request timeout follows the
+    observed latency the way TCP derives its retransmission timeout.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the health tracker."""
+        self.consecutive_failures = 0
+        self.latency_avg: float | None = None
+        self.latency_dev = 0.0
+        self.last_error: str | None = None
+        self.suppressed_errors = 0
+        self._last_error_logged: float | None = None
+
+    @property
+    def circuit_open(self) -> bool:
+        """Return True while requests should wait for a successful probe."""
+        return self.consecutive_failures >= CIRCUIT_OPEN_THRESHOLD
+
+    @property
+    def request_timeout(self) -> float:
+        """Return the timeout for the next request."""
+        if self.latency_avg is None or self.consecutive_failures:
+            return REQUEST_TIMEOUT
+        timeout = self.latency_avg + 4 * self.latency_dev
+        return min(max(timeout, MIN_REQUEST_TIMEOUT), REQUEST_TIMEOUT)
+
+    def poll_interval(self, base: float) -> float:
+        """Return the poll interval, backed off after consecutive failures."""
+        if not self.consecutive_failures:
+            return base
+        return min(base * 2 ** (self.consecutive_failures - 1), MAX_BACKOFF_INTERVAL)
+
+    def record_success(self, latency: float) -> bool:
+        """Record a successful request; return True if the device recovered."""
+        if self.latency_avg is None:
+            self.latency_avg = latency
+            self.latency_dev = latency / 2
+        else:
+            self.latency_dev = 0.75 * self.latency_dev + 0.25 * abs(
+                self.latency_avg - latency
+            )
+            self.latency_avg = 0.875 * self.latency_avg + 0.125 * latency
+        recovered = self.consecutive_failures > 0
+        self.consecutive_failures = 0
+        self.last_error = None
+        self.suppressed_errors = 0
+        self._last_error_logged = None
+        return recovered
+
+    def record_failure(self, error: str) -> bool:
+        """Record a failed request; return True if it should be logged."""
+        self.consecutive_failures += 1
+        self.last_error = error
+        now = time.monotonic()
+        if (
+            self._last_error_logged is None
+            or now - self._last_error_logged >= ERROR_LOG_INTERVAL
+        ):
+            self._last_error_logged = now
+            return True
+        self.suppressed_errors += 1
+        return False
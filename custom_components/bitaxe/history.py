@@ -0,0 +1,230 @@
+"""Import the on-device telemetry history into long-term statistics."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import logging
+import math
+import random
+import time
+from typing import Any
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import UnitOfPower, UnitOfTemperature
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from homeassistant.util import dt as dt_util, slugify
+
+from .api import BitaxeConnectionError, BitaxeNotSupportedError
+from .const import DOMAIN, HISTORY_IMPORT_INTERVAL
+from .coordinator import BitAxeDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Firmware history column → (statistic suffix, name, unit)
+HISTORY_COLUMNS: dict[str, tuple[str, str, str]] = {
+    "hashrate": ("hashrate", "Hash Rate", "GH/s"),
+    "asicTemp": ("asic_temperature", "Temperature ASIC", UnitOfTemperature.CELSIUS),
+    "vrTemp": ("vr_temperature", "Temperature VR", UnitOfTemperature.CELSIUS),
+    "power": ("power", "Power Consumption", UnitOfPower.WATT),
+}
+
+
+class _HourAccumulator:
+    """Mean, min and max of the samples of one hour."""
+
+    __slots__ = ("total", "count", "low", "high")
+
+    def __init__(self) -> None:
+        """Initialize an empty hour."""
+        self.total = 0.0
+        self.count = 0
+        self.low = math.inf
+        self.high = -math.inf
+
+    def add(self, value: float) -> None:
+        """Add a sample."""
+        self.total += value
+        self.count += 1
+        self.low = min(self.low, value)
+        self.high = max(self.high, value)
+
+
+class BitAxeHistoryImporter:
+    """Periodically turn the history kept by the firmware into statistics.
+
+    AxeOS keeps a short, fine-grained history of its telemetry. It is fetched
+    in one request every HISTORY_IMPORT_INTERVAL and folded into hourly
+    buckets. Each hour is imported as external statistics once it is over.
+    Samples are deduplicated by their device timestamp, and hours by the
+    last hour the recorder already holds. Firmware without a history is
+    detected once and left alone.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        coordinator: BitAxeDataUpdateCoordinator,
+    ) -> None:
+        """Initialize the importer."""
+        self.hass = hass
+        self._coordinator = coordinator
+        self._device_name = entry.data.get("device_name", "BitAxe Miner")
+        self._statistic_prefix = f"{DOMAIN}:{slugify(entry.entry_id)}"
+        self._hours: dict[str, dict[int, _HourAccumulator]] = {
+            column: {} for column in HISTORY_COLUMNS
+        }
+        self._last_imported: dict[str, float | None] = {}
+        self._last_sample = -1
+        self._last_device_time = -1
+        self._unsubs: list[CALLBACK_TYPE] = []
+
+    @callback
+    def async_start(self) -> None:
+        """Start importing, spreading the fleet over the import interval."""
+
+        @callback
+        def _async_start_interval(_now: datetime) -> None:
+            self._unsubs.append(
+                async_track_time_interval(
+                    self.hass,
+                    self._async_import,
+                    timedelta(seconds=HISTORY_IMPORT_INTERVAL),
+                    name=f"bitaxe history {self._coordinator.client.host}",
+                )
+            )
+            self.hass.async_create_task(self._async_import())
+
+        self._unsubs.append(
+            async_call_later(
+                self.hass,
+                random.uniform(0, HISTORY_IMPORT_INTERVAL),
+                _async_start_interval,
+            )
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop importing."""
+        while self._unsubs:
+            self._unsubs.pop()()
+
+    async def _async_import(self, _now: datetime | None = None) -> None:
+        """Fetch the device history and import the hours that are complete."""
+        try:
+            data = await self._coordinator.client.async_get_statistics(HISTORY_COLUMNS)
+        except BitaxeNotSupportedError:
+            _LOGGER.debug(
+                "BitAxe %s keeps no history, not importing statistics",
+                self._coordinator.client.host,
+            )
+            self.async_stop()
+            return
+        except BitaxeConnectionError as err:
+            _LOGGER.debug(
+                "Error fetching history from BitAxe %s: %s",
+                self._coordinator.client.host,
+                err,
+            )
+            return
+
+        self._async_add_samples(data)
+        await self._async_import_complete_hours()
+
+    @callback
+    def _async_add_samples(self, data: dict[str, Any]) -> None:
+        """Fold the samples not seen before into their hours."""
+        labels = data.get("labels")
+        rows = data.get("statistics")
+        device_time = data.get("currentTimestamp")
+        if (
+            not isinstance(labels, list)
+            or not isinstance(rows, list)
+            or not isinstance(device_time, (int, float))
+            or "timestamp" not in labels
+        ):
+            return
+        if device_time < self._last_device_time:
+            # The device rebooted and its clock started over
+            self._last_sample = -1
+        self._last_device_time = device_time
+
+        timestamp_index = labels.index("timestamp")
+        columns = [
+            (index, self._hours[label])
+            for index, label in enumerate(labels)
+            if label in self._hours
+        ]
+        now = time.time()
+        for row in rows:
+            if not isinstance(row, list) or len(row) != len(labels):
+                continue
+            sample_time = row[timestamp_index]
+            if not isinstance(sample_time, (int, float)):
+                continue
+            if sample_time <= self._last_sample:
+                continue
+            wall_time = now - (device_time - sample_time) / 1000
+            hour = int(wall_time // 3600) * 3600
+            for index, hours in columns:
+                value = row[index]
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    if (accumulator := hours.get(hour)) is None:
+                        accumulator = hours[hour] = _HourAccumulator()
+                    accumulator.add(value)
+            self._last_sample = max(self._last_sample, sample_time)
+
+    async def _async_import_complete_hours(self) -> None:
+        """Import the hours that are over and not in the recorder yet."""
+        current_hour = int(time.time() // 3600) * 3600
+        for column, hours in self._hours.items():
+            complete = sorted(hour for hour in hours if hour < current_hour)
+            if not complete:
+                continue
+            suffix, name, unit = HISTORY_COLUMNS[column]
+            statistic_id = f"{self._statistic_prefix}_{suffix}"
+            last_imported = await self._async_get_last_imported(statistic_id)
+            statistics: list[StatisticData] = []
+            for hour in complete:
+                accumulator = hours.pop(hour)
+                if last_imported is not None and hour <= last_imported:
+                    continue
+                statistics.append(
+                    StatisticData(
+                        start=dt_util.utc_from_timestamp(hour),
+                        mean=accumulator.total / accumulator.count,
+                        min=accumulator.low,
+                        max=accumulator.high,
+                    )
+                )
+            if not statistics:
+                continue
+            async_add_external_statistics(
+                self.hass,
+                StatisticMetaData(
+                    has_mean=True,
+                    has_sum=False,
+                    name=f"{self._device_name} {name}",
+                    source=DOMAIN,
+                    statistic_id=statistic_id,
+                    unit_of_measurement=unit,
+                ),
+                statistics,
+            )
+            self._last_imported[statistic_id] = complete[-1]
+
+    async def _async_get_last_imported(self, statistic_id: str) -> float | None:
+        """Return the start of the last hour the recorder holds."""
+        if statistic_id not in self._last_imported:
+            last = await get_instance(self.hass).async_add_executor_job(
+                get_last_statistics, self.hass, 1, statistic_id, False, {"mean"}
+            )
+            rows = last.get(statistic_id)
+            self._last_imported[statistic_id] = rows[0]["start"] if rows else None
+        return self._last_imported[statistic_id]
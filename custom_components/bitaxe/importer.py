@@ -0,0 +1,135 @@
+"""Bulk import of BitAxe devices from an inventory file."""
+from __future__ import annotations
+
+import asyncio
+import csv
+import ipaddress
+import logging
+from pathlib import Path
+from typing import Any
+
+from homeassistant import config_entries
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util.yaml import load_yaml
+
+from .api import async_discover_devices
+from .const import DOMAIN, IMPORT_TIMEOUT
+from .files import resolve_service_path
+
+_LOGGER = logging.getLogger(__name__)
+
+# Column and key names accepted for each field of an inventory row
+_IP_ADDRESS_KEYS = ("ip_address", "ip", "host")
+_DEVICE_NAME_KEYS = ("device_name", "name")
+
+STATUS_ADDED = "added"
+STATUS_ALREADY_CONFIGURED = "already_configured"
+STATUS_DUPLICATE = "duplicate"
+STATUS_INVALID = "invalid"
+STATUS_UNREACHABLE = "unreachable"
+
+
+def _field(row: dict[str, Any], keys: tuple[str, ...]) -> str:
+    """Return the first non-empty field of a row among `keys`."""
+    for key in keys:
+        if (value := row.get(key)) not in (None, ""):
+            return str(value).strip()
+    return ""
+
+
+def _read_inventory(path: Path) -> list[dict[str, Any]]:
+    """Read the rows of a CSV or YAML inventory file.
+
+    CSV files need a header row. YAML files hold a list of mappings or of
+    plain addresses, optionally under a `devices` key.
+    """
+    if path.suffix.lower() == ".csv":
+        with path.open(newline="", encoding="utf-8-sig") as file:
+            return [
+                {key.strip().lower(): value for key, value in row.items() if key}
+                for row in csv.DictReader(file)
+            ]
+
+    data = load_yaml(str(path))
+    if isinstance(data, dict):
+        data = data.get("devices")
+    if not isinstance(data, list):
+        raise HomeAssistantError("expected a list of devices")
+    return [row if isinstance(row, dict) else {"ip_address": row} for row in data]
+
+
+async def async_import_devices(hass: HomeAssistant, file_name: str) -> dict[str, Any]:
+    """Validate every device of an inventory file and create its entry.
+
+    All devices are probed concurrently. Instead of stopping at the first bad
+    row, the result reports the outcome of each device.
+    """
+    path = resolve_service_path(hass, file_name, (".csv", ".yaml", ".yml"))
+    try:
+        rows = await hass.async_add_executor_job(_read_inventory, path)
+    except (OSError, HomeAssistantError, csv.Error) as err:
+        raise ServiceValidationError(f"Cannot read {file_name}: {err}") from err
+
+    configured = {
+        entry.unique_id for entry in hass.config_entries.async_entries(DOMAIN)
+    }
+    results: list[dict[str, Any]] = []
+    to_probe: dict[str, dict[str, Any]] = {}
+    for row in rows:
+        result = {
+            "ip_address": _field(row, _IP_ADDRESS_KEYS),
+            "device_name": _field(row, _DEVICE_NAME_KEYS),
+        }
+        results.append(result)
+        try:
+            ipaddress.ip_address(result["ip_address"])
+        except ValueError:
+            result["status"] = STATUS_INVALID
+            result["error"] = "invalid IP address"
+            continue
+        if result["ip_address"] in configured:
+            result["status"] = STATUS_ALREADY_CONFIGURED
+        elif result["ip_address"] in to_probe:
+            result["status"] = STATUS_DUPLICATE
+        else:
+            to_probe[result["ip_address"]] = result
+
+    found = await async_discover_devices(
+        async_get_clientsession(hass), to_probe, timeout=IMPORT_TIMEOUT
+    )
+
+    async def _async_add(result: dict[str, Any]) -> None:
+        ip_address = result["ip_address"]
+        if (info := found.get(ip_address)) is None:
+            result["status"] = STATUS_UNREACHABLE
+            result["error"] = "no BitAxe answered at this address"
+            return
+        if not result["device_name"]:
+            result["device_name"] = info.get("hostname", ip_address)
+        flow = await hass.config_entries.flow.async_init(
+            DOMAIN,
+            context={"source": config_entries.SOURCE_IMPORT},
+            data={"ip_address": ip_address, "device_name": result["device_name"]},
+        )
+        if flow["type"] == FlowResultType.CREATE_ENTRY:
+            result["status"] = STATUS_ADDED
+        else:
+            result["status"] = STATUS_ALREADY_CONFIGURED
+
+    await asyncio.gather(*(_async_add(result) for result in to_probe.values()))
+
+    added = sum(result["status"] == STATUS_ADDED for result in results)
+    failed = sum(
+        result["status"] in (STATUS_INVALID, STATUS_UNREACHABLE) for result in results
+    )
+    _LOGGER.info(
+        "Imported %d of %d BitAxe devices from %s (%d failed)",
+        added,
+        len(results),
+        file_name,
+        failed,
+    )
+    return {"added": added, "failed": failed, "devices": results}
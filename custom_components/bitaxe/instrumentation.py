@@ -0,0 +1,207 @@
+"""Poll instrumentation for the BitAxe integration."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter, deque
+from datetime import datetime
+import time
+from typing import Any, NamedTuple
+
+import aiohttp
+from homeassistant.util import dt as dt_util
+
+from .const import FLIGHT_RECORDER_SIZE, LATENCY_BUCKETS
+
+FAILURE_TIMEOUT = "timeout"
+FAILURE_CONNECTION = "connection"
+FAILURE_DISCONNECTED = "disconnected"
+FAILURE_INVALID_PAYLOAD = "invalid_payload"
+FAILURE_UNREACHABLE = "unreachable"
+FAILURE_OTHER = "other"
+
+
+def failure_kind(err: BaseException) -> str:
+    """Classify the error a request failed with."""
+    if isinstance(err, TimeoutError):
+        return FAILURE_TIMEOUT
+    if isinstance(err, aiohttp.ClientResponseError):
+        return f"http_{err.status}"
+    if isinstance(err, aiohttp.ClientConnectionError):
+        if isinstance(err, aiohttp.ServerDisconnectedError):
+            return FAILURE_DISCONNECTED
+        return FAILURE_CONNECTION
+    if isinstance(err, aiohttp.ClientPayloadError):
+        return FAILURE_INVALID_PAYLOAD
+    return FAILURE_OTHER
+
+
+def milliseconds(seconds: float | None) -> float | None:
+    """Convert a duration in seconds to milliseconds for display."""
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+class LatencyHistogram:
+    """Count latencies in the fixed buckets of LATENCY_BUCKETS.
+
+    The last bucket catches everything above the largest bound, so the
+    histogram takes constant space however many polls it sees.
+    """
+
+    __slots__ = ("counts", "total")
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0
+
+    def add(self, latency: float) -> None:
+        """Count a latency in seconds."""
+        self.counts[bisect_left(LATENCY_BUCKETS, latency)] += 1
+        self.total += 1
+
+    def quantile(self, q: float) -> float | None:
+        """Return the upper bound of the bucket holding the q-quantile.
+
+        Latencies beyond the largest bound report that bound.
+        """
+        if not self.total:
+            return None
+        rank = q * self.total
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return LATENCY_BUCKETS[-1]
+
+    def as_dict(self) -> dict[str, int]:
+        """Return the bucket counts keyed by their upper bound in ms."""
+        labels = [f"<={bound * 1000:g}ms" for bound in LATENCY_BUCKETS]
+        labels.append(f">{LATENCY_BUCKETS[-1] * 1000:g}ms")
+        return dict(zip(labels, self.counts))
+
+
+class PollStats:
+    """Record how the polls of one device perform.
+
+    Request latency excludes the wait for the client lock, so it measures
+    the device and the network. Parse and dispatch times measure the event
+    loop time a poll costs the integration.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty statistics."""
+        self.latency = LatencyHistogram()
+        self.last_latency: float | None = None
+        self.last_payload_bytes: int | None = None
+        self.payload_bytes_total = 0
+        self.last_parse_time: float | None = None
+        self.parse_time_total = 0.0
+        self.last_dispatch_time: float | None = None
+        self.dispatch_time_total = 0.0
+        self.polls = 0
+        self.failures: Counter[str] = Counter()
+        self.last_success: datetime | None = None
+        self.last_failure: datetime | None = None
+
+    @property
+    def failures_total(self) -> int:
+        """Return the number of failed polls."""
+        return self.failures.total()
+
+    def record_response(self, latency: float, payload_bytes: int) -> None:
+        """Record a poll the device answered."""
+        self.latency.add(latency)
+        self.last_latency = latency
+        self.last_payload_bytes = payload_bytes
+        self.payload_bytes_total += payload_bytes
+
+    def record_parse(self, duration: float) -> None:
+        """Record the time spent decoding a payload, completing a poll."""
+        self.last_parse_time = duration
+        self.parse_time_total += duration
+        self.polls += 1
+        self.last_success = dt_util.utcnow()
+
+    def record_dispatch(self, duration: float) -> None:
+        """Record the time spent updating entities after a poll."""
+        self.last_dispatch_time = duration
+        self.dispatch_time_total += duration
+
+    def record_failure(self, kind: str) -> None:
+        """Record a failed poll."""
+        self.failures[kind] += 1
+        self.last_failure = dt_util.utcnow()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics for diagnostics."""
+        now = dt_util.utcnow()
+        polls = self.polls
+        parse_time_mean = self.parse_time_total / polls if polls else None
+        return {
+            "polls": polls,
+            "failures": dict(self.failures),
+            "seconds_since_last_success": (
+                None
+                if self.last_success is None
+                else round((now - self.last_success).total_seconds(), 1)
+            ),
+            "last_success": self.last_success,
+            "last_failure": self.last_failure,
+            "latency_ms": {
+                "last": milliseconds(self.last_latency),
+                "p50": milliseconds(self.latency.quantile(0.5)),
+                "p95": milliseconds(self.latency.quantile(0.95)),
+                "histogram": self.latency.as_dict(),
+            },
+            "payload_bytes": {
+                "last": self.last_payload_bytes,
+                "mean": round(self.payload_bytes_total / polls) if polls else None,
+            },
+            "parse_time_ms": {
+                "last": milliseconds(self.last_parse_time),
+                "mean": milliseconds(parse_time_mean),
+                "total": milliseconds(self.parse_time_total),
+            },
+            "dispatch_time_ms": {
+                "last": milliseconds(self.last_dispatch_time),
+                "total": milliseconds(self.dispatch_time_total),
+            },
+        }
+
+
+class FlightRecord(NamedTuple):
+    """One poll as the device answered it."""
+
+    time: float  # seconds since the epoch
+    latency: float | None
+    payload: bytes | None
+    error: str | None
+
+
+class FlightRecorder:
+    """Keep the last FLIGHT_RECORDER_SIZE polls of a device, raw.
+
+    Payloads are kept as the bytes the device sent and only decoded when
+    dumped, so recording a poll costs no more than appending to a deque.
+    """
+
+    def __init__(self, size: int = FLIGHT_RECORDER_SIZE) -> None:
+        """Initialize an empty recorder."""
+        self._records: deque[FlightRecord] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        """Return the number of records held."""
+        return len(self._records)
+
+    def record(self, latency: float, payload: bytes) -> None:
+        """Record a payload the device sent."""
+        self._records.append(FlightRecord(time.time(), latency, payload, None))
+
+    def record_failure(self, error: str) -> None:
+        """Record a poll that failed."""
+        self._records.append(FlightRecord(time.time(), None, None, error))
+
+    def records(self) -> list[FlightRecord]:
+        """Return the records, oldest first."""
+        return list(self._records)
@@ -0,0 +1,98 @@
+"""Data models for the BitAxe integration."""
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+from homeassistant.util.json import json_loads
+import orjson
+
+from .const import SYSTEM_INFO_KEYS
+
+_INDEX: dict[str, int] = {key: index for index, key in enumerate(SYSTEM_INFO_KEYS)}
+
+
+class SystemInfo(Mapping[str, Any]):
+    """Fixed-layout record of the system info fields the integration uses.
+
+    Values are kept in one tuple ordered like SYSTEM_INFO_KEYS, shared layout
+    across all devices. A field the device did not report is None and is
+    treated as absent. Every other field of the payload is dropped at parse
+    time.
+    """
+
+    __slots__ = ("_values",)
+
+    def __init__(self, values: tuple[Any, ...]) -> None:
+        """Initialize the record."""
+        self._values = values
+
+    @classmethod
+    def from_json(cls, body: bytes | str) -> SystemInfo:
+        """Decode a system info payload, keeping only the projected fields.
+
+        Raises orjson.JSONDecodeError, one of JSON_DECODE_EXCEPTIONS, if the
+        payload is not a JSON object.
+        """
+        data = json_loads(body)
+        if not isinstance(data, dict):
+            raise orjson.JSONDecodeError("Expected a JSON object", "", 0)
+        return cls.from_dict(data)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> SystemInfo:
+        """Project a mapping onto the record layout."""
+        return cls(tuple(data.get(key) for key in SYSTEM_INFO_KEYS))
+
+    def replace(self, changes: Mapping[str, Any]) -> SystemInfo:
+        """Return a copy with some fields changed; unknown fields are ignored."""
+        values = list(self._values)
+        for key, value in changes.items():
+            if (index := _INDEX.get(key)) is not None:
+                values[index] = value
+        return SystemInfo(tuple(values))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a field, or `default` if it is absent."""
+        if (index := _INDEX.get(key)) is None:
+            return default
+        value = self._values[index]
+        return default if value is None else value
+
+    def get_number(self, key: str) -> float | None:
+        """Return a numeric field as float, or None if it is absent or not a number."""
+        value = self.get(key)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+        return None
+
+    def __getitem__(self, key: str) -> Any:
+        """Return a field."""
+        if (value := self.get(key)) is None:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the fields that are present."""
+        return (
+            key
+            for key, value in zip(SYSTEM_INFO_KEYS, self._values)
+            if value is not None
+        )
+
+    def __len__(self) -> int:
+        """Return the number of fields that are present."""
+        return sum(value is not None for value in self._values)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare records field by field."""
+        if isinstance(other, SystemInfo):
+            return self._values == other._values
+        return super().__eq__(other)
+
+    def __repr__(self) -> str:
+        """Return the present fields."""
+        return f"SystemInfo({dict(self)!r})"
+
+
+EMPTY_SYSTEM_INFO = SystemInfo.from_dict({})
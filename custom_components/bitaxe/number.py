@@ -13,7 +13,7 @@ from homeassistant.const import EntityCategory
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN
+from .const import DOMAIN, TIER_CONFIG
 from .entity import BitAxeEntity
 
 
@@ -70,6 +70,7 @@ class BitAxeNumber(BitAxeEntity, NumberEntity):
     """Representation of a BitAxe number entity."""
 
     entity_description: BitAxeNumberEntityDescription
+    _refresh_tier = TIER_CONFIG
 
     def __init__(
         self,
@@ -78,7 +79,7 @@ class BitAxeNumber(BitAxeEntity, NumberEntity):
         entry: ConfigEntry,
     ) -> None:
         """Initialize the number entity."""
-        super().__init__(coordinator, entry)
+        super().__init__(coordinator, entry, (description.api_key,))
         self.entity_description = description
         self._attr_unique_id = f"{entry.entry_id}_{description.key}"
 
@@ -91,10 +92,6 @@ class BitAxeNumber(BitAxeEntity, NumberEntity):
 
     async def async_set_native_value(self, value: float) -> None:
         """Set the value via PATCH."""
-        from . import patch_bitaxe_system
-
-        ip_address = self._entry.data["ip_address"]
-        await patch_bitaxe_system(
-            self.hass, ip_address, {self.entity_description.api_key: int(value)}
+        await self.coordinator.async_write(
+            {self.entity_description.api_key: int(value)}
         )
-        await self.coordinator.async_request_refresh()
@@ -0,0 +1,477 @@
+"""Fleet power budget shared across BitAxe devices."""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+import heapq
+import logging
+import time
+from typing import Any, NamedTuple
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import (
+    ATTR_UNIT_OF_MEASUREMENT,
+    STATE_UNAVAILABLE,
+    STATE_UNKNOWN,
+    UnitOfPower,
+)
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.event import (
+    async_track_state_change_event,
+    async_track_time_interval,
+)
+from homeassistant.util import dt as dt_util
+
+from .capabilities import BitAxeCapabilityStore, fallback_capabilities, option_value
+from .ceilings import BitAxeCeilingStore, async_write_settings
+from .const import (
+    CONF_POWER_BUDGET,
+    CONF_POWER_BUDGET_ENTITY,
+    DOMAIN,
+    POWER_BUDGET_COOLDOWN,
+    POWER_BUDGET_HEADROOM,
+    POWER_BUDGET_INTERVAL,
+    POWER_BUDGET_MAX_PARALLEL_WRITES,
+    POWER_BUDGET_MIN_GAIN,
+    POWER_BUDGET_SETTLE_TIME,
+)
+from .coordinator import BitAxeDataUpdateCoordinator
+from .tuning import POINT_STABLE, BitAxeTuner, async_get_tuner, async_is_tuning
+
+_LOGGER = logging.getLogger(__name__)
+
+# Owner of the power budget's holds in the ceiling store
+POWER_BUDGET = "power_budget"
+
+SOURCE_ENTITY = "entity"
+SOURCE_FIXED = "fixed"
+
+
+class _Rung(NamedTuple):
+    """An operating point of a device with its expected draw and hash rate."""
+
+    settings: dict[str, float]
+    power: float
+    hashrate: float
+
+
+class _DeviceState:
+    """What the controller remembers about one device."""
+
+    def __init__(self) -> None:
+        """Initialize the state of a device the controller has not touched."""
+        self.written_at: float | None = None
+        self.expected_power = 0.0
+
+
+def _upper_hull(rungs: list[_Rung]) -> list[_Rung]:
+    """Return the rungs on the upper concave hull of hash rate over power.
+
+    Along the hull every step up buys less hash rate per watt than the one
+    before, which is what makes the greedy allocation optimal.
+    """
+    hull: list[_Rung] = []
+    for rung in sorted(rungs, key=lambda rung: (rung.power, -rung.hashrate)):
+        if hull and rung.hashrate <= hull[-1].hashrate:
+            continue
+        while len(hull) >= 2:
+            first, second = hull[-2], hull[-1]
+            # Drop the middle point if it lies below the line first -> rung
+            if (second.hashrate - first.hashrate) * (rung.power - first.power) <= (
+                rung.hashrate - first.hashrate
+            ) * (second.power - first.power):
+                hull.pop()
+            else:
+                break
+        hull.append(rung)
+    return hull
+
+
+def _allocate(ladders: dict[str, list[_Rung]], budget: float) -> dict[str, int]:
+    """Pick a rung per device maximizing the total hash rate within a budget.
+
+    Every device starts on its lowest rung. The step with the most hash rate
+    per extra watt across the fleet is taken next, as long as it fits, so
+    the budget goes to the most efficient devices first.
+    """
+    allocation = {entry_id: 0 for entry_id in ladders}
+    remaining = budget - sum(ladder[0].power for ladder in ladders.values())
+    steps: list[tuple[float, str]] = []
+
+    def _push(entry_id: str) -> None:
+        ladder = ladders[entry_id]
+        index = allocation[entry_id]
+        if index + 1 < len(ladder):
+            low, high = ladder[index], ladder[index + 1]
+            extra = high.power - low.power
+            if extra > 0:
+                gain = (high.hashrate - low.hashrate) / extra
+            else:
+                gain = float("inf")
+            heapq.heappush(steps, (-gain, entry_id))
+
+    for entry_id in ladders:
+        _push(entry_id)
+    while steps:
+        _, entry_id = heapq.heappop(steps)
+        ladder = ladders[entry_id]
+        index = allocation[entry_id]
+        extra = ladder[index + 1].power - ladder[index].power
+        if extra > remaining:
+            # Later steps of this device are dearer; a smaller one may fit
+            continue
+        remaining -= extra
+        allocation[entry_id] = index + 1
+        _push(entry_id)
+    return allocation
+
+
+class BitAxePowerBudgetController:
+    """Keep the fleet under a power budget with as much hash rate as possible.
+
+    The budget is a fixed wattage or the state of another entity, such as
+    the solar surplus. Every POWER_BUDGET_INTERVAL the controller builds a
+    ladder of operating points per device, from its lowest frequency up to
+    the settings the user chose. Points measured by autotune are used as
+    they are; the others are extrapolated from the live power and hash
+    rate. The budget is then handed out step by step to the device that
+    gains the most hash rate per watt.
+
+    Devices that are offline, being tuned, still settling after a change or
+    held lower by the thermal governor count with their current draw.
+    Changes are written in parallel batches, the ones that lower the draw
+    first. Settings changed by the user become that device's new ceiling.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        capabilities: BitAxeCapabilityStore,
+        store: BitAxeCeilingStore,
+    ) -> None:
+        """Initialize the controller."""
+        self.hass = hass
+        self._entry = entry
+        self._capabilities = capabilities
+        self._store = store
+        self.fixed_budget: float | None = entry.options.get(CONF_POWER_BUDGET) or None
+        self.budget_entity: str | None = entry.options.get(CONF_POWER_BUDGET_ENTITY)
+        self._devices: dict[str, _DeviceState] = {}
+        self._debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=POWER_BUDGET_COOLDOWN,
+            immediate=True,
+            function=self._async_run,
+        )
+        self.last_run: dict[str, Any] | None = None
+        self._over_budget = False
+        self._unsubs: list[CALLBACK_TYPE] = []
+
+    @callback
+    def async_start(self) -> None:
+        """Start following the budget and the fleet."""
+
+        @callback
+        def _async_schedule(_event_or_now: Event | datetime) -> None:
+            self._debouncer.async_schedule_call()
+
+        self._unsubs.append(
+            async_track_time_interval(
+                self.hass,
+                _async_schedule,
+                timedelta(seconds=POWER_BUDGET_INTERVAL),
+                name="bitaxe power budget",
+            )
+        )
+        if self.budget_entity is not None:
+            self._unsubs.append(
+                async_track_state_change_event(
+                    self.hass, self.budget_entity, _async_schedule
+                )
+            )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop the controller, leaving every device where it is."""
+        while self._unsubs:
+            self._unsubs.pop()()
+        self._debouncer.async_shutdown()
+
+    @property
+    def budget(self) -> tuple[float | None, str | None]:
+        """Return the current budget in W and where it came from."""
+        if self.budget_entity is not None and (
+            state := self.hass.states.get(self.budget_entity)
+        ) is not None and state.state not in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+            try:
+                value = float(state.state)
+            except ValueError:
+                pass
+            else:
+                unit = state.attributes.get(ATTR_UNIT_OF_MEASUREMENT)
+                if unit == UnitOfPower.KILO_WATT:
+                    value *= 1000
+                return max(value, 0.0), SOURCE_ENTITY
+        if self.fixed_budget is not None:
+            return self.fixed_budget, SOURCE_FIXED
+        return None, None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state of the controller for diagnostics."""
+        budget, source = self.budget
+        return {
+            "budget": budget,
+            "source": source,
+            "fixed_budget": self.fixed_budget,
+            "budget_entity": self.budget_entity,
+            "last_run": self.last_run,
+            "devices": {
+                entry_id: state
+                for entry_id in self._devices
+                if (state := self._store.async_get(entry_id)) is not None
+            },
+        }
+
+    async def _async_run(self) -> None:
+        """Share the budget out and write the settings that changed."""
+        budget, source = self.budget
+        if budget is None:
+            # The budget entity is unavailable and there is no fixed budget
+            return
+        coordinators: dict[str, BitAxeDataUpdateCoordinator] = self.hass.data.get(
+            DOMAIN, {}
+        )
+        for entry_id in set(self._devices) - set(coordinators):
+            self._devices.pop(entry_id)
+        tuner = await async_get_tuner(self.hass)
+        now = time.monotonic()
+
+        measured = 0.0
+        fixed_load = 0.0
+        current_hashrate = 0.0
+        ladders: dict[str, list[_Rung]] = {}
+        current: dict[str, _Rung] = {}
+        for entry_id, coordinator in coordinators.items():
+            data = coordinator.data
+            if (
+                data is None
+                or not coordinator.last_update_success
+                or coordinator.stale
+            ):
+                continue
+            power = data.get_number("power") or 0.0
+            measured += power
+            current_hashrate += data.get_number("hashRate") or 0.0
+            device = self._devices.setdefault(entry_id, _DeviceState())
+            if (
+                coordinator.replaying
+                or coordinator.firmware_progress is not None
+                or async_is_tuning(self.hass, entry_id)
+                or (
+                    device.written_at is not None
+                    and now - device.written_at < POWER_BUDGET_SETTLE_TIME
+                )
+            ):
+                # Its draw may still rise to what was planned for it
+                fixed_load += max(power, device.expected_power)
+                continue
+            ladder = self._async_ladder(entry_id, coordinator, tuner)
+            if ladder is None:
+                fixed_load += power
+                continue
+            ladders[entry_id] = ladder
+            current[entry_id] = _Rung(
+                {
+                    "frequency": data.get_number("frequency") or 0.0,
+                    "coreVoltage": data.get_number("coreVoltage") or 0.0,
+                },
+                power,
+                data.get_number("hashRate") or 0.0,
+            )
+
+        target = budget * (1 - POWER_BUDGET_HEADROOM) - fixed_load
+        allocation = _allocate(ladders, target)
+        planned = {
+            entry_id: ladders[entry_id][index] for entry_id, index in allocation.items()
+        }
+        planned_power = fixed_load + sum(rung.power for rung in planned.values())
+        planned_hashrate = sum(rung.hashrate for rung in planned.values())
+        minimum = fixed_load + sum(ladder[0].power for ladder in ladders.values())
+        over_budget = minimum > budget
+        if over_budget and not self._over_budget:
+            _LOGGER.warning(
+                "The BitAxe fleet needs %.0f W at its lowest settings, "
+                "more than the power budget of %.0f W",
+                minimum,
+                budget,
+            )
+        self._over_budget = over_budget
+
+        changes = {
+            entry_id: rung
+            for entry_id, rung in planned.items()
+            if rung.settings != current[entry_id].settings
+        }
+        controlled_hashrate = sum(rung.hashrate for rung in current.values())
+        # Only rebalance for a real gain, so noisy readings do not cause churn
+        if (
+            measured <= budget
+            and planned_hashrate - controlled_hashrate
+            < POWER_BUDGET_MIN_GAIN * current_hashrate
+        ):
+            changes = {}
+
+        self.last_run = {
+            "time": dt_util.utcnow().isoformat(),
+            "budget": budget,
+            "source": source,
+            "measured_power": round(measured, 2),
+            "planned_power": round(planned_power, 2),
+            "hashrate": round(current_hashrate, 2),
+            "planned_hashrate": round(
+                current_hashrate - controlled_hashrate + planned_hashrate, 2
+            ),
+            "over_budget": over_budget,
+            "controlled": len(ladders),
+            "changes": len(changes),
+        }
+        if not changes:
+            return
+        _LOGGER.info(
+            "Power budget %.0f W: %.0f W measured, changing %d device(s) for %.0f W",
+            budget,
+            measured,
+            len(changes),
+            planned_power,
+        )
+        # Lower the draw before raising it, so the fleet stays under budget
+        await self._async_apply(
+            coordinators,
+            current,
+            {
+                entry_id: rung
+                for entry_id, rung in changes.items()
+                if rung.power < current[entry_id].power
+            },
+        )
+        await self._async_apply(
+            coordinators,
+            current,
+            {
+                entry_id: rung
+                for entry_id, rung in changes.items()
+                if rung.power >= current[entry_id].power
+            },
+        )
+
+    @callback
+    def _async_ladder(
+        self,
+        entry_id: str,
+        coordinator: BitAxeDataUpdateCoordinator,
+        tuner: BitAxeTuner,
+    ) -> list[_Rung] | None:
+        """Return the operating points of a device up to the user's settings."""
+        data = coordinator.data
+        assert data is not None
+        frequency = data.get_number("frequency")
+        voltage = data.get_number("coreVoltage")
+        power = data.get_number("power")
+        hashrate = data.get_number("hashRate")
+        if not frequency or not voltage or not power or hashrate is None:
+            return None
+        limits = self._store.async_observe(entry_id, data, POWER_BUDGET)
+        if limits is None or limits.limit != limits.user:
+            # Held lower by the thermal governor; leave the device to it
+            return None
+        ceiling = limits.user
+
+        def _estimate(settings: dict[str, float]) -> _Rung:
+            # Dynamic power scales with frequency and the square of the voltage
+            return _Rung(
+                settings,
+                power
+                * settings["frequency"]
+                / frequency
+                * (settings["coreVoltage"] / voltage) ** 2,
+                hashrate * settings["frequency"] / frequency,
+            )
+
+        rungs = [_estimate(ceiling)]
+        rungs.append(
+            _Rung({"frequency": frequency, "coreVoltage": voltage}, power, hashrate)
+        )
+        result = tuner.async_get_result(entry_id)
+        tuned = [
+            point
+            for point in (result or {}).get("points", [])
+            if point.get("status") == POINT_STABLE
+            and option_value(point["frequency"]) < ceiling["frequency"]
+        ]
+        if tuned:
+            rungs.extend(
+                _Rung(
+                    {
+                        "frequency": option_value(point["frequency"]),
+                        "coreVoltage": option_value(point["voltage"]),
+                    },
+                    point["power"],
+                    point["hashrate"],
+                )
+                for point in tuned
+            )
+        else:
+            model = data.get("ASICModel")
+            capabilities = self._capabilities.async_get_cached(
+                model, data.get("version")
+            ) or fallback_capabilities(model)
+            rungs.extend(
+                _estimate(
+                    {
+                        "frequency": option_value(option),
+                        "coreVoltage": ceiling["coreVoltage"],
+                    }
+                )
+                for option in capabilities.frequency
+                if option_value(option) < ceiling["frequency"]
+            )
+        return _upper_hull(rungs)
+
+    async def _async_apply(
+        self,
+        coordinators: dict[str, BitAxeDataUpdateCoordinator],
+        current: dict[str, _Rung],
+        changes: dict[str, _Rung],
+    ) -> None:
+        """Write a batch of changes, a few devices at a time."""
+        semaphore = asyncio.Semaphore(POWER_BUDGET_MAX_PARALLEL_WRITES)
+
+        async def _async_write(entry_id: str, rung: _Rung) -> None:
+            settings = {
+                key: value
+                for key, value in rung.settings.items()
+                if value != current[entry_id].settings.get(key)
+            }
+            coordinator = coordinators[entry_id]
+            async with semaphore:
+                self._store.async_hold(
+                    entry_id, POWER_BUDGET, coordinator.data, rung.settings
+                )
+                written = await async_write_settings(
+                    coordinator, settings, "power budget"
+                )
+            if not written:
+                self._store.async_hold(
+                    entry_id, POWER_BUDGET, coordinator.data, current[entry_id].settings
+                )
+                return
+            device = self._devices[entry_id]
+            device.written_at = time.monotonic()
+            device.expected_power = rung.power
+
+        await asyncio.gather(
+            *(_async_write(entry_id, rung) for entry_id, rung in changes.items())
+        )
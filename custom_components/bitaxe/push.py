@@ -0,0 +1,164 @@
+"""WebSocket push updates for the BitAxe integration."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+import logging
+import random
+from typing import Any
+
+import aiohttp
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util.json import JSON_DECODE_EXCEPTIONS, json_loads
+
+from .api import BitaxeClient
+from .const import (
+    WS_FIELDS_TIMEOUT,
+    WS_PROBE_TIMEOUT,
+    WS_RECONNECT_MAX,
+    WS_RECONNECT_MIN,
+)
+from .coordinator import BitAxeDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _parse_fields(text: str) -> dict[str, Any] | None:
+    """Return the fields of a JSON object frame, or None for anything else."""
+    try:
+        fields = json_loads(text)
+    except JSON_DECODE_EXCEPTIONS:
+        return None
+    if isinstance(fields, dict) and fields:
+        return fields
+    return None
+
+
+async def async_probe_push_fields(client: BitaxeClient) -> bool:
+    """Return True if the device streams JSON field updates on `/api/ws`.
+
+    Stock AxeOS only streams its log lines there, which carry no fields.
+    """
+    found = False
+    try:
+        async with asyncio.timeout(WS_PROBE_TIMEOUT):
+            async with client.ws_connect() as ws:
+                async for msg in ws:
+                    if (
+                        msg.type is aiohttp.WSMsgType.TEXT
+                        and _parse_fields(msg.data) is not None
+                    ):
+                        found = True
+                        break
+    except (aiohttp.ClientError, TimeoutError):
+        pass
+    return found
+
+
+class BitAxePushListener:
+    """Keep a WebSocket open to one device and feed its updates to the coordinator.
+
+    Only JSON objects on `/api/ws` are treated as field updates. Once the
+    stream delivers fields the coordinator falls back to slow polling for
+    the ones it does not carry. Stock AxeOS streams plain log lines there
+    instead; if a connection carries no fields within WS_FIELDS_TIMEOUT, the
+    listener gives up for good rather than keep a useless socket open.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: BitAxeDataUpdateCoordinator,
+        on_connection_change: Callable[[], None],
+    ) -> None:
+        """Initialize the listener."""
+        self.hass = hass
+        self._coordinator = coordinator
+        self._on_connection_change = on_connection_change
+        self._task: asyncio.Task | None = None
+
+    @callback
+    def async_start(self) -> None:
+        """Start listening."""
+        if self._task is None:
+            self._task = self.hass.async_create_background_task(
+                self._async_run(), f"bitaxe push {self._coordinator.client.host}"
+            )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop listening."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._set_connected(False)
+
+    def _set_connected(self, connected: bool) -> None:
+        """Record the connection state and let the scheduler adapt."""
+        if self._coordinator.push_connected != connected:
+            self._coordinator.push_connected = connected
+            self._on_connection_change()
+
+    async def _async_run(self) -> None:
+        """Connect, consume messages and reconnect with backoff."""
+        coordinator = self._coordinator
+        backoff = WS_RECONNECT_MIN
+        while True:
+            try:
+                async with coordinator.client.ws_connect() as ws:
+                    _LOGGER.debug(
+                        "Push connection to %s established", coordinator.client.host
+                    )
+                    backoff = WS_RECONNECT_MIN
+                    if not await self._async_consume(ws):
+                        coordinator.push_supported = False
+                        _LOGGER.warning(
+                            "BitAxe %s sends no field updates over its WebSocket; "
+                            "its firmware does not support push updates",
+                            coordinator.client.host,
+                        )
+                        return
+            except (aiohttp.ClientError, TimeoutError) as err:
+                if isinstance(err, aiohttp.WSServerHandshakeError) and err.status == 404:
+                    coordinator.push_supported = False
+                    _LOGGER.warning(
+                        "BitAxe %s has no WebSocket; its firmware does not "
+                        "support push updates",
+                        coordinator.client.host,
+                    )
+                    return
+                _LOGGER.debug(
+                    "Push connection to %s failed: %s", coordinator.client.host, err
+                )
+            self._set_connected(False)
+            await asyncio.sleep(backoff * random.uniform(1.0, 1.5))
+            backoff = min(backoff * 2, WS_RECONNECT_MAX)
+
+    async def _async_consume(self, ws: aiohttp.ClientWebSocketResponse) -> bool:
+        """Merge JSON field updates until the socket closes.
+
+        Returns False if the socket stayed open for WS_FIELDS_TIMEOUT without
+        a single field update from firmware not yet seen to send any.
+        """
+        coordinator = self._coordinator
+        timeout = None if coordinator.push_supported else WS_FIELDS_TIMEOUT
+        try:
+            async with asyncio.timeout(timeout) as fields_timeout:
+                async for msg in ws:
+                    if msg.type is aiohttp.WSMsgType.ERROR:
+                        break
+                    if msg.type is not aiohttp.WSMsgType.TEXT:
+                        continue
+                    if (fields := _parse_fields(msg.data)) is None:
+                        continue
+                    if not coordinator.push_supported:
+                        coordinator.push_supported = True
+                        fields_timeout.reschedule(None)
+                    # Only a stream that carries fields lets polling slow down
+                    self._set_connected(True)
+                    coordinator.async_push_update(fields)
+        except TimeoutError:
+            if fields_timeout.expired():
+                return False
+            raise
+        return True
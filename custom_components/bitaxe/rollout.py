@@ -0,0 +1,171 @@
+"""Staged rollout of an operation across many BitAxe devices."""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from collections.abc import Awaitable, Callable
+import logging
+import math
+import time
+from typing import Any, NamedTuple
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from .api import BitaxeConnectionError
+from .const import PROBE_TIMEOUT, ROLLOUT_POLL_INTERVAL
+from .coordinator import BitAxeDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"
+STATUS_OFFLINE = "offline"
+
+# Called with the entry ID and coordinator of each device
+RolloutStep = Callable[[str, BitAxeDataUpdateCoordinator], Awaitable[Any]]
+
+
+class RolloutError(HomeAssistantError):
+    """An operation did not succeed on a device."""
+
+
+class RolloutParameters(NamedTuple):
+    """How to roll an operation out over a fleet."""
+
+    wave_size: float  # percent of the online devices
+    max_parallel: int
+    wave_delay: float  # seconds
+    halt_on_failure: bool
+
+
+async def async_rollout(
+    hass: HomeAssistant,
+    coordinators: dict[str, BitAxeDataUpdateCoordinator],
+    step: RolloutStep,
+    parameters: RolloutParameters,
+    operation: str,
+) -> dict[str, Any]:
+    """Run a step on devices in waves and report the outcome per device.
+
+    The online devices are split into waves of wave_size percent, in name
+    order. Within a wave up to max_parallel steps run at once, and a wave
+    only starts once the previous one finished, plus wave_delay. With
+    halt_on_failure, a wave with a failed device cancels the waves after
+    it, so a bad change reaches only part of the fleet. Devices that are
+    offline when the rollout starts are left out. A step fails by raising
+    a BitaxeConnectionError or HomeAssistantError; whatever it returns is
+    added to the device's result.
+    """
+    names: dict[str, str] = {}
+    for entry_id in coordinators:
+        entry = hass.config_entries.async_get_entry(entry_id)
+        names[entry_id] = entry.title if entry else entry_id
+    ordered = sorted(coordinators, key=lambda entry_id: names[entry_id])
+    results: dict[str, dict[str, Any]] = {}
+    online: list[str] = []
+    for entry_id in ordered:
+        coordinator = coordinators[entry_id]
+        if coordinator.data is None or not coordinator.last_update_success:
+            results[entry_id] = {"status": STATUS_OFFLINE}
+        else:
+            online.append(entry_id)
+
+    per_wave = max(1, math.ceil(len(online) * parameters.wave_size / 100))
+    waves = [
+        online[index : index + per_wave] for index in range(0, len(online), per_wave)
+    ]
+    semaphore = asyncio.Semaphore(parameters.max_parallel)
+
+    async def _async_run(entry_id: str, wave: int) -> None:
+        async with semaphore:
+            started = time.monotonic()
+            try:
+                outcome = await step(entry_id, coordinators[entry_id])
+            except (BitaxeConnectionError, HomeAssistantError) as err:
+                results[entry_id] = {
+                    "status": STATUS_FAILED,
+                    "wave": wave,
+                    "error": str(err),
+                }
+            else:
+                results[entry_id] = {"status": STATUS_OK, "wave": wave}
+                if outcome is not None:
+                    results[entry_id]["result"] = outcome
+            results[entry_id]["duration"] = round(time.monotonic() - started, 3)
+
+    halted_after: int | None = None
+    for number, wave in enumerate(waves, 1):
+        if halted_after is not None:
+            for entry_id in wave:
+                results[entry_id] = {"status": STATUS_SKIPPED, "wave": number}
+            continue
+        if number > 1 and parameters.wave_delay:
+            await asyncio.sleep(parameters.wave_delay)
+        await asyncio.gather(*(_async_run(entry_id, number) for entry_id in wave))
+        failed = [
+            names[entry_id]
+            for entry_id in wave
+            if results[entry_id]["status"] == STATUS_FAILED
+        ]
+        _LOGGER.info(
+            "%s wave %d/%d: %d of %d devices succeeded",
+            operation,
+            number,
+            len(waves),
+            len(wave) - len(failed),
+            len(wave),
+        )
+        if failed and parameters.halt_on_failure and number < len(waves):
+            _LOGGER.warning(
+                "Halting %s after wave %d, which failed on %s",
+                operation,
+                number,
+                ", ".join(failed),
+            )
+            halted_after = number
+
+    return {
+        "waves": len(waves),
+        "halted_after_wave": halted_after,
+        "summary": dict(Counter(result["status"] for result in results.values())),
+        "devices": [
+            {"name": names[entry_id], **results[entry_id]} for entry_id in ordered
+        ],
+    }
+
+
+async def async_wait_for_reboot(
+    coordinator: BitAxeDataUpdateCoordinator,
+    uptime_before: float | None,
+    timeout: float,
+) -> None:
+    """Wait until a device answers again after it was told to reboot.
+
+    A device counts as rebooted once its uptime is below the one it had
+    before, or below the time since it was told to. A device that reports
+    no uptime counts as rebooted once it answers again after a failed poll.
+    Raises RolloutError if that does not happen within timeout.
+    """
+    started = time.monotonic()
+    deadline = started + timeout
+    went_down = False
+    while time.monotonic() < deadline:
+        await asyncio.sleep(ROLLOUT_POLL_INTERVAL)
+        try:
+            data = await coordinator.client.async_get_system_info(PROBE_TIMEOUT)
+        except BitaxeConnectionError:
+            went_down = True
+            continue
+        if (uptime := data.get_number("uptimeSeconds")) is None:
+            rebooted = went_down
+        else:
+            rebooted = uptime < time.monotonic() - started or (
+                uptime_before is not None and uptime < uptime_before
+            )
+        if rebooted:
+            # Through the coordinator, so its health recovers as well
+            await coordinator.async_refresh()
+            return
+    raise RolloutError(f"Did not come back within {timeout:.0f} s")
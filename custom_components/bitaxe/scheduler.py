@@ -0,0 +1,189 @@
+"""Fleet-wide polling scheduler for the BitAxe integration."""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+import heapq
+import logging
+import random
+import time
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    DEFAULT_MAX_CONCURRENT_POLLS,
+    DOMAIN,
+    POLL_JITTER,
+    THROUGHPUT_WINDOW,
+)
+from .coordinator import BitAxeDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Successive multiples of the golden ratio conjugate (mod 1) are spread evenly
+# over [0, 1), so devices keep an even phase no matter how many are added.
+_GOLDEN_RATIO_CONJUGATE = 0.6180339887498949
+
+# Token of a device whose next poll is scheduled when its current one completes
+_UNSCHEDULED = 0
+
+
+class BitAxeFleetScheduler:
+    """Drive the refresh of every BitAxe coordinator from a single task.
+
+    Each registered coordinator has a due time on a heap. Polls are phased
+    evenly across the scan interval, jittered so they drift apart instead of
+    re-aligning, and gated by a semaphore that caps requests in flight.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT_POLLS,
+    ) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._coordinators: dict[str, BitAxeDataUpdateCoordinator] = {}
+        self._heap: list[tuple[float, int, str]] = []
+        self._tokens: dict[str, int] = {}
+        self._token_counter = 0
+        self._phase_counter = 0
+        self._inflight: set[str] = set()
+        self._completed: deque[float] = deque()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.polls_total = 0
+
+    @property
+    def device_count(self) -> int:
+        """Return the number of devices the scheduler polls."""
+        return len(self._coordinators)
+
+    @property
+    def polls_per_second(self) -> float:
+        """Return the number of devices polled per second over the last window."""
+        self._trim_completed(time.monotonic())
+        return len(self._completed) / THROUGHPUT_WINDOW
+
+    @callback
+    def async_start(self) -> None:
+        """Start the scheduling task."""
+        if self._task is None:
+            self._task = self.hass.async_create_background_task(
+                self._async_run(), "bitaxe fleet scheduler"
+            )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop the scheduling task."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    @callback
+    def async_add(
+        self, entry_id: str, coordinator: BitAxeDataUpdateCoordinator
+    ) -> None:
+        """Start polling a coordinator at its poll interval."""
+        self._coordinators[entry_id] = coordinator
+        self._phase_counter += 1
+        phase = (self._phase_counter * _GOLDEN_RATIO_CONJUGATE) % 1.0
+        self._push(entry_id, time.monotonic() + phase * coordinator.poll_interval)
+
+    @callback
+    def async_resume(
+        self, entry_id: str, coordinator: BitAxeDataUpdateCoordinator
+    ) -> None:
+        """Poll a suspended coordinator again, unless its entry went away.
+
+        The entry may have been unloaded or reloaded with a new coordinator
+        while polling was suspended; the old coordinator must then stay out.
+        """
+        entry = self.hass.config_entries.async_get_entry(entry_id)
+        if (
+            entry is not None
+            and entry.state is ConfigEntryState.LOADED
+            and self.hass.data.get(DOMAIN, {}).get(entry_id) is coordinator
+        ):
+            self.async_add(entry_id, coordinator)
+
+    @callback
+    def async_reschedule(self, entry_id: str) -> None:
+        """Poll a device now and continue from its current poll interval."""
+        if entry_id in self._coordinators:
+            self._push(entry_id, time.monotonic())
+
+    @callback
+    def async_remove(self, entry_id: str) -> None:
+        """Stop polling a coordinator."""
+        self._coordinators.pop(entry_id, None)
+        # Stale heap entries are discarded when they come up
+        self._tokens.pop(entry_id, None)
+
+    def _push(self, entry_id: str, due: float) -> None:
+        """Schedule the next poll of a device."""
+        self._token_counter += 1
+        self._tokens[entry_id] = self._token_counter
+        heapq.heappush(self._heap, (due, self._token_counter, entry_id))
+        self._wakeup.set()
+
+    def _trim_completed(self, now: float) -> None:
+        """Drop completion timestamps that fell out of the throughput window."""
+        while self._completed and self._completed[0] < now - THROUGHPUT_WINDOW:
+            self._completed.popleft()
+
+    async def _async_run(self) -> None:
+        """Dispatch polls as they come due."""
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            due, token, entry_id = self._heap[0]
+            now = time.monotonic()
+            if due > now:
+                try:
+                    async with asyncio.timeout(due - now):
+                        await self._wakeup.wait()
+                except TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._heap)
+            if self._tokens.get(entry_id) != token:
+                continue
+            # Nothing is queued for the device until this poll completes
+            self._tokens[entry_id] = _UNSCHEDULED
+
+            if entry_id in self._inflight:
+                _LOGGER.debug(
+                    "Poll of %s still running, rescheduling on completion", entry_id
+                )
+                continue
+            self.hass.async_create_background_task(
+                self._async_poll(entry_id, self._coordinators[entry_id], due),
+                f"bitaxe poll {entry_id}",
+            )
+
+    async def _async_poll(
+        self, entry_id: str, coordinator: BitAxeDataUpdateCoordinator, due: float
+    ) -> None:
+        """Refresh one coordinator within the concurrency cap."""
+        self._inflight.add(entry_id)
+        try:
+            async with self._semaphore:
+                await coordinator.async_refresh()
+        finally:
+            self._inflight.discard(entry_id)
+            now = time.monotonic()
+            self.polls_total += 1
+            self._completed.append(now)
+            self._trim_completed(now)
+            # The interval is read after the poll so it reflects its outcome
+            if self._tokens.get(entry_id) == _UNSCHEDULED:
+                interval = coordinator.poll_interval
+                jitter = random.uniform(-POLL_JITTER, POLL_JITTER) * interval
+                self._push(entry_id, max(due + interval, now) + jitter)
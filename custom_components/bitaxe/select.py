@@ -1,22 +1,33 @@
 """Select platform for the BitAxe integration."""
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
 
 from homeassistant.components.select import SelectEntity, SelectEntityDescription
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import EntityCategory
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
+from .capabilities import (
+    AsicCapabilities,
+    BitAxeCapabilityStore,
+    async_get_capability_store,
+    fallback_capabilities,
+    option_value,
+)
 from .const import (
-    ASIC_FREQUENCY,
-    ASIC_VOLTAGE,
     DISPLAY_SLEEP_OPTIONS,
     DISPLAY_SLEEP_VALUE_TO_LABEL,
     DOMAIN,
+    TIER_CONFIG,
 )
 from .entity import BitAxeEntity
+from .models import EMPTY_SYSTEM_INFO
+
+# Fields that identify the firmware the ASIC capabilities are cached for
+FIRMWARE_KEYS = ("ASICModel", "version")
 
 
 @dataclass(frozen=True, kw_only=True)
@@ -24,6 +35,8 @@ class BitAxeSelectEntityDescription(SelectEntityDescription):
     """Describe a BitAxe select entity."""
 
     api_key: str
+    # Field of AsicCapabilities holding the options, if they depend on the ASIC
+    capability: str | None = None
 
 
 SELECT_DESCRIPTIONS: tuple[BitAxeSelectEntityDescription, ...] = (
@@ -33,6 +46,7 @@ SELECT_DESCRIPTIONS: tuple[BitAxeSelectEntityDescription, ...] = (
         icon="mdi:sine-wave",
         api_key="frequency",
         options=[],
+        capability="frequency",
         entity_category=EntityCategory.CONFIG,
     ),
     BitAxeSelectEntityDescription(
@@ -41,6 +55,7 @@ SELECT_DESCRIPTIONS: tuple[BitAxeSelectEntityDescription, ...] = (
         icon="mdi:lightning-bolt",
         api_key="coreVoltage",
         options=[],
+        capability="voltage",
         entity_category=EntityCategory.CONFIG,
     ),
     BitAxeSelectEntityDescription(
@@ -69,38 +84,112 @@ async def async_setup_entry(
 ) -> None:
     """Set up BitAxe select entities from a config entry."""
     coordinator = hass.data[DOMAIN][entry.entry_id]
+    capabilities = await async_get_capability_store(hass)
 
     async_add_entities(
-        BitAxeSelect(coordinator, description, entry)
+        BitAxeSelect(coordinator, description, entry, capabilities)
         for description in SELECT_DESCRIPTIONS
     )
 
 
 class BitAxeSelect(BitAxeEntity, SelectEntity):
-    """Representation of a BitAxe select entity."""
+    """Representation of a BitAxe select entity.
+
+    Frequency and core voltage offer the options the ASIC supports. They
+    follow the model and firmware version of the device: cached capabilities
+    apply at once, otherwise the built-in tables are shown until the device
+    has been asked.
+    """
 
     entity_description: BitAxeSelectEntityDescription
+    _refresh_tier = TIER_CONFIG
 
     def __init__(
         self,
         coordinator,
         description: BitAxeSelectEntityDescription,
         entry: ConfigEntry,
+        capabilities: BitAxeCapabilityStore,
     ) -> None:
         """Initialize the select entity."""
-        super().__init__(coordinator, entry)
+        source_keys: tuple[str, ...] = (description.api_key,)
+        if description.capability is not None:
+            source_keys += FIRMWARE_KEYS
+        super().__init__(coordinator, entry, source_keys)
         self.entity_description = description
         self._attr_unique_id = f"{entry.entry_id}_{description.key}"
-
-        # Set model-specific options for frequency and voltage
-        if description.key == "frequency":
-            model = (coordinator.data or {}).get("ASICModel", "")
-            self._attr_options = ASIC_FREQUENCY.get(model, ASIC_FREQUENCY.get("BM1370", []))
-        elif description.key == "core_voltage":
-            model = (coordinator.data or {}).get("ASICModel", "")
-            self._attr_options = ASIC_VOLTAGE.get(model, ASIC_VOLTAGE.get("BM1370", []))
-        else:
-            self._attr_options = list(description.options)
+        self._attr_options = list(description.options)
+        self._capabilities = capabilities
+        self._firmware: tuple[str | None, str | None] | None = None
+        self._fetch: asyncio.Task[None] | None = None
+        self._retry: CALLBACK_TYPE | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Pick the options before the first state is written."""
+        self._async_update_options()
+        self.async_on_remove(self._async_cancel_fetch)
+        await super().async_added_to_hass()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Follow a change of the ASIC model or firmware."""
+        self._async_update_options()
+        super()._handle_coordinator_update()
+
+    @callback
+    def _async_update_options(self) -> None:
+        """Show the options of the current firmware, fetching them if needed."""
+        if self.entity_description.capability is None:
+            return
+        data = self.coordinator.data or EMPTY_SYSTEM_INFO
+        firmware = (data.get("ASICModel"), data.get("version"))
+        if firmware == self._firmware:
+            return
+        self._firmware = firmware
+        self._async_cancel_fetch()
+        if (cached := self._capabilities.async_get_cached(*firmware)) is not None:
+            self._async_set_options(cached)
+            return
+        self._async_set_options(fallback_capabilities(firmware[0]))
+        if None not in firmware:
+            self._fetch = self.hass.async_create_task(
+                self._async_fetch_options(firmware),
+                f"bitaxe capabilities {self.entity_id}",
+            )
+
+    async def _async_fetch_options(
+        self, firmware: tuple[str | None, str | None]
+    ) -> None:
+        """Show the options once the device reported its capabilities."""
+        capabilities = await self._capabilities.async_get(
+            self.coordinator.client, *firmware
+        )
+        self._fetch = None
+        if self._capabilities.async_get_cached(*firmware) is None:
+            # The device did not answer; ask again after the next refresh,
+            # which may not change any of the keys this entity listens to
+            self._firmware = None
+            self._retry = self.coordinator.async_add_listener(
+                self._async_update_options
+            )
+        self._async_set_options(capabilities)
+        self.async_write_ha_state()
+
+    @callback
+    def _async_cancel_fetch(self) -> None:
+        """Stop waiting for the capabilities of an outdated firmware."""
+        if self._fetch is not None:
+            self._fetch.cancel()
+            self._fetch = None
+        if self._retry is not None:
+            self._retry()
+            self._retry = None
+
+    @callback
+    def _async_set_options(self, capabilities: AsicCapabilities) -> None:
+        """Take the options from the ASIC capabilities."""
+        capability = self.entity_description.capability
+        self._attr_options = list(getattr(capabilities, capability))
 
     @property
     def current_option(self) -> str | None:
@@ -116,15 +205,11 @@ class BitAxeSelect(BitAxeEntity, SelectEntity):
 
     async def async_select_option(self, option: str) -> None:
         """Set the selected option via PATCH."""
-        from . import patch_bitaxe_system
-
         if self.entity_description.key == "display_sleep":
             api_value = DISPLAY_SLEEP_OPTIONS[option]
         else:
-            api_value = int(option)
+            api_value = option_value(option)
 
-        ip_address = self._entry.data["ip_address"]
-        await patch_bitaxe_system(
-            self.hass, ip_address, {self.entity_description.api_key: api_value}
+        await self.coordinator.async_write(
+            {self.entity_description.api_key: api_value}
         )
-        await self.coordinator.async_request_refresh()
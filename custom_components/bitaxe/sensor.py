@@ -1,20 +1,51 @@
 """Sensor platform for the BitAxe integration."""
 from __future__ import annotations
 
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import time
+
 from homeassistant.components.sensor import (
+    RestoreSensor,
     SensorDeviceClass,
     SensorEntity,
     SensorEntityDescription,
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfPower, UnitOfTemperature, UnitOfTime
-from homeassistant.core import HomeAssistant
+from homeassistant.const import (
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfInformation,
+    UnitOfPower,
+    UnitOfTemperature,
+    UnitOfTime,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.helpers.typing import StateType
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN
+from .const import (
+    BOOT_TIME_TOLERANCE,
+    CONF_DEADBAND,
+    CONF_FLEET,
+    CONF_MAX_AGE,
+    DATA_FLEET,
+    DEFAULT_MAX_AGE,
+    DOMAIN,
+    EFFICIENCY_WINDOW,
+    EVENT_REBOOT,
+    REJECT_RATIO_WINDOW,
+    ROLLING_WINDOWS,
+)
+from .coordinator import BitAxeDataUpdateCoordinator
 from .entity import BitAxeEntity
+from .fleet import BitAxeFleetAggregator
+from .instrumentation import milliseconds
+from .window import RingWindow
 
 
 def format_difficulty(value) -> str | None:
@@ -43,26 +74,22 @@ def format_difficulty(value) -> str | None:
     return str(int(value))
 
 
-def format_uptime(seconds) -> str | None:
-    """Convert seconds into a human-readable uptime string (Xd HH:mm:ss)."""
-    if seconds is None:
-        return None
-    try:
-        seconds = int(seconds)
-    except (ValueError, TypeError):
-        return str(seconds)
+@dataclass(frozen=True, kw_only=True)
+class BitAxeSensorEntityDescription(SensorEntityDescription):
+    """Describe a BitAxe sensor.
 
-    days, remainder = divmod(seconds, 86400)
-    hours, remainder = divmod(remainder, 3600)
-    minutes, secs = divmod(remainder, 60)
+    `deadband` is the default change, in the native unit, a reading has to
+    exceed before a new state is published; None publishes every change. It
+    can be overridden by the `deadband_option` option, which defaults to
+    f"{CONF_DEADBAND}_{key}".
+    """
 
-    if days > 0:
-        return f"{days}d {hours:02d}:{minutes:02d}:{secs:02d}"
-    return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+    deadband: float | None = None
+    deadband_option: str | None = None
 
 
-SENSOR_DESCRIPTIONS: tuple[SensorEntityDescription, ...] = (
-    SensorEntityDescription(
+SENSOR_DESCRIPTIONS: tuple[BitAxeSensorEntityDescription, ...] = (
+    BitAxeSensorEntityDescription(
         key="power",
         name="Power Consumption",
         native_unit_of_measurement=UnitOfPower.WATT,
@@ -70,54 +97,58 @@ SENSOR_DESCRIPTIONS: tuple[SensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         icon="mdi:flash",
         suggested_display_precision=1,
+        deadband=0.5,
     ),
-    SensorEntityDescription(
+    BitAxeSensorEntityDescription(
         key="temp",
         name="Temperature ASIC",
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
         icon="mdi:thermometer",
+        deadband=0.5,
     ),
-    SensorEntityDescription(
+    BitAxeSensorEntityDescription(
         key="vrTemp",
         name="Temperature VR",
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
         icon="mdi:thermometer",
+        deadband=1,
     ),
-    SensorEntityDescription(
+    BitAxeSensorEntityDescription(
         key="hashRate",
         name="Hash Rate",
         native_unit_of_measurement="GH/s",
         state_class=SensorStateClass.MEASUREMENT,
         icon="mdi:speedometer",
         suggested_display_precision=0,
+        deadband=10,
     ),
-    SensorEntityDescription(
+    BitAxeSensorEntityDescription(
         key="bestDiff",
         name="All-Time Best Difficulty",
         icon="mdi:trophy",
     ),
-    SensorEntityDescription(
+    BitAxeSensorEntityDescription(
         key="bestSessionDiff",
         name="Best Difficulty Since System Boot",
         icon="mdi:star",
     ),
-    SensorEntityDescription(
+    BitAxeSensorEntityDescription(
         key="sharesAccepted",
         name="Shares Accepted",
         state_class=SensorStateClass.TOTAL_INCREASING,
         icon="mdi:share",
     ),
-    SensorEntityDescription(
+    BitAxeSensorEntityDescription(
         key="sharesRejected",
         name="Shares Rejected",
         state_class=SensorStateClass.TOTAL_INCREASING,
         icon="mdi:share-off",
     ),
-    SensorEntityDescription(
+    BitAxeSensorEntityDescription(
         key="fanspeed",
         name="Fan Speed",
         native_unit_of_measurement="%",
@@ -125,17 +156,332 @@ SENSOR_DESCRIPTIONS: tuple[SensorEntityDescription, ...] = (
         icon="mdi:fan",
         suggested_display_precision=0,
     ),
-    SensorEntityDescription(
+    BitAxeSensorEntityDescription(
         key="fanrpm",
         name="Fan RPM",
         native_unit_of_measurement="RPM",
         state_class=SensorStateClass.MEASUREMENT,
         icon="mdi:fan",
+        deadband=100,
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class BitAxeDiagnosticSensorEntityDescription(SensorEntityDescription):
+    """Describe a sensor that reports on the integration itself."""
+
+    value_fn: Callable[[BitAxeDataUpdateCoordinator], StateType | datetime]
+
+
+DIAGNOSTIC_SENSOR_DESCRIPTIONS: tuple[BitAxeDiagnosticSensorEntityDescription, ...] = (
+    BitAxeDiagnosticSensorEntityDescription(
+        key="state_writes_per_poll",
+        name="State Writes per Poll",
+        icon="mdi:database-edit",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: coordinator.state_writes_last_update,
+    ),
+    BitAxeDiagnosticSensorEntityDescription(
+        key="state_writes_per_day",
+        name="State Writes per Day",
+        icon="mdi:database-clock",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: coordinator.state_writes_per_day,
+    ),
+    BitAxeDiagnosticSensorEntityDescription(
+        key="poll_latency",
+        name="Poll Latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: milliseconds(
+            coordinator.client.stats.last_latency
+        ),
+    ),
+    BitAxeDiagnosticSensorEntityDescription(
+        key="poll_latency_p95",
+        name="Poll Latency 95th Percentile",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: milliseconds(
+            coordinator.client.stats.latency.quantile(0.95)
+        ),
+    ),
+    BitAxeDiagnosticSensorEntityDescription(
+        key="payload_size",
+        name="Payload Size",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: coordinator.client.stats.last_payload_bytes,
+    ),
+    BitAxeDiagnosticSensorEntityDescription(
+        key="parse_time",
+        name="Parse Time",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=2,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: milliseconds(
+            coordinator.client.stats.last_parse_time
+        ),
+    ),
+    BitAxeDiagnosticSensorEntityDescription(
+        key="poll_failures",
+        name="Poll Failures",
+        icon="mdi:lan-disconnect",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: coordinator.client.stats.failures_total,
+    ),
+    BitAxeDiagnosticSensorEntityDescription(
+        key="last_successful_poll",
+        name="Last Successful Poll",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: coordinator.client.stats.last_success,
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class BitAxeFleetSensorEntityDescription(SensorEntityDescription):
+    """Describe a sensor that aggregates the whole fleet."""
+
+    value_fn: Callable[[BitAxeFleetAggregator], StateType]
+
+
+def _rounded(value: float | None, digits: int) -> float | None:
+    """Round an aggregate, hiding the noise of the running sums."""
+    return None if value is None else round(value, digits)
+
+
+FLEET_SENSOR_DESCRIPTIONS: tuple[BitAxeFleetSensorEntityDescription, ...] = (
+    BitAxeFleetSensorEntityDescription(
+        key="total_hashrate",
+        name="Total Hash Rate",
+        native_unit_of_measurement="GH/s",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:speedometer",
+        suggested_display_precision=0,
+        value_fn=lambda fleet: _rounded(fleet.total_hashrate, 2),
+    ),
+    BitAxeFleetSensorEntityDescription(
+        key="total_power",
+        name="Total Power Consumption",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:flash",
+        suggested_display_precision=1,
+        value_fn=lambda fleet: _rounded(fleet.total_power, 2),
+    ),
+    BitAxeFleetSensorEntityDescription(
+        key="mean_temp",
+        name="Mean Temperature ASIC",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:thermometer",
+        suggested_display_precision=1,
+        value_fn=lambda fleet: _rounded(fleet.mean_temperature, 2),
+    ),
+    BitAxeFleetSensorEntityDescription(
+        key="max_temp",
+        name="Max Temperature ASIC",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:thermometer-high",
+        value_fn=lambda fleet: fleet.max_temperature,
+    ),
+    BitAxeFleetSensorEntityDescription(
+        key="efficiency",
+        name="Efficiency",
+        native_unit_of_measurement="J/TH",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:leaf",
+        suggested_display_precision=1,
+        value_fn=lambda fleet: _rounded(fleet.efficiency, 2),
+    ),
+    BitAxeFleetSensorEntityDescription(
+        key="devices_online",
+        name="Devices Online",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:server-network",
+        value_fn=lambda fleet: fleet.online_count,
+    ),
+)
+
+
+class BitAxeRollingMetrics:
+    """Windowed averages and ratios of one device, fed on every refresh.
+
+    Hash rate and power are averaged over time, each reading weighted by how
+    long it was current. The reject ratio is computed from share counter
+    increments, so it is not thrown off when the counters restart from zero
+    after a reboot.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty windows."""
+        self._hashrate = {
+            window: RingWindow(*spec) for window, spec in ROLLING_WINDOWS.items()
+        }
+        self._power = {
+            window: RingWindow(*spec) for window, spec in ROLLING_WINDOWS.items()
+        }
+        self._shares = RingWindow(*ROLLING_WINDOWS[REJECT_RATIO_WINDOW])
+        self._last_time: float | None = None
+        self._last_hashrate: float | None = None
+        self._last_power: float | None = None
+        self._last_accepted: int | None = None
+        self._last_rejected: int | None = None
+
+    @callback
+    def async_update(self, coordinator: BitAxeDataUpdateCoordinator) -> None:
+        """Take in the latest data of the device."""
+        if not coordinator.last_update_success or coordinator.data is None:
+            # Do not stretch the last reading across the outage
+            self._last_time = None
+            return
+        if coordinator.stale:
+            return
+
+        now = time.monotonic()
+        data = coordinator.data
+        if self._last_time is not None:
+            elapsed = now - self._last_time
+            for windows, value in (
+                (self._hashrate, self._last_hashrate),
+                (self._power, self._last_power),
+            ):
+                if value is not None and elapsed > 0:
+                    for window in windows.values():
+                        window.add(now, value * elapsed, elapsed)
+        self._last_time = now
+        self._last_hashrate = data.get_number("hashRate")
+        self._last_power = data.get_number("power")
+
+        accepted = data.get("sharesAccepted")
+        rejected = data.get("sharesRejected")
+        if isinstance(accepted, int) and isinstance(rejected, int):
+            if self._last_accepted is not None and self._last_rejected is not None:
+                new_accepted = _increment(self._last_accepted, accepted)
+                new_rejected = _increment(self._last_rejected, rejected)
+                if new_accepted or new_rejected:
+                    self._shares.add(now, new_rejected, new_accepted + new_rejected)
+            self._last_accepted = accepted
+            self._last_rejected = rejected
+
+    def hashrate(self, window: str) -> float | None:
+        """Return the average hash rate over a window (GH/s)."""
+        return self._hashrate[window].ratio(time.monotonic())
+
+    def power(self, window: str) -> float | None:
+        """Return the average power over a window (W)."""
+        return self._power[window].ratio(time.monotonic())
+
+    def efficiency(self) -> float | None:
+        """Return the efficiency over EFFICIENCY_WINDOW (J/TH)."""
+        hashrate = self.hashrate(EFFICIENCY_WINDOW)
+        power = self.power(EFFICIENCY_WINDOW)
+        if not hashrate or power is None:
+            return None
+        return power / (hashrate / 1000)
+
+    def reject_ratio(self) -> float | None:
+        """Return the share of rejected shares over REJECT_RATIO_WINDOW (%)."""
+        ratio = self._shares.ratio(time.monotonic())
+        return None if ratio is None else ratio * 100
+
+
+def _increment(previous: int, current: int) -> int:
+    """Return how much a counter grew, treating a drop as a restart from zero."""
+    return current - previous if current >= previous else current
+
+
+@dataclass(frozen=True, kw_only=True)
+class BitAxeRollingSensorEntityDescription(BitAxeSensorEntityDescription):
+    """Describe a sensor computed from the rolling windows of a device."""
+
+    source_keys: tuple[str, ...]
+    value_fn: Callable[[BitAxeRollingMetrics], float | None]
+
+
+_WINDOW_NAMES = {"1m": "1 min", "10m": "10 min", "1h": "1 h"}
+
+ROLLING_SENSOR_DESCRIPTIONS: tuple[BitAxeRollingSensorEntityDescription, ...] = (
+    *(
+        BitAxeRollingSensorEntityDescription(
+            key=f"hashrate_avg_{window}",
+            name=f"Hash Rate ({_WINDOW_NAMES[window]} avg)",
+            native_unit_of_measurement="GH/s",
+            state_class=SensorStateClass.MEASUREMENT,
+            icon="mdi:speedometer",
+            suggested_display_precision=0,
+            deadband=10,
+            deadband_option=f"{CONF_DEADBAND}_hashRate",
+            source_keys=("hashRate",),
+            value_fn=lambda metrics, window=window: metrics.hashrate(window),
+        )
+        for window in ROLLING_WINDOWS
+    ),
+    *(
+        BitAxeRollingSensorEntityDescription(
+            key=f"power_avg_{window}",
+            name=f"Power Consumption ({_WINDOW_NAMES[window]} avg)",
+            native_unit_of_measurement=UnitOfPower.WATT,
+            device_class=SensorDeviceClass.POWER,
+            state_class=SensorStateClass.MEASUREMENT,
+            icon="mdi:flash",
+            suggested_display_precision=1,
+            deadband=0.5,
+            deadband_option=f"{CONF_DEADBAND}_power",
+            source_keys=("power",),
+            value_fn=lambda metrics, window=window: metrics.power(window),
+        )
+        for window in ROLLING_WINDOWS
     ),
-    SensorEntityDescription(
-        key="uptimeSeconds",
-        name="Uptime",
-        icon="mdi:clock",
+    BitAxeRollingSensorEntityDescription(
+        key="efficiency",
+        name="Efficiency",
+        native_unit_of_measurement="J/TH",
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:leaf",
+        suggested_display_precision=1,
+        deadband=0.2,
+        source_keys=("hashRate", "power"),
+        value_fn=lambda metrics: metrics.efficiency(),
+    ),
+    BitAxeRollingSensorEntityDescription(
+        key="reject_ratio",
+        name="Reject Ratio",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:percent",
+        suggested_display_precision=2,
+        deadband=0.05,
+        source_keys=("sharesAccepted", "sharesRejected"),
+        value_fn=lambda metrics: metrics.reject_ratio(),
     ),
 )
 
@@ -146,40 +492,309 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up BitAxe sensors from a config entry."""
+    if entry.data.get(CONF_FLEET):
+        aggregator = hass.data[DATA_FLEET]
+        async_add_entities(
+            BitAxeFleetSensor(aggregator, description, entry)
+            for description in FLEET_SENSOR_DESCRIPTIONS
+        )
+        return
+
     coordinator = hass.data[DOMAIN][entry.entry_id]
 
-    async_add_entities(
+    # The ticking Uptime sensor was replaced by Last Boot
+    registry = er.async_get(hass)
+    if entity_id := registry.async_get_entity_id(
+        "sensor", DOMAIN, f"{entry.entry_id}_uptimeSeconds"
+    ):
+        registry.async_remove(entity_id)
+
+    entities: list[SensorEntity] = [
         BitAxeSensor(coordinator, description, entry)
         for description in SENSOR_DESCRIPTIONS
+    ]
+    entities.append(BitAxeLastBootSensor(coordinator, entry))
+    entities.extend(
+        BitAxeDiagnosticSensor(coordinator, description, entry)
+        for description in DIAGNOSTIC_SENSOR_DESCRIPTIONS
     )
 
+    # Registered before the entities, so the windows are fed before they render
+    metrics = BitAxeRollingMetrics()
+    entry.async_on_unload(
+        coordinator.async_add_listener(lambda: metrics.async_update(coordinator))
+    )
+    entities.extend(
+        BitAxeRollingSensor(coordinator, metrics, description, entry)
+        for description in ROLLING_SENSOR_DESCRIPTIONS
+    )
+    async_add_entities(entities)
 
-class BitAxeSensor(BitAxeEntity, SensorEntity):
-    """Representation of a BitAxe sensor."""
+
+class BitAxeDeadbandSensor(BitAxeEntity, SensorEntity):
+    """Base class for BitAxe sensors that may filter readings by a deadband.
+
+    With a deadband, the sensor keeps showing its last published value until
+    a reading moves past the deadband or that value is older than the max age.
+    """
+
+    entity_description: BitAxeSensorEntityDescription
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator,
-        description: SensorEntityDescription,
+        coordinator: BitAxeDataUpdateCoordinator,
+        description: BitAxeSensorEntityDescription,
         entry: ConfigEntry,
+        source_keys: Iterable[str],
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator, entry)
+        super().__init__(coordinator, entry, source_keys)
         self.entity_description = description
         self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._deadband: float | None = None
+        if description.deadband is not None:
+            option = description.deadband_option or f"{CONF_DEADBAND}_{description.key}"
+            self._deadband = entry.options.get(option, description.deadband)
+        self._max_age: float = entry.options.get(CONF_MAX_AGE, DEFAULT_MAX_AGE)
+        self._published_value: StateType = None
+        self._published_status: tuple[bool, bool] | None = None
+        self._published_at = 0.0
 
-    @property
-    def native_value(self):
-        """Return the sensor value."""
+    def _current_value(self) -> StateType:
+        """Return the value of the latest reading of the described key."""
         if self.coordinator.data is None:
             return None
+        return self.coordinator.data.get(self.entity_description.key)
 
-        value = self.coordinator.data.get(self.entity_description.key)
+    @property
+    def native_value(self) -> StateType:
+        """Return the sensor value."""
+        if self._deadband is not None:
+            return self._published_value
+        return self._current_value()
+
+    def _within_deadband(self) -> bool:
+        """Return True if the latest reading is not worth a new state."""
+        if self._deadband is None or self._published_status is None:
+            return False
+        if (self.available, self.coordinator.stale) != self._published_status:
+            return False
+        if time.monotonic() - self._published_at >= self._max_age:
+            return False
+        value, published = self._current_value(), self._published_value
+        if not isinstance(value, (int, float)) or not isinstance(
+            published, (int, float)
+        ):
+            return value == published
+        return abs(value - published) <= self._deadband
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Publish the latest reading unless it is within the deadband."""
+        if self._within_deadband():
+            return
+        super()._handle_coordinator_update()
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Publish the latest reading."""
+        if self._deadband is not None:
+            self._published_value = self._current_value()
+            self._published_status = (self.available, self.coordinator.stale)
+            self._published_at = time.monotonic()
+        super().async_write_ha_state()
+
+
+class BitAxeSensor(BitAxeDeadbandSensor):
+    """Representation of a BitAxe sensor."""
+
+    def __init__(
+        self,
+        coordinator: BitAxeDataUpdateCoordinator,
+        description: BitAxeSensorEntityDescription,
+        entry: ConfigEntry,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, description, entry, (description.key,))
+
+    def _current_value(self) -> StateType:
+        """Return the value of the latest data."""
+        value = super()._current_value()
 
         if self.entity_description.key in ("bestDiff", "bestSessionDiff"):
             return format_difficulty(value)
 
-        if self.entity_description.key == "uptimeSeconds":
-            return format_uptime(value)
-
         return value
+
+
+class BitAxeLastBootSensor(BitAxeEntity, RestoreSensor):
+    """Representation of the time a BitAxe device last booted.
+
+    The boot time derived from `uptimeSeconds` shifts a little with every
+    poll, so the state only changes when it moves by more than
+    BOOT_TIME_TOLERANCE. Uptime going down, or falling behind the time that
+    passed since the previous reading, is a reboot and fires EVENT_REBOOT.
+    """
+
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+    _attr_icon = "mdi:restart"
+    _attr_name = "Last Boot"
+
+    def __init__(
+        self, coordinator: BitAxeDataUpdateCoordinator, entry: ConfigEntry
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, entry, ("uptimeSeconds",))
+        self._attr_unique_id = f"{entry.entry_id}_last_boot"
+        self._last_uptime: tuple[float, float] | None = None
+        self._written_status: tuple[bool, bool] | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the last boot time, so a restart does not look like a reboot."""
+        await super().async_added_to_hass()
+        if (last := await self.async_get_last_sensor_data()) is not None:
+            if isinstance(last.native_value, datetime):
+                self._attr_native_value = last.native_value
+        self._async_update_boot_time()
+        self._written_status = (self.available, self.coordinator.stale)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state if the boot time or availability changed."""
+        status = (self.available, self.coordinator.stale)
+        if self._async_update_boot_time() or status != self._written_status:
+            self._written_status = status
+            super()._handle_coordinator_update()
+
+    @callback
+    def _async_update_boot_time(self) -> bool:
+        """Derive the boot time from the latest uptime; return True if it moved."""
+        data = self.coordinator.data
+        if data is None or self.coordinator.stale:
+            # Uptime restored from the startup snapshot is out of date
+            return False
+        if (uptime := data.get_number("uptimeSeconds")) is None:
+            return False
+
+        now = time.monotonic()
+        tolerance = timedelta(seconds=BOOT_TIME_TOLERANCE)
+        boot_time = (dt_util.utcnow() - timedelta(seconds=uptime)).replace(
+            microsecond=0
+        )
+        previous: datetime | None = self._attr_native_value
+        if self._last_uptime is not None:
+            last_uptime, last_seen = self._last_uptime
+            expected = last_uptime + (now - last_seen)
+            rebooted = uptime < last_uptime or uptime < expected - BOOT_TIME_TOLERANCE
+        else:
+            # First reading since Home Assistant started
+            rebooted = previous is not None and boot_time - previous > tolerance
+        self._last_uptime = (uptime, now)
+
+        if (
+            not rebooted
+            and previous is not None
+            and abs(boot_time - previous) <= tolerance
+        ):
+            return False
+
+        self._attr_native_value = boot_time
+        # A replay starts over from older uptimes; that is not a reboot
+        if rebooted and not self.coordinator.replaying:
+            self.hass.bus.async_fire(
+                EVENT_REBOOT,
+                {
+                    "entry_id": self._entry.entry_id,
+                    "device_id": self.device_entry.id if self.device_entry else None,
+                    "name": self._device_name,
+                    "host": self.coordinator.client.host,
+                    "boot_time": boot_time.isoformat(),
+                    "previous_boot_time": previous.isoformat() if previous else None,
+                },
+            )
+        return True
+
+
+class BitAxeDiagnosticSensor(BitAxeEntity, SensorEntity):
+    """Representation of a BitAxe integration diagnostic sensor."""
+
+    entity_description: BitAxeDiagnosticSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: BitAxeDataUpdateCoordinator,
+        description: BitAxeDiagnosticSensorEntityDescription,
+        entry: ConfigEntry,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, entry, None)
+        self.entity_description = description
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+
+    @property
+    def available(self) -> bool:
+        """Report integration statistics even while the device is offline."""
+        return True
+
+    @property
+    def native_value(self) -> StateType | datetime:
+        """Return the sensor value."""
+        return self.entity_description.value_fn(self.coordinator)
+
+
+class BitAxeRollingSensor(BitAxeDeadbandSensor):
+    """Representation of a BitAxe sensor averaged over a time window."""
+
+    entity_description: BitAxeRollingSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: BitAxeDataUpdateCoordinator,
+        metrics: BitAxeRollingMetrics,
+        description: BitAxeRollingSensorEntityDescription,
+        entry: ConfigEntry,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, description, entry, description.source_keys)
+        self._metrics = metrics
+
+    def _current_value(self) -> StateType:
+        """Return the windowed value."""
+        value = self.entity_description.value_fn(self._metrics)
+        return None if value is None else round(value, 3)
+
+
+class BitAxeFleetSensor(SensorEntity):
+    """Representation of a sensor aggregated over all BitAxe devices."""
+
+    entity_description: BitAxeFleetSensorEntityDescription
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        aggregator: BitAxeFleetAggregator,
+        description: BitAxeFleetSensorEntityDescription,
+        entry: ConfigEntry,
+    ) -> None:
+        """Initialize the sensor."""
+        self._aggregator = aggregator
+        self.entity_description = description
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, entry.entry_id)},
+            "name": entry.title,
+            "manufacturer": "Open Source Hardware",
+            "model": "BitAxe Fleet",
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to aggregate updates."""
+        self.async_on_remove(
+            self._aggregator.async_add_listener(self.async_write_ha_state)
+        )
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the sensor value."""
+        return self.entity_description.value_fn(self._aggregator)
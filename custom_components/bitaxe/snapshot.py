@@ -0,0 +1,56 @@
+"""Startup snapshots of the last good payload of each BitAxe device."""
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DATA_SNAPSHOTS, DOMAIN, SNAPSHOT_SAVE_DELAY, SNAPSHOT_STORAGE_VERSION
+
+
+class BitAxeSnapshotStore:
+    """Keep the last good payload of every device on disk.
+
+    One file holds the whole fleet. Saves are delayed and batched, so a poll
+    cycle across many devices results in a single write.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the snapshot store."""
+        self._store: Store[dict[str, dict[str, Any]]] = Store(
+            hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.snapshots"
+        )
+        self._snapshots: dict[str, dict[str, Any]] = {}
+
+    async def async_load(self) -> BitAxeSnapshotStore:
+        """Load the snapshots from disk."""
+        self._snapshots = await self._store.async_load() or {}
+        return self
+
+    @callback
+    def async_get(self, entry_id: str) -> dict[str, Any] | None:
+        """Return the snapshot of a device, if one was saved."""
+        return self._snapshots.get(entry_id)
+
+    @callback
+    def async_set(self, entry_id: str, snapshot: dict[str, Any]) -> None:
+        """Replace the snapshot of a device."""
+        self._snapshots[entry_id] = snapshot
+        self._store.async_delay_save(lambda: self._snapshots, SNAPSHOT_SAVE_DELAY)
+
+    @callback
+    def async_remove(self, entry_id: str) -> None:
+        """Forget the snapshot of a removed device."""
+        if self._snapshots.pop(entry_id, None) is not None:
+            self._store.async_delay_save(lambda: self._snapshots, SNAPSHOT_SAVE_DELAY)
+
+
+async def async_get_snapshot_store(hass: HomeAssistant) -> BitAxeSnapshotStore:
+    """Return the fleet snapshot store, loading it on first use."""
+    if (task := hass.data.get(DATA_SNAPSHOTS)) is None:
+        task = hass.data[DATA_SNAPSHOTS] = hass.async_create_task(
+            BitAxeSnapshotStore(hass).async_load()
+        )
+    return await asyncio.shield(task)
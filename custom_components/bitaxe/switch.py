@@ -9,7 +9,7 @@ from homeassistant.const import EntityCategory
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN
+from .const import DOMAIN, TIER_CONFIG
 from .entity import BitAxeEntity
 
 
@@ -63,6 +63,7 @@ class BitAxeSwitch(BitAxeEntity, SwitchEntity):
     """Representation of a BitAxe switch."""
 
     entity_description: BitAxeSwitchEntityDescription
+    _refresh_tier = TIER_CONFIG
 
     def __init__(
         self,
@@ -71,7 +72,7 @@ class BitAxeSwitch(BitAxeEntity, SwitchEntity):
         entry: ConfigEntry,
     ) -> None:
         """Initialize the switch."""
-        super().__init__(coordinator, entry)
+        super().__init__(coordinator, entry, (description.api_key,))
         self.entity_description = description
         self._attr_unique_id = f"{entry.entry_id}_{description.key}"
 
@@ -95,10 +96,6 @@ class BitAxeSwitch(BitAxeEntity, SwitchEntity):
 
     async def _async_set_value(self, value: int) -> None:
         """Send the PATCH request and refresh."""
-        from . import patch_bitaxe_system
-
-        ip_address = self._entry.data["ip_address"]
-        await patch_bitaxe_system(
-            self.hass, ip_address, {self.entity_description.api_key: value}
+        await self.coordinator.async_write(
+            {self.entity_description.api_key: value}
         )
-        await self.coordinator.async_request_refresh()
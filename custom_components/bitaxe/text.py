@@ -9,7 +9,7 @@ from homeassistant.const import EntityCategory
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN
+from .const import DOMAIN, TIER_CONFIG
 from .entity import BitAxeEntity
 
 
@@ -49,6 +49,7 @@ class BitAxeText(BitAxeEntity, TextEntity):
     """Representation of a BitAxe text entity."""
 
     entity_description: BitAxeTextEntityDescription
+    _refresh_tier = TIER_CONFIG
 
     def __init__(
         self,
@@ -57,7 +58,7 @@ class BitAxeText(BitAxeEntity, TextEntity):
         entry: ConfigEntry,
     ) -> None:
         """Initialize the text entity."""
-        super().__init__(coordinator, entry)
+        super().__init__(coordinator, entry, (description.api_key,))
         self.entity_description = description
         self._attr_unique_id = f"{entry.entry_id}_{description.key}"
 
@@ -73,10 +74,6 @@ class BitAxeText(BitAxeEntity, TextEntity):
 
     async def async_set_value(self, value: str) -> None:
         """Set the text value via PATCH."""
-        from . import patch_bitaxe_system
-
-        ip_address = self._entry.data["ip_address"]
-        await patch_bitaxe_system(
-            self.hass, ip_address, {self.entity_description.api_key: value}
+        await self.coordinator.async_write(
+            {self.entity_description.api_key: value}
         )
-        await self.coordinator.async_request_refresh()
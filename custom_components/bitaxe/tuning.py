@@ -0,0 +1,318 @@
+"""Automatic frequency and core voltage tuning of BitAxe devices."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, NamedTuple
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .api import BitaxeConnectionError
+from .capabilities import async_get_capability_store, option_value
+from .const import (
+    DATA_TUNER,
+    DOMAIN,
+    EVENT_AUTOTUNE_FINISHED,
+    GOAL_EFFICIENCY,
+    TUNING_SAMPLE_INTERVAL,
+    TUNING_SAVE_DELAY,
+    TUNING_STABLE_HASHRATE_RATIO,
+    TUNING_STORAGE_VERSION,
+)
+from .coordinator import BitAxeDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+POINT_STABLE = "stable"
+POINT_UNSTABLE = "unstable"
+POINT_OVER_LIMIT = "over_limit"
+POINT_FAILED = "failed"
+
+
+class TuningParameters(NamedTuple):
+    """How to tune a batch of devices."""
+
+    goal: str
+    settle_time: float
+    measure_time: float
+    max_temp: float
+    max_vr_temp: float
+    max_parallel: int
+
+
+class BitAxeTuner:
+    """Sweep the operating points of devices and apply the best one.
+
+    Frequencies are tried from low to high. At each one the core voltage is
+    raised step by step until the hash rate reaches what the firmware
+    expects, so every frequency is measured at its lowest stable voltage.
+    The sweep stops at the first point that exceeds a temperature limit or
+    finds no stable voltage, since higher frequencies would only run hotter.
+    The best stable point for the goal is applied at the end; if the sweep
+    is interrupted the original settings are restored. Results are kept on
+    disk per device.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the tuner."""
+        self.hass = hass
+        self._store: Store[dict[str, dict[str, Any]]] = Store(
+            hass, TUNING_STORAGE_VERSION, f"{DOMAIN}.tuning"
+        )
+        self._results: dict[str, dict[str, Any]] = {}
+        self._running: dict[str, asyncio.Task[None]] = {}
+
+    async def async_load(self) -> BitAxeTuner:
+        """Load the tuning results from disk."""
+        self._results = await self._store.async_load() or {}
+        return self
+
+    @callback
+    def async_get_result(self, entry_id: str) -> dict[str, Any] | None:
+        """Return the result of the last completed tuning of a device."""
+        return self._results.get(entry_id)
+
+    @callback
+    def async_is_running(self, entry_id: str) -> bool:
+        """Return True while a device is being tuned."""
+        return entry_id in self._running
+
+    @callback
+    def async_remove(self, entry_id: str) -> None:
+        """Forget the result of a removed device."""
+        if self._results.pop(entry_id, None) is not None:
+            self._store.async_delay_save(lambda: self._results, TUNING_SAVE_DELAY)
+
+    @callback
+    def async_start(
+        self,
+        coordinators: dict[str, BitAxeDataUpdateCoordinator],
+        parameters: TuningParameters,
+    ) -> dict[str, list[str]]:
+        """Start tuning devices in the background, at most max_parallel at once."""
+        semaphore = asyncio.Semaphore(parameters.max_parallel)
+        started: list[str] = []
+        already_running: list[str] = []
+        for entry_id, coordinator in coordinators.items():
+            entry = self.hass.config_entries.async_get_entry(entry_id)
+            assert entry is not None
+            if entry_id in self._running:
+                already_running.append(entry.title)
+                continue
+            # Tied to the entry, so unloading it interrupts the sweep
+            task = entry.async_create_background_task(
+                self.hass,
+                self._async_tune(entry, coordinator, parameters, semaphore),
+                f"bitaxe autotune {entry_id}",
+            )
+            self._running[entry_id] = task
+            task.add_done_callback(
+                lambda _, entry_id=entry_id: self._running.pop(entry_id, None)
+            )
+            started.append(entry.title)
+        return {"started": started, "already_running": already_running}
+
+    async def _async_tune(
+        self,
+        entry: ConfigEntry,
+        coordinator: BitAxeDataUpdateCoordinator,
+        parameters: TuningParameters,
+        semaphore: asyncio.Semaphore,
+    ) -> None:
+        """Sweep one device and apply its best operating point."""
+        async with semaphore:
+            data = coordinator.data
+            if data is None or not coordinator.last_update_success:
+                _LOGGER.warning("Not tuning %s: the device is offline", entry.title)
+                return
+            original = {
+                "frequency": data.get("frequency"),
+                "coreVoltage": data.get("coreVoltage"),
+            }
+            store = await async_get_capability_store(self.hass)
+            capabilities = await store.async_get(
+                coordinator.client, data.get("ASICModel"), data.get("version")
+            )
+            _LOGGER.info(
+                "Tuning %s for %s over %d frequencies",
+                entry.title,
+                parameters.goal,
+                len(capabilities.frequency),
+            )
+
+            points: list[dict[str, Any]] = []
+            try:
+                await self._async_sweep(
+                    coordinator,
+                    parameters,
+                    sorted(capabilities.frequency, key=float),
+                    sorted(capabilities.voltage, key=float),
+                    points,
+                )
+            except BaseException:
+                # Interrupted: leave the device as it was found
+                await self._async_apply(coordinator, original)
+                raise
+
+            stable = [point for point in points if point["status"] == POINT_STABLE]
+            best: dict[str, Any] | None = None
+            if stable:
+                if parameters.goal == GOAL_EFFICIENCY:
+                    best = min(stable, key=lambda point: point["efficiency"])
+                else:
+                    best = max(stable, key=lambda point: point["hashrate"])
+                settings = {
+                    "frequency": option_value(best["frequency"]),
+                    "coreVoltage": option_value(best["voltage"]),
+                }
+            else:
+                settings = original
+            await self._async_apply(coordinator, settings)
+
+        self._results[entry.entry_id] = {
+            "goal": parameters.goal,
+            "finished": dt_util.utcnow().isoformat(),
+            "original": original,
+            "best": best,
+            "points": points,
+        }
+        self._store.async_delay_save(lambda: self._results, TUNING_SAVE_DELAY)
+        _LOGGER.info("Tuned %s: %s", entry.title, best or "no stable point found")
+        self.hass.bus.async_fire(
+            EVENT_AUTOTUNE_FINISHED,
+            {
+                "entry_id": entry.entry_id,
+                "name": entry.title,
+                "goal": parameters.goal,
+                "best": best,
+            },
+        )
+
+    async def _async_sweep(
+        self,
+        coordinator: BitAxeDataUpdateCoordinator,
+        parameters: TuningParameters,
+        frequencies: list[str],
+        voltages: list[str],
+        points: list[dict[str, Any]],
+    ) -> None:
+        """Measure the lowest stable voltage of each frequency, low to high."""
+        for frequency in frequencies:
+            for voltage in voltages:
+                point = await self._async_measure(
+                    coordinator, parameters, frequency, voltage
+                )
+                points.append(point)
+                if point["status"] != POINT_UNSTABLE:
+                    break
+            if point["status"] != POINT_STABLE:
+                return
+
+    async def _async_measure(
+        self,
+        coordinator: BitAxeDataUpdateCoordinator,
+        parameters: TuningParameters,
+        frequency: str,
+        voltage: str,
+    ) -> dict[str, Any]:
+        """Apply an operating point, let it settle and average its readings."""
+        point: dict[str, Any] = {"frequency": frequency, "voltage": voltage}
+        try:
+            await coordinator.async_write(
+                {
+                    "frequency": option_value(frequency),
+                    "coreVoltage": option_value(voltage),
+                }
+            )
+        except BitaxeConnectionError as err:
+            return {**point, "status": POINT_FAILED, "error": str(err)}
+
+        started = time.monotonic()
+        measure_from = started + parameters.settle_time
+        measure_until = measure_from + parameters.measure_time
+        hashrate = power = 0.0
+        expected: float | None = None
+        samples = 0
+        max_temp = max_vr_temp = 0.0
+        while True:
+            await asyncio.sleep(TUNING_SAMPLE_INTERVAL)
+            await coordinator.async_refresh()
+            if not coordinator.last_update_success or coordinator.data is None:
+                return {**point, "status": POINT_FAILED, "error": "device offline"}
+            data = coordinator.data
+            temp = data.get_number("temp") or 0.0
+            vr_temp = data.get_number("vrTemp") or 0.0
+            max_temp = max(max_temp, temp)
+            max_vr_temp = max(max_vr_temp, vr_temp)
+            if temp > parameters.max_temp or vr_temp > parameters.max_vr_temp:
+                return {
+                    **point,
+                    "status": POINT_OVER_LIMIT,
+                    "temp": max_temp,
+                    "vr_temp": max_vr_temp,
+                }
+
+            now = time.monotonic()
+            if now >= measure_from:
+                hashrate += data.get_number("hashRate") or 0.0
+                power += data.get_number("power") or 0.0
+                expected = data.get_number("expectedHashrate") or expected
+                samples += 1
+                if now >= measure_until:
+                    break
+
+        hashrate /= samples
+        power /= samples
+        stable = hashrate > 0 and (
+            expected is None or hashrate >= TUNING_STABLE_HASHRATE_RATIO * expected
+        )
+        return {
+            **point,
+            "status": POINT_STABLE if stable else POINT_UNSTABLE,
+            "hashrate": round(hashrate, 2),
+            "power": round(power, 2),
+            # Hash rate is reported in GH/s
+            "efficiency": round(power / (hashrate / 1000), 2) if hashrate else None,
+            "temp": max_temp,
+            "vr_temp": max_vr_temp,
+        }
+
+    async def _async_apply(
+        self, coordinator: BitAxeDataUpdateCoordinator, settings: dict[str, Any]
+    ) -> None:
+        """Write frequency and core voltage, logging errors instead of raising."""
+        settings = {key: value for key, value in settings.items() if value is not None}
+        if not settings:
+            return
+        try:
+            await coordinator.async_write(settings)
+        except BitaxeConnectionError as err:
+            _LOGGER.error(
+                "Error applying %s to BitAxe %s: %s",
+                settings,
+                coordinator.client.host,
+                err,
+            )
+
+
+async def async_get_tuner(hass: HomeAssistant) -> BitAxeTuner:
+    """Return the tuner, loading its results on first use."""
+    if (task := hass.data.get(DATA_TUNER)) is None:
+        task = hass.data[DATA_TUNER] = hass.async_create_task(
+            BitAxeTuner(hass).async_load()
+        )
+    return await asyncio.shield(task)
+
+
+@callback
+def async_is_tuning(hass: HomeAssistant, entry_id: str) -> bool:
+    """Return True while a device is being tuned, without loading the tuner."""
+    task = hass.data.get(DATA_TUNER)
+    if task is None or not task.done() or task.exception() is not None:
+        return False
+    tuner: BitAxeTuner = task.result()
+    return tuner.async_is_running(entry_id)
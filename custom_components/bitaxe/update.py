@@ -0,0 +1,104 @@
+"""Update platform for the BitAxe integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.update import (
+    UpdateDeviceClass,
+    UpdateEntity,
+    UpdateEntityFeature,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import (
+    DOMAIN,
+    SIGNAL_FIRMWARE_PROGRESS,
+    SIGNAL_FIRMWARE_STAGED,
+    TIER_CONFIG,
+)
+from .entity import BitAxeEntity
+from .firmware import BitAxeFirmwareStore, async_get_firmware_store, async_install_staged
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the BitAxe firmware update entity from a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    store = await async_get_firmware_store(hass)
+
+    async_add_entities([BitAxeUpdate(coordinator, entry, store)])
+
+
+class BitAxeUpdate(BitAxeEntity, UpdateEntity):
+    """The firmware of a BitAxe, offered the firmware last staged for the fleet.
+
+    AxeOS has no release feed, so the latest version is the one the
+    update_firmware service last pushed to any device.
+    """
+
+    _attr_name = "Firmware"
+    _attr_device_class = UpdateDeviceClass.FIRMWARE
+    _attr_entity_category = EntityCategory.CONFIG
+    _attr_supported_features = (
+        UpdateEntityFeature.INSTALL | UpdateEntityFeature.PROGRESS
+    )
+    _refresh_tier = TIER_CONFIG
+
+    def __init__(
+        self, coordinator, entry: ConfigEntry, store: BitAxeFirmwareStore
+    ) -> None:
+        """Initialize the update entity."""
+        super().__init__(coordinator, entry, ("version",))
+        self._store = store
+        self._attr_unique_id = f"{entry.entry_id}_firmware"
+
+    async def async_added_to_hass(self) -> None:
+        """Follow staged firmware and the progress of uploads."""
+        await super().async_added_to_hass()
+        for signal in (
+            SIGNAL_FIRMWARE_STAGED,
+            SIGNAL_FIRMWARE_PROGRESS.format(self._entry.entry_id),
+        ):
+            self.async_on_remove(
+                async_dispatcher_connect(self.hass, signal, self.async_write_ha_state)
+            )
+
+    @property
+    def installed_version(self) -> str | None:
+        """Return the firmware version the device runs."""
+        if self.coordinator.data is None:
+            return None
+        return self.coordinator.data.get("version")
+
+    @property
+    def latest_version(self) -> str | None:
+        """Return the staged firmware version, or the installed one."""
+        return self._store.version or self.installed_version
+
+    @property
+    def in_progress(self) -> bool | int:
+        """Return the percentage of the images uploaded so far.
+
+        True until the first percent went out, as 0 would read as idle.
+        """
+        if (progress := self.coordinator.firmware_progress) is None:
+            return False
+        return progress or True
+
+    async def async_install(
+        self, version: str | None, backup: bool, **kwargs: Any
+    ) -> None:
+        """Flash the staged firmware to the device."""
+        if version is not None and version != self._store.version:
+            raise HomeAssistantError(
+                f"Only the staged firmware {self._store.version} can be installed"
+            )
+        await async_install_staged(self.hass, self._entry.entry_id, self.coordinator)
@@ -0,0 +1,68 @@
+"""Sliding time windows for the BitAxe integration."""
+from __future__ import annotations
+
+from array import array
+
+
+class RingWindow:
+    """Sliding time window over a fixed ring of time buckets.
+
+    Each bucket holds a sum of values and a sum of weights in two flat
+    arrays, so adding a sample never allocates. Buckets that fall out of the
+    window are cleared lazily as time advances.
+    """
+
+    __slots__ = (
+        "_width",
+        "_values",
+        "_weights",
+        "_value_sum",
+        "_weight_sum",
+        "_head",
+    )
+
+    def __init__(self, length: float, buckets: int) -> None:
+        """Initialize an empty window."""
+        self._width = length / buckets
+        self._values = array("d", bytes(8 * buckets))
+        self._weights = array("d", bytes(8 * buckets))
+        self._value_sum = 0.0
+        self._weight_sum = 0.0
+        self._head: int | None = None
+
+    def _advance(self, now: float) -> int:
+        """Expire the buckets that left the window and return the current one."""
+        index = int(now // self._width)
+        size = len(self._values)
+        if self._head is not None and index > self._head:
+            for expired in range(max(self._head + 1, index - size + 1), index + 1):
+                slot = expired % size
+                self._value_sum -= self._values[slot]
+                self._weight_sum -= self._weights[slot]
+                self._values[slot] = self._weights[slot] = 0.0
+            if self._weight_sum <= 0:
+                # Nothing left in the window, drop any accumulated rounding
+                self._value_sum = self._weight_sum = 0.0
+        if self._head is None or index > self._head:
+            self._head = index
+        return index % size
+
+    def add(self, now: float, value: float, weight: float) -> None:
+        """Add a weighted value to the current bucket."""
+        slot = self._advance(now)
+        self._values[slot] += value
+        self._weights[slot] += weight
+        self._value_sum += value
+        self._weight_sum += weight
+
+    def ratio(self, now: float) -> float | None:
+        """Return the sum of values over the sum of weights in the window."""
+        self._advance(now)
+        if self._weight_sum <= 0:
+            return None
+        return self._value_sum / self._weight_sum
+
+    def total(self, now: float) -> float:
+        """Return the sum of values in the window."""
+        self._advance(now)
+        return self._value_sum
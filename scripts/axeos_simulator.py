@@ -0,0 +1,427 @@
+"""Simulate a fleet of AxeOS devices on localhost.
+
+Every virtual miner listens on its own port of 127.0.0.1 and implements the
+parts of the AxeOS API the integration uses:
+
+    GET   /api/system/info
+    GET   /api/system/statistics
+    GET   /api/system/asic
+    GET   /api/ws
+    PATCH /api/system
+    POST  /api/system/restart
+    POST  /api/system/identify
+    POST  /api/system/OTA
+    POST  /api/system/OTAWWW
+
+Like stock AxeOS, /api/ws streams log lines. With `push_fields`, it also
+sends the telemetry as JSON objects, like a firmware with push updates.
+
+Example:
+
+    python scripts/axeos_simulator.py --count 200 --base-port 8100 \\
+        --latency 0.05 --jitter 0.02 --failure-rate 0.01 --model BM1370
+
+Point a config entry at `127.0.0.1:<port>` to use a virtual miner.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import dataclass
+import logging
+import random
+import socket
+import time
+from typing import Any
+
+from aiohttp import web
+
+_LOGGER = logging.getLogger(__name__)
+
+# model: (small cores per ASIC, default frequency MHz, default core voltage mV)
+ASIC_MODELS: dict[str, tuple[int, int, int]] = {
+    "BM1397": (672, 425, 1400),
+    "BM1366": (894, 485, 1200),
+    "BM1368": (1276, 490, 1166),
+    "BM1370": (2040, 525, 1150),
+}
+
+# Fields a PATCH to /api/system may change
+WRITABLE_KEYS = {
+    "frequency",
+    "coreVoltage",
+    "autofanspeed",
+    "fanspeed",
+    "temptarget",
+    "minFanSpeed",
+    "invertscreen",
+    "overclockEnabled",
+    "rotation",
+    "displayTimeout",
+    "hostname",
+}
+
+# On-device history served by /api/system/statistics
+STATISTICS_INTERVAL = 5.0  # seconds between samples
+STATISTICS_LENGTH = 720  # samples kept
+
+
+@dataclass
+class SimulatorProfile:
+    """Network and failure behaviour shared by all virtual miners."""
+
+    latency: float = 0.02
+    jitter: float = 0.01
+    failure_rate: float = 0.0
+    failure_mode: str = "error"
+    restart_delay: float = 5.0
+    push_fields: bool = False
+    log_interval: float = 1.0  # seconds between WebSocket frames
+
+
+class VirtualMiner:
+    """One simulated AxeOS device."""
+
+    def __init__(self, index: int, model: str, profile: SimulatorProfile) -> None:
+        """Initialize the miner."""
+        self.index = index
+        self.model = model
+        self.profile = profile
+        small_cores, frequency, voltage = ASIC_MODELS[model]
+        self._small_cores = small_cores
+        self._booted = time.monotonic()
+        self._offline_until = 0.0
+        self._temp = random.uniform(50, 60)
+        self._best_diff = 0.0
+        self.requests = 0
+        self.identify_count = 0
+        self.patch_count = 0
+        self.version = "v2.9.0-sim"
+        self.www_size = 0
+        # Accept connections but never answer, like a unit that lost power
+        self.unresponsive = False
+        self.settings: dict[str, Any] = {
+            "frequency": frequency,
+            "coreVoltage": voltage,
+            "autofanspeed": 1,
+            "fanspeed": 45,
+            "temptarget": 60,
+            "minFanSpeed": 25,
+            "invertscreen": 0,
+            "overclockEnabled": 0,
+            "rotation": 0,
+            "displayTimeout": -1,
+            "hostname": f"bitaxe-{index:04d}",
+        }
+
+    @property
+    def online(self) -> bool:
+        """Return False while the miner is rebooting."""
+        return time.monotonic() >= self._offline_until
+
+    def system_info(self) -> dict[str, Any]:
+        """Return a system info payload with drifting telemetry."""
+        uptime = time.monotonic() - self._booted
+        expected = self.settings["frequency"] * self._small_cores / 1000
+        hashrate = expected * random.uniform(0.95, 1.03)
+        self._temp = min(max(self._temp + random.uniform(-0.5, 0.5), 40), 75)
+        power = hashrate * 0.0155 * (self.settings["coreVoltage"] / 1150) ** 2
+        shares = int(uptime * 0.2)
+        self._best_diff = max(self._best_diff, random.expovariate(1 / 1e6))
+        return {
+            "power": round(power, 2),
+            "voltage": 5100.0,
+            "current": round(power / 5.1 * 1000, 1),
+            "temp": round(self._temp, 1),
+            "vrTemp": round(self._temp - 8),
+            "hashRate": round(hashrate, 2),
+            "expectedHashrate": round(expected, 2),
+            "bestDiff": f"{self._best_diff * 10:.0f}",
+            "bestSessionDiff": f"{self._best_diff:.0f}",
+            "sharesAccepted": shares,
+            "sharesRejected": shares // 500,
+            "uptimeSeconds": int(uptime),
+            "asicCount": 1,
+            "smallCoreCount": self._small_cores,
+            "ASICModel": self.model,
+            "fanrpm": 3000 + self.settings["fanspeed"] * 30,
+            "freeHeap": 8_000_000,
+            "version": self.version,
+            "idfVersion": "v5.4.1",
+            "boardVersion": "601",
+            "stratumURL": "public-pool.io",
+            "stratumPort": 21496,
+            "stratumUser": "bc1qsimulatedsimulatedsimulatedsimulated.bitaxe",
+            "macAddr": f"02:00:00:00:{self.index >> 8:02X}:{self.index & 0xFF:02X}",
+            "wifiRSSI": random.randint(-75, -50),
+            **self.settings,
+        }
+
+    def restart(self) -> None:
+        """Go offline for the restart delay, then boot with fresh counters."""
+        self._offline_until = time.monotonic() + self.profile.restart_delay
+        self._booted = self._offline_until
+        self._best_diff = 0.0
+
+    async def _async_network(self) -> None:
+        """Apply latency, jitter, reboots and injected failures."""
+        self.requests += 1
+        if self.unresponsive:
+            await asyncio.sleep(3600)
+        if not self.online:
+            raise web.HTTPServiceUnavailable
+        delay = random.gauss(self.profile.latency, self.profile.jitter)
+        await asyncio.sleep(max(delay, 0))
+        if random.random() < self.profile.failure_rate:
+            if self.profile.failure_mode == "timeout":
+                await asyncio.sleep(3600)
+            raise web.HTTPInternalServerError
+
+    async def handle_info(self, request: web.Request) -> web.Response:
+        """Handle GET /api/system/info."""
+        await self._async_network()
+        return web.json_response(self.system_info())
+
+    async def handle_statistics(self, request: web.Request) -> web.Response:
+        """Handle GET /api/system/statistics, the on-device history."""
+        await self._async_network()
+        now_ms = int((time.monotonic() - self._booted) * 1000)
+        step = int(STATISTICS_INTERVAL * 1000)
+        first = max(now_ms - STATISTICS_LENGTH * step, 0) // step * step
+        expected = self.settings["frequency"] * self._small_cores / 1000
+        requested = request.query.get("columns", "hashrate,asicTemp,power")
+        columns = [
+            column
+            for column in requested.split(",")
+            if column in ("hashrate", "asicTemp", "vrTemp", "power")
+        ]
+        statistics = []
+        for timestamp in range(first, now_ms, step):
+            rng = random.Random(timestamp * 7919 + self.index)
+            hashrate = expected * rng.uniform(0.95, 1.03)
+            values = {
+                "hashrate": round(hashrate, 2),
+                "asicTemp": round(55 + rng.uniform(-3, 3), 1),
+                "vrTemp": round(47 + rng.uniform(-3, 3), 1),
+                "power": round(hashrate * 0.0155, 2),
+            }
+            statistics.append([values[column] for column in columns] + [timestamp])
+        return web.json_response(
+            {
+                "currentTimestamp": now_ms,
+                "labels": [*columns, "timestamp"],
+                "statistics": statistics,
+            }
+        )
+
+    async def handle_asic(self, request: web.Request) -> web.Response:
+        """Handle GET /api/system/asic, the ASIC capabilities."""
+        await self._async_network()
+        _, frequency, voltage = ASIC_MODELS[self.model]
+        return web.json_response(
+            {
+                "ASICModel": self.model,
+                "asicCount": 1,
+                "defaultFrequency": frequency,
+                "frequencyOptions": [frequency + step for step in (-100, -50, 0, 25, 50)],
+                "defaultVoltage": voltage,
+                "voltageOptions": [voltage + step for step in (-100, -50, 0, 50, 100)],
+            }
+        )
+
+    async def handle_patch(self, request: web.Request) -> web.Response:
+        """Handle PATCH /api/system."""
+        await self._async_network()
+        self.patch_count += 1
+        payload = await request.json()
+        for key, value in payload.items():
+            if key in WRITABLE_KEYS:
+                self.settings[key] = value
+        return web.Response()
+
+    async def handle_restart(self, request: web.Request) -> web.Response:
+        """Handle POST /api/system/restart."""
+        await self._async_network()
+        asyncio.get_running_loop().call_later(0.1, self.restart)
+        return web.Response(text="System will restart shortly.")
+
+    async def _async_read_image(self, request: web.Request) -> bytes:
+        """Read an uploaded image, streamed since it exceeds the body limit."""
+        await self._async_network()
+        return b"".join([chunk async for chunk in request.content.iter_any()])
+
+    async def handle_ota(self, request: web.Request) -> web.Response:
+        """Handle POST /api/system/OTA: boot the version in the app descriptor."""
+        image = await self._async_read_image(request)
+        if image[:1] != b"\xe9" or image[32:36] != b"\x32\x54\xcd\xab":
+            raise web.HTTPInternalServerError(text="Invalid image")
+        self.version = image[48:80].split(b"\0", 1)[0].decode()
+        asyncio.get_running_loop().call_later(0.1, self.restart)
+        return web.Response(text="Firmware update complete, rebooting now!")
+
+    async def handle_ota_www(self, request: web.Request) -> web.Response:
+        """Handle POST /api/system/OTAWWW."""
+        self.www_size = len(await self._async_read_image(request))
+        return web.Response(text="WWW update complete")
+
+    async def handle_ws(self, request: web.Request) -> web.WebSocketResponse:
+        """Handle GET /api/ws: stream log lines, and fields with push_fields."""
+        await self._async_network()
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        async def _async_stream() -> None:
+            try:
+                while not ws.closed and self.online:
+                    uptime_ms = int((time.monotonic() - self._booted) * 1000)
+                    await ws.send_str(
+                        f"I ({uptime_ms}) asic_result: Nonce difficulty "
+                        f"{random.expovariate(1 / 1e4):.2f} of 4096."
+                    )
+                    if self.profile.push_fields:
+                        info = self.system_info()
+                        await ws.send_json(
+                            {key: info[key] for key in ("power", "temp", "hashRate")}
+                        )
+                    await asyncio.sleep(self.profile.log_interval)
+                await ws.close()
+            except ConnectionResetError:
+                pass
+
+        stream = asyncio.create_task(_async_stream())
+        # Reading answers the client's close frame
+        async for _ in ws:
+            pass
+        stream.cancel()
+        return ws
+
+    async def handle_identify(self, request: web.Request) -> web.Response:
+        """Handle POST /api/system/identify."""
+        await self._async_network()
+        self.identify_count += 1
+        return web.Response()
+
+    def make_app(self) -> web.Application:
+        """Return the aiohttp application of this miner."""
+        app = web.Application()
+        app.router.add_get("/api/system/info", self.handle_info)
+        app.router.add_get("/api/system/statistics", self.handle_statistics)
+        app.router.add_get("/api/system/asic", self.handle_asic)
+        app.router.add_patch("/api/system", self.handle_patch)
+        app.router.add_post("/api/system/restart", self.handle_restart)
+        app.router.add_post("/api/system/identify", self.handle_identify)
+        app.router.add_get("/api/ws", self.handle_ws)
+        app.router.add_post("/api/system/OTA", self.handle_ota)
+        app.router.add_post("/api/system/OTAWWW", self.handle_ota_www)
+        return app
+
+
+class FleetSimulator:
+    """Run many virtual miners, one port each.
+
+    The ports follow base_port, or are any free ones for a base_port of 0.
+    """
+
+    def __init__(
+        self,
+        count: int,
+        base_port: int = 8100,
+        model: str | None = None,
+        profile: SimulatorProfile | None = None,
+        host: str = "127.0.0.1",
+    ) -> None:
+        """Initialize the fleet."""
+        self.host = host
+        self.base_port = base_port
+        self.profile = profile or SimulatorProfile()
+        models = list(ASIC_MODELS)
+        self.miners = [
+            VirtualMiner(index, model or models[index % len(models)], self.profile)
+            for index in range(count)
+        ]
+        self._runners: list[web.AppRunner] = []
+        self._ports: list[int] = []
+
+    def address(self, index: int) -> str:
+        """Return the host:port of a miner, as used in a config entry."""
+        if self._ports:
+            return f"{self.host}:{self._ports[index]}"
+        return f"{self.host}:{self.base_port + index}"
+
+    async def async_start(self) -> None:
+        """Start listening on every miner port."""
+        self._ports.clear()
+        for index, miner in enumerate(self.miners):
+            runner = web.AppRunner(miner.make_app(), access_log=None)
+            await runner.setup()
+            if self.base_port:
+                await web.TCPSite(runner, self.host, self.base_port + index).start()
+            else:
+                sock = socket.socket()
+                sock.bind((self.host, 0))
+                self._ports.append(sock.getsockname()[1])
+                await web.SockSite(runner, sock).start()
+            self._runners.append(runner)
+
+    async def async_stop(self) -> None:
+        """Stop every miner."""
+        for runner in self._runners:
+            await runner.cleanup()
+        self._runners.clear()
+
+
+async def _async_main(args: argparse.Namespace) -> None:
+    """Run the simulator until interrupted."""
+    fleet = FleetSimulator(
+        args.count,
+        args.base_port,
+        args.model,
+        SimulatorProfile(
+            latency=args.latency,
+            jitter=args.jitter,
+            failure_rate=args.failure_rate,
+            failure_mode=args.failure_mode,
+            restart_delay=args.restart_delay,
+        ),
+        args.host,
+    )
+    await fleet.async_start()
+    _LOGGER.info(
+        "Serving %d miners on %s..%s",
+        args.count,
+        fleet.address(0),
+        fleet.address(args.count - 1),
+    )
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await fleet.async_stop()
+
+
+def main() -> None:
+    """Parse arguments and run the simulator."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=10, help="number of miners")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--base-port", type=int, default=8100)
+    parser.add_argument(
+        "--model", choices=sorted(ASIC_MODELS), help="ASIC model (default: mixed)"
+    )
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0.01, help="seconds")
+    parser.add_argument(
+        "--failure-rate", type=float, default=0.0, help="fraction of failed requests"
+    )
+    parser.add_argument("--failure-mode", choices=("error", "timeout"), default="error")
+    parser.add_argument("--restart-delay", type=float, default=5.0, help="seconds")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_async_main(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
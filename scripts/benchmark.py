@@ -0,0 +1,262 @@
+"""Benchmark the BitAxe integration against a simulated fleet.
+
+Starts a real Home Assistant instance with the integration loaded from this
+repository, points one config entry at each virtual miner of
+`axeos_simulator`, and reports per fleet size:
+
+- integration setup time: first start, restart from the startup snapshots
+  and restart without them (optionally with some miners unresponsive)
+- poll throughput in devices per second
+- p50/p99 update latency: from the simulator answering a poll to the
+  hash rate state being written
+- p50/p99/max event loop lag
+- resident memory growth
+
+Example:
+
+    python scripts/benchmark.py --devices 10 100 1000 --duration 120
+
+Requires `homeassistant` to be installed.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+from pathlib import Path
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any
+
+from homeassistant import bootstrap, config_entries, loader
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.setup import async_setup_component
+
+sys.path.insert(0, str(Path(__file__).parent))
+from axeos_simulator import FleetSimulator, SimulatorProfile, VirtualMiner  # noqa: E402
+
+INTEGRATION_DIR = Path(__file__).parent.parent / "custom_components" / "bitaxe"
+LOOP_LAG_INTERVAL = 0.1  # seconds
+
+
+class _TimedMiner(VirtualMiner):
+    """Virtual miner that remembers when it last answered a poll."""
+
+    served_at = 0.0
+
+    async def handle_info(self, request):
+        """Handle GET /api/system/info and record the time."""
+        response = await super().handle_info(request)
+        self.served_at = time.monotonic()
+        return response
+
+
+def _percentile(values: list[float], percent: float) -> float | None:
+    """Return a percentile of a list of values."""
+    if not values:
+        return None
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(percent) - 1]
+
+
+def _rss_mb() -> float:
+    """Return the peak resident set size of this process in MB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _write_config_dir(
+    config_dir: Path, fleet: FleetSimulator, options: dict[str, Any]
+) -> None:
+    """Prepare a Home Assistant config dir with one entry per miner.
+
+    The directory is reused across fleet sizes because the custom_components
+    package stays imported from the first one.
+    """
+    shutil.rmtree(config_dir / ".storage", ignore_errors=True)
+    if not (config_dir / "custom_components").exists():
+        (config_dir / "custom_components").mkdir(parents=True)
+        (config_dir / "custom_components" / "bitaxe").symlink_to(
+            INTEGRATION_DIR.resolve()
+        )
+    (config_dir / "configuration.yaml").write_text("homeassistant:\n  name: bench\n")
+    entries = [
+        {
+            "entry_id": f"bench{index:05d}",
+            "version": 1,
+            "domain": "bitaxe",
+            "title": f"Miner {index}",
+            "data": {"ip_address": fleet.address(index), "device_name": f"Miner {index}"},
+            "options": options,
+            "pref_disable_new_entities": False,
+            "pref_disable_polling": False,
+            "source": "user",
+            "unique_id": fleet.address(index),
+            "disabled_by": None,
+        }
+        for index in range(len(fleet.miners))
+    ]
+    (config_dir / ".storage").mkdir()
+    (config_dir / ".storage" / "core.config_entries").write_text(
+        json.dumps(
+            {
+                "version": 1,
+                "minor_version": 1,
+                "key": "core.config_entries",
+                "data": {"entries": entries},
+            }
+        )
+    )
+
+
+async def _async_start_hass(config_dir: Path) -> tuple[HomeAssistant, float]:
+    """Start a minimal Home Assistant and return it with the integration setup time.
+
+    Only the core integration is loaded, so the measurements are not skewed
+    by the frontend and its dependencies.
+    """
+    hass = HomeAssistant(str(config_dir))
+    loader.async_setup(hass)
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    await bootstrap.async_load_base_functionality(hass)
+    await async_setup_component(hass, "homeassistant", {})
+
+    started = time.perf_counter()
+    if not await async_setup_component(hass, "bitaxe", {}):
+        raise RuntimeError("Setting up the BitAxe integration failed")
+    setup_time = time.perf_counter() - started
+
+    await hass.async_start()
+    await hass.async_block_till_done()
+    return hass, round(setup_time, 3)
+
+
+async def _async_measure(
+    hass: HomeAssistant, fleet: FleetSimulator, duration: float
+) -> dict[str, Any]:
+    """Collect throughput, latency and loop lag for `duration` seconds."""
+    registry = er.async_get(hass)
+    miner_by_entity: dict[str, VirtualMiner] = {}
+    for index, miner in enumerate(fleet.miners):
+        entity_id = registry.async_get_entity_id(
+            "sensor", "bitaxe", f"bench{index:05d}_hashRate"
+        )
+        if entity_id is not None:
+            miner_by_entity[entity_id] = miner
+
+    latencies: list[float] = []
+    lags: list[float] = []
+
+    @callback
+    def _async_state_changed(event: Event) -> None:
+        miner = miner_by_entity.get(event.data["entity_id"])
+        if miner is not None and miner.served_at:
+            latencies.append(time.monotonic() - miner.served_at)
+
+    unsub = hass.bus.async_listen(EVENT_STATE_CHANGED, _async_state_changed)
+    scheduler = hass.data["bitaxe_scheduler"]
+    polls_before = scheduler.polls_total
+    started = time.monotonic()
+    while (elapsed := time.monotonic() - started) < duration:
+        expected = time.monotonic() + LOOP_LAG_INTERVAL
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        lags.append(max(time.monotonic() - expected, 0))
+    unsub()
+
+    return {
+        "polls_per_second": (scheduler.polls_total - polls_before) / elapsed,
+        "latency_p50_ms": _ms(_percentile(latencies, 50)),
+        "latency_p99_ms": _ms(_percentile(latencies, 99)),
+        "loop_lag_p50_ms": _ms(_percentile(lags, 50)),
+        "loop_lag_p99_ms": _ms(_percentile(lags, 99)),
+        "loop_lag_max_ms": _ms(max(lags, default=None)),
+    }
+
+
+def _ms(value: float | None) -> float | None:
+    """Convert seconds to rounded milliseconds."""
+    return None if value is None else round(value * 1000, 1)
+
+
+async def async_run(
+    config_dir: Path,
+    devices: int,
+    duration: float,
+    profile: SimulatorProfile,
+    options: dict[str, Any],
+    offline: float,
+) -> dict[str, Any]:
+    """Benchmark one fleet size."""
+    fleet = FleetSimulator(devices, profile=profile)
+    fleet.miners = [
+        _TimedMiner(index, miner.model, profile) for index, miner in enumerate(fleet.miners)
+    ]
+    await fleet.async_start()
+    result: dict[str, Any] = {"devices": devices}
+    try:
+        _write_config_dir(config_dir, fleet, options)
+        rss_before = _rss_mb()
+
+        hass, result["setup_s"] = await _async_start_hass(config_dir)
+        result.update(await _async_measure(hass, fleet, duration))
+        result["rss_growth_mb"] = round(_rss_mb() - rss_before, 1)
+        await hass.async_stop()
+
+        for miner in fleet.miners[: int(devices * offline)]:
+            miner.unresponsive = True
+
+        # Restart from the snapshots saved on stop, then without them. The
+        # first start also pays for imports, so only restarts compare.
+        hass, result["restart_setup_s"] = await _async_start_hass(config_dir)
+        await hass.async_stop()
+        (config_dir / ".storage" / "bitaxe.snapshots").unlink()
+        hass, result["restart_no_snapshot_setup_s"] = await _async_start_hass(
+            config_dir
+        )
+        await hass.async_stop()
+    finally:
+        await fleet.async_stop()
+    return result
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--duration", type=float, default=120, help="seconds")
+    parser.add_argument("--scan-interval", type=int, default=30, help="seconds")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0.01, help="seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--offline",
+        type=float,
+        default=0.0,
+        help="fraction of miners that stop answering before the restarts",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    profile = SimulatorProfile(
+        latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate
+    )
+    options = {"scan_interval": args.scan_interval}
+    with tempfile.TemporaryDirectory() as tmp:
+        for devices in args.devices:
+            result = asyncio.run(
+                async_run(
+                    Path(tmp), devices, args.duration, profile, options, args.offline
+                )
+            )
+            print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
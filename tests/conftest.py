@@ -0,0 +1,78 @@
+"""Fixtures for the BitAxe tests, run against the AxeOS simulator."""
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from pathlib import Path
+import sys
+from typing import Any
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.setup import async_setup_component
+
+from custom_components.bitaxe.const import DOMAIN
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "scripts"))
+
+from axeos_simulator import FleetSimulator, SimulatorProfile  # noqa: E402
+
+SetupMiners = Callable[..., Awaitable[list[MockConfigEntry]]]
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations: None) -> None:
+    """Load the integration from custom_components."""
+
+
+@pytest.fixture
+async def fleet(socket_enabled: None) -> AsyncGenerator[FleetSimulator, None]:
+    """Run one virtual miner of each ASIC model on free local ports."""
+    simulator = FleetSimulator(
+        4, base_port=0, profile=SimulatorProfile(latency=0, jitter=0)
+    )
+    await simulator.async_start()
+    yield simulator
+    await simulator.async_stop()
+
+
+@pytest.fixture
+def setup_miners(hass: HomeAssistant, fleet: FleetSimulator) -> SetupMiners:
+    """Return a function that sets up an entry per virtual miner."""
+
+    async def _async_setup(
+        count: int | None = None, **options: Any
+    ) -> list[MockConfigEntry]:
+        entries = []
+        for index in range(len(fleet.miners) if count is None else count):
+            entry = MockConfigEntry(
+                domain=DOMAIN,
+                entry_id=f"miner{index}",
+                title=f"Miner {index}",
+                unique_id=fleet.address(index),
+                data={
+                    "ip_address": fleet.address(index),
+                    "device_name": f"Miner {index}",
+                },
+                options=options,
+            )
+            entry.add_to_hass(hass)
+            entries.append(entry)
+        assert await async_setup_component(hass, DOMAIN, {})
+        await hass.async_block_till_done()
+        return entries
+
+    return _async_setup
+
+
+def entity_id_of(
+    hass: HomeAssistant, entry: MockConfigEntry, key: str, platform: str = "sensor"
+) -> str:
+    """Return the entity ID of an entry's entity by the key in its unique ID."""
+    entity_id = er.async_get(hass).async_get_entity_id(
+        platform, DOMAIN, f"{entry.entry_id}_{key}"
+    )
+    assert entity_id is not None
+    return entity_id
@@ -0,0 +1,166 @@
+"""Tests for the ceilings the thermal governor and power budget share."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+from typing import Any
+
+import pytest
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.bitaxe.ceilings import async_get_ceiling_store
+from custom_components.bitaxe.const import (
+    CEILINGS_SAVE_DELAY,
+    DATA_GOVERNORS,
+    DOMAIN,
+    WRITE_COALESCE_WINDOW,
+)
+from custom_components.bitaxe.governor import GOVERNOR
+from custom_components.bitaxe.power_budget import POWER_BUDGET
+
+from .conftest import FleetSimulator, SetupMiners
+
+STORAGE_KEY = f"{DOMAIN}.ceilings"
+
+# Miner 0 is a BM1397 at 425 MHz and 1400 mV that the governor throttled
+USER = {"frequency": 475.0, "coreVoltage": 1400.0}
+RUNNING = {"frequency": 425.0, "coreVoltage": 1400.0}
+
+
+@pytest.fixture
+def saved_ceiling(hass_storage: dict[str, Any]) -> None:
+    """Save Miner 0 as throttled by the governor before a restart."""
+    hass_storage[STORAGE_KEY] = {
+        "version": 1,
+        "minor_version": 1,
+        "key": STORAGE_KEY,
+        "data": {
+            "miner0": {
+                "ceiling": USER,
+                "running": RUNNING,
+                "holds": {GOVERNOR: {"frequency": 425.0}},
+            }
+        },
+    }
+
+
+async def _async_settle(hass: HomeAssistant) -> None:
+    """Wait for the coalesced writes of the controllers."""
+    await hass.async_block_till_done()
+    await asyncio.sleep(WRITE_COALESCE_WINDOW + 0.1)
+    await hass.async_block_till_done()
+
+
+async def test_hold_is_saved(
+    hass: HomeAssistant, hass_storage: dict[str, Any], setup_miners: SetupMiners
+) -> None:
+    """A hold is written to disk, and dropped once the device runs as set."""
+    await setup_miners(1, scan_interval=3600)
+    coordinator = hass.data[DOMAIN]["miner0"]
+    store = await async_get_ceiling_store(hass)
+
+    store.async_hold("miner0", GOVERNOR, coordinator.data, {"frequency": 375})
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=CEILINGS_SAVE_DELAY + 1)
+    )
+    await hass.async_block_till_done()
+    assert hass_storage[STORAGE_KEY]["data"] == {
+        "miner0": {
+            "ceiling": RUNNING,
+            "running": {**RUNNING, "frequency": 375},
+            "holds": {GOVERNOR: {"frequency": 375}},
+        }
+    }
+
+    store.async_hold("miner0", GOVERNOR, coordinator.data, {"frequency": 425})
+    assert store.async_get("miner0") is None
+
+
+@pytest.mark.usefixtures("saved_ceiling")
+async def test_governor_keeps_ceiling_across_restart(
+    hass: HomeAssistant, fleet: FleetSimulator, setup_miners: SetupMiners
+) -> None:
+    """A device throttled before the restart is not taken as set by the user."""
+    fleet.miners[0]._temp = 45
+    await setup_miners(1, scan_interval=3600, thermal_governor=True)
+    await hass.data[DOMAIN]["miner0"].async_refresh()
+    await _async_settle(hass)
+
+    governor = hass.data[DATA_GOVERNORS]["miner0"]
+    assert governor.ceiling == USER["frequency"]
+    # Cool, so the governor climbs back towards the saved ceiling
+    assert RUNNING["frequency"] < fleet.miners[0].settings["frequency"]
+    assert fleet.miners[0].settings["frequency"] <= USER["frequency"]
+
+
+@pytest.mark.usefixtures("saved_ceiling")
+async def test_release_restores_user_settings(
+    hass: HomeAssistant, fleet: FleetSimulator, setup_miners: SetupMiners
+) -> None:
+    """Turning the governor off writes back the frequency the user set."""
+    await setup_miners(1, scan_interval=3600)
+    await _async_settle(hass)
+
+    assert fleet.miners[0].settings["frequency"] == USER["frequency"]
+    store = await async_get_ceiling_store(hass)
+    assert store.async_get("miner0") is None
+
+
+@pytest.mark.usefixtures("saved_ceiling")
+async def test_user_change_becomes_ceiling(
+    hass: HomeAssistant, fleet: FleetSimulator, setup_miners: SetupMiners
+) -> None:
+    """Settings changed on the device itself replace the saved ceiling."""
+    fleet.miners[0].settings["frequency"] = 450
+    fleet.miners[0]._temp = 45
+    await setup_miners(1, scan_interval=3600, thermal_governor=True)
+    await hass.data[DOMAIN]["miner0"].async_refresh()
+    await _async_settle(hass)
+
+    governor = hass.data[DATA_GOVERNORS]["miner0"]
+    assert governor.ceiling == 450
+    assert fleet.miners[0].settings["frequency"] == 450
+    store = await async_get_ceiling_store(hass)
+    assert store.async_get("miner0") is None
+
+
+async def test_controllers_share_ceiling(
+    hass: HomeAssistant, fleet: FleetSimulator, setup_miners: SetupMiners
+) -> None:
+    """Neither controller takes the other's writes for the user's."""
+    await setup_miners(1, scan_interval=3600)
+    coordinator = hass.data[DOMAIN]["miner0"]
+    store = await async_get_ceiling_store(hass)
+
+    budget = {"frequency": 375.0, "coreVoltage": 1300.0}
+    store.async_hold("miner0", POWER_BUDGET, coordinator.data, budget)
+    await coordinator.async_write(budget)
+    await coordinator.async_refresh()
+    store.async_hold("miner0", GOVERNOR, coordinator.data, {"frequency": 325.0})
+    await coordinator.async_write({"frequency": 325})
+    await coordinator.async_refresh()
+
+    ceiling = store.async_observe("miner0", coordinator.data, GOVERNOR)
+    assert ceiling is not None
+    assert ceiling.user == RUNNING
+    assert ceiling.limit == budget
+    ceiling = store.async_observe("miner0", coordinator.data, POWER_BUDGET)
+    assert ceiling is not None
+    assert ceiling.user == RUNNING
+    assert ceiling.limit == {**RUNNING, "frequency": 325.0}
+
+    # The governor lets go: back to what the budget allows
+    store.async_release("miner0", GOVERNOR, coordinator)
+    await _async_settle(hass)
+    assert fleet.miners[0].settings["frequency"] == budget["frequency"]
+
+    # The budget lets go: back to what the user set
+    await coordinator.async_refresh()
+    store.async_release("miner0", POWER_BUDGET, coordinator)
+    await _async_settle(hass)
+    assert fleet.miners[0].settings["frequency"] == RUNNING["frequency"]
+    assert fleet.miners[0].settings["coreVoltage"] == RUNNING["coreVoltage"]
+    assert store.async_get("miner0") is None
@@ -0,0 +1,145 @@
+"""Tests for the BitAxe coordinator's writes."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.bitaxe.api import BitaxeConnectionError
+from custom_components.bitaxe.const import DOMAIN
+from custom_components.bitaxe.coordinator import BitAxeDataUpdateCoordinator
+from custom_components.bitaxe.instrumentation import FAILURE_INVALID_PAYLOAD
+
+from .conftest import FleetSimulator, SetupMiners
+
+
+async def test_writes_are_coalesced(
+    hass: HomeAssistant, fleet: FleetSimulator, setup_miners: SetupMiners
+) -> None:
+    """Writes within the coalescing window go out as one PATCH."""
+    await setup_miners(1, scan_interval=3600)
+    coordinator: BitAxeDataUpdateCoordinator = hass.data[DOMAIN]["miner0"]
+    miner = fleet.miners[0]
+
+    writes = asyncio.gather(
+        coordinator.async_write({"fanspeed": 70}),
+        coordinator.async_write({"autofanspeed": 0}),
+        coordinator.async_write({"fanspeed": 80}),
+    )
+    await asyncio.sleep(0)
+    # Shown before the device confirmed them
+    assert coordinator.data.get("fanspeed") == 80
+    assert coordinator.data.get("autofanspeed") == 0
+    assert miner.patch_count == 0
+
+    await writes
+    await hass.async_block_till_done()
+    assert miner.patch_count == 1
+    assert miner.settings["fanspeed"] == 80
+    assert miner.settings["autofanspeed"] == 0
+    assert coordinator.data.get("fanspeed") == 80
+
+
+async def test_failed_write_is_rolled_back(
+    hass: HomeAssistant, fleet: FleetSimulator, setup_miners: SetupMiners
+) -> None:
+    """Settings the device did not take are shown as they were."""
+    await setup_miners(1, scan_interval=3600)
+    coordinator: BitAxeDataUpdateCoordinator = hass.data[DOMAIN]["miner0"]
+    fanspeed = coordinator.data.get("fanspeed")
+    temptarget = coordinator.data.get("temptarget")
+
+    fleet.profile.failure_rate = 1.0
+    writes = asyncio.gather(
+        coordinator.async_write({"fanspeed": 90}),
+        coordinator.async_write({"temptarget": 55}),
+        return_exceptions=True,
+    )
+    await asyncio.sleep(0)
+    assert coordinator.data.get("fanspeed") == 90
+
+    results = await writes
+    assert all(isinstance(result, BitaxeConnectionError) for result in results)
+    assert coordinator.data.get("fanspeed") == fanspeed
+    assert coordinator.data.get("temptarget") == temptarget
+    assert fleet.miners[0].settings["fanspeed"] == fanspeed
+
+
+async def test_poll_keeps_pending_settings(
+    hass: HomeAssistant, fleet: FleetSimulator, setup_miners: SetupMiners
+) -> None:
+    """A poll answered before the PATCH does not undo the shown settings."""
+    await setup_miners(1, scan_interval=3600)
+    coordinator: BitAxeDataUpdateCoordinator = hass.data[DOMAIN]["miner0"]
+
+    write = hass.async_create_task(coordinator.async_write({"fanspeed": 75}))
+    await asyncio.sleep(0)
+    await coordinator.async_refresh()
+    assert fleet.miners[0].settings["fanspeed"] != 75
+    assert coordinator.data.get("fanspeed") == 75
+    await write
+
+
+@pytest.mark.parametrize("echo", [True, False])
+async def test_confirming_refresh(
+    hass: HomeAssistant,
+    fleet: FleetSimulator,
+    setup_miners: SetupMiners,
+    monkeypatch: pytest.MonkeyPatch,
+    echo: bool,
+) -> None:
+    """The device is only polled after a write if it did not echo the values."""
+    await setup_miners(1, scan_interval=3600)
+    coordinator: BitAxeDataUpdateCoordinator = hass.data[DOMAIN]["miner0"]
+    patch = coordinator.client.async_patch_system
+
+    async def _async_patch_system(payload):
+        await patch(payload)
+        return payload if echo else None
+
+    monkeypatch.setattr(coordinator.client, "async_patch_system", _async_patch_system)
+    before = fleet.miners[0].requests
+    await coordinator.async_write({"fanspeed": 65})
+    await asyncio.sleep(0.1)
+    await hass.async_block_till_done()
+    # One request is the PATCH itself
+    polls = fleet.miners[0].requests - before - 1
+    assert polls == (0 if echo else 1)
+
+
+async def test_payload_that_is_not_an_object(
+    hass: HomeAssistant,
+    fleet: FleetSimulator,
+    setup_miners: SetupMiners,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A payload that is valid JSON but not an object counts as a failed poll."""
+    await setup_miners(1, scan_interval=3600)
+    coordinator: BitAxeDataUpdateCoordinator = hass.data[DOMAIN]["miner0"]
+    monkeypatch.setattr(type(fleet.miners[0]), "system_info", lambda miner: None)
+
+    await coordinator.async_refresh()
+    assert not coordinator.last_update_success
+    assert coordinator.health.consecutive_failures == 1
+    assert coordinator.client.stats.failures[FAILURE_INVALID_PAYLOAD] == 1
+
+
+async def test_replay_waits_for_refresh_in_flight(
+    hass: HomeAssistant, fleet: FleetSimulator, setup_miners: SetupMiners
+) -> None:
+    """A poll answered during a replay does not overwrite the replayed data."""
+    await setup_miners(1, scan_interval=3600)
+    coordinator: BitAxeDataUpdateCoordinator = hass.data[DOMAIN]["miner0"]
+    replayed = coordinator.data.replace({"temp": 99.0})
+
+    fleet.profile.latency = 0.2
+    refresh = hass.async_create_task(coordinator.async_refresh())
+    await asyncio.sleep(0.05)
+    async with coordinator.async_replay():
+        assert refresh.done()
+        coordinator.async_set_updated_data(replayed)
+        await coordinator.async_refresh()
+        assert coordinator.data.get("temp") == 99.0
+    assert not coordinator.replaying
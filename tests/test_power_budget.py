@@ -0,0 +1,122 @@
+"""Tests for the fleet power budget."""
+from __future__ import annotations
+
+import asyncio
+from itertools import product
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.bitaxe.const import (
+    DATA_POWER_BUDGET,
+    DOMAIN,
+    WRITE_COALESCE_WINDOW,
+)
+from custom_components.bitaxe.power_budget import _allocate, _Rung, _upper_hull
+
+from .conftest import FleetSimulator, SetupMiners
+
+
+def _rung(power: float, hashrate: float) -> _Rung:
+    """Return a rung whose frequency is its power, to tell rungs apart."""
+    return _Rung({"frequency": power}, power, hashrate)
+
+
+def test_upper_hull() -> None:
+    """Dominated points and points below the concave hull are dropped."""
+    rungs = [
+        _rung(10, 500),
+        _rung(14, 800),
+        # Below the line from 14 W to 20 W
+        _rung(17, 880),
+        _rung(20, 1000),
+        # More power for less hash rate
+        _rung(22, 950),
+        # Same power, less hash rate
+        _rung(20, 900),
+    ]
+    hull = _upper_hull(rungs)
+    assert [rung.power for rung in hull] == [10, 14, 20]
+    gains = [
+        (high.hashrate - low.hashrate) / (high.power - low.power)
+        for low, high in zip(hull, hull[1:])
+    ]
+    assert gains == sorted(gains, reverse=True)
+
+
+def test_allocate_is_optimal() -> None:
+    """The greedy allocation is within one step of an exhaustive search."""
+    ladders = {
+        "efficient": _upper_hull([_rung(8, 500), _rung(10, 600), _rung(13, 700)]),
+        "hungry": _upper_hull([_rung(10, 400), _rung(15, 600), _rung(22, 750)]),
+        "flat": _upper_hull([_rung(9, 300), _rung(11, 360)]),
+    }
+    largest_step = max(
+        high.hashrate - low.hashrate
+        for ladder in ladders.values()
+        for low, high in zip(ladder, ladder[1:])
+    )
+    for budget in range(27, 50):
+        allocation = _allocate(ladders, budget)
+        power = sum(ladders[key][index].power for key, index in allocation.items())
+        hashrate = sum(
+            ladders[key][index].hashrate for key, index in allocation.items()
+        )
+        assert power <= budget
+        best = max(
+            sum(rung.hashrate for rung in choice)
+            for choice in product(*ladders.values())
+            if sum(rung.power for rung in choice) <= budget
+        )
+        # On concave ladders the greedy result is the fractional optimum
+        # without the step that did not fit
+        assert best - largest_step <= hashrate <= best
+
+
+def test_allocate_starts_everyone_at_the_bottom() -> None:
+    """Over budget, every device runs on its lowest rung."""
+    ladders = {
+        "a": [_rung(10, 500), _rung(12, 600)],
+        "b": [_rung(10, 500), _rung(12, 600)],
+    }
+    assert _allocate(ladders, 5) == {"a": 0, "b": 0}
+    assert _allocate(ladders, 22) == {"a": 1, "b": 0}
+    assert _allocate(ladders, 100) == {"a": 1, "b": 1}
+
+
+# The fleet sensors batch their updates on a timer
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+async def test_budget_caps_fleet_power(
+    hass: HomeAssistant, fleet: FleetSimulator, setup_miners: SetupMiners
+) -> None:
+    """The fleet is throttled into the budget and released when it is off."""
+    MockConfigEntry(
+        domain=DOMAIN,
+        entry_id="fleet",
+        title="BitAxe Fleet",
+        unique_id="fleet",
+        data={"fleet": True},
+        options={"power_budget": 34},
+    ).add_to_hass(hass)
+    await setup_miners(scan_interval=3600)
+    coordinators = hass.data[DOMAIN]
+    frequencies = [miner.settings["frequency"] for miner in fleet.miners]
+
+    controller = hass.data[DATA_POWER_BUDGET]
+    await controller._async_run()
+    assert controller.last_run["planned_power"] <= 34
+    assert controller.last_run["changes"] > 0
+    throttled = [miner.settings["frequency"] for miner in fleet.miners]
+    assert all(new <= old for new, old in zip(throttled, frequencies))
+    assert throttled != frequencies
+
+    for coordinator in coordinators.values():
+        await coordinator.async_refresh()
+    entry = hass.config_entries.async_get_entry("fleet")
+    hass.config_entries.async_update_entry(entry, options={"power_budget": 0})
+    await hass.async_block_till_done()
+    await asyncio.sleep(WRITE_COALESCE_WINDOW + 0.1)
+    assert DATA_POWER_BUDGET not in hass.data
+    assert [miner.settings["frequency"] for miner in fleet.miners] == frequencies
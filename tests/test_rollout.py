@@ -0,0 +1,165 @@
+"""Tests for rolling operations out over the fleet in waves."""
+from __future__ import annotations
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.bitaxe import rollout
+
+from custom_components.bitaxe.const import DOMAIN, SERVICE_APPLY_SETTINGS
+from custom_components.bitaxe.coordinator import BitAxeDataUpdateCoordinator
+from custom_components.bitaxe.rollout import (
+    RolloutError,
+    RolloutParameters,
+    async_rollout,
+    async_wait_for_reboot,
+)
+
+from .conftest import FleetSimulator, SetupMiners
+
+
+def _statuses(result: dict) -> dict[str, tuple[str, int | None]]:
+    """Return the status and wave per device name."""
+    return {
+        device["name"]: (device["status"], device.get("wave"))
+        for device in result["devices"]
+    }
+
+
+async def _async_rollout(
+    hass: HomeAssistant, failing: set[str], halt_on_failure: bool
+) -> tuple[dict, list[str]]:
+    """Roll out a step that fails on some devices, one device per wave."""
+    called: list[str] = []
+
+    async def _async_step(
+        entry_id: str, coordinator: BitAxeDataUpdateCoordinator
+    ) -> str:
+        assert hass.data[DOMAIN][entry_id] is coordinator
+        called.append(entry_id)
+        if entry_id in failing:
+            raise HomeAssistantError("Step failed")
+        return coordinator.client.host
+
+    result = await async_rollout(
+        hass,
+        dict(hass.data[DOMAIN]),
+        _async_step,
+        RolloutParameters(
+            wave_size=25, max_parallel=1, wave_delay=0, halt_on_failure=halt_on_failure
+        ),
+        "Test",
+    )
+    return result, called
+
+
+async def test_rollout_halts_after_failed_wave(
+    hass: HomeAssistant, setup_miners: SetupMiners
+) -> None:
+    """Waves after one with a failed device are skipped."""
+    await setup_miners(scan_interval=3600)
+    result, called = await _async_rollout(hass, {"miner1"}, True)
+
+    assert called == ["miner0", "miner1"]
+    assert result["waves"] == 4
+    assert result["halted_after_wave"] == 2
+    assert result["summary"] == {"ok": 1, "failed": 1, "skipped": 2}
+    assert _statuses(result) == {
+        "Miner 0": ("ok", 1),
+        "Miner 1": ("failed", 2),
+        "Miner 2": ("skipped", 3),
+        "Miner 3": ("skipped", 4),
+    }
+
+
+async def test_rollout_continues_without_halting(
+    hass: HomeAssistant, fleet: FleetSimulator, setup_miners: SetupMiners
+) -> None:
+    """Without halt_on_failure every wave runs."""
+    await setup_miners(scan_interval=3600)
+    result, called = await _async_rollout(hass, {"miner1"}, False)
+
+    assert called == ["miner0", "miner1", "miner2", "miner3"]
+    assert result["halted_after_wave"] is None
+    assert result["summary"] == {"ok": 3, "failed": 1}
+    assert result["devices"][0]["result"] == fleet.address(0)
+
+
+async def test_rollout_leaves_offline_devices_out(
+    hass: HomeAssistant, fleet: FleetSimulator, setup_miners: SetupMiners
+) -> None:
+    """Devices that are offline when the rollout starts are not touched."""
+    await setup_miners(scan_interval=3600)
+    fleet.profile.restart_delay = 3600
+    fleet.miners[2].restart()
+    await hass.data[DOMAIN]["miner2"].async_refresh()
+
+    result, called = await _async_rollout(hass, set(), True)
+    assert "miner2" not in called
+    assert result["waves"] == 3
+    assert _statuses(result)["Miner 2"] == ("offline", None)
+
+
+async def test_apply_settings_halts_on_unsupported_setting(
+    hass: HomeAssistant, fleet: FleetSimulator, setup_miners: SetupMiners
+) -> None:
+    """A setting the first wave rejects never reaches the rest of the fleet."""
+    await setup_miners(scan_interval=3600)
+    frequencies = [miner.settings["frequency"] for miner in fleet.miners]
+
+    # Only the BM1370 of Miner 3 offers 575 MHz
+    result = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_APPLY_SETTINGS,
+        {"settings": {"frequency": 575}, "wave_size": 25},
+        blocking=True,
+        return_response=True,
+    )
+    assert result["halted_after_wave"] == 1
+    assert result["summary"] == {"failed": 1, "skipped": 3}
+    assert [miner.settings["frequency"] for miner in fleet.miners] == frequencies
+
+    result = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_APPLY_SETTINGS,
+        {"settings": {"fanspeed": 70, "autofanspeed": False}, "wave_size": 50},
+        blocking=True,
+        return_response=True,
+    )
+    assert result["summary"] == {"ok": 4}
+    assert all(miner.settings["fanspeed"] == 70 for miner in fleet.miners)
+    assert all(miner.patch_count == 1 for miner in fleet.miners)
+
+
+@pytest.mark.parametrize("reports_uptime", [True, False])
+async def test_unknown_uptime_is_no_reboot(
+    hass: HomeAssistant,
+    fleet: FleetSimulator,
+    setup_miners: SetupMiners,
+    monkeypatch: pytest.MonkeyPatch,
+    reports_uptime: bool,
+) -> None:
+    """A device that answers right away did not reboot, whatever it reports."""
+    await setup_miners(1, scan_interval=3600)
+    coordinator: BitAxeDataUpdateCoordinator = hass.data[DOMAIN]["miner0"]
+    miner = fleet.miners[0]
+    miner._booted -= 60
+    monkeypatch.setattr(rollout, "ROLLOUT_POLL_INTERVAL", 0.05)
+    if not reports_uptime:
+        miner_class = type(miner)
+        system_info = miner_class.system_info
+        monkeypatch.setattr(
+            miner_class,
+            "system_info",
+            lambda miner: {**system_info(miner), "uptimeSeconds": None},
+        )
+
+    with pytest.raises(RolloutError):
+        await async_wait_for_reboot(coordinator, None, 0.3)
+
+    fleet.profile.restart_delay = 0.2
+    miner.restart()
+    await async_wait_for_reboot(coordinator, None, 2)
+    assert coordinator.last_update_success
@@ -0,0 +1,116 @@
+"""Tests for the fleet polling scheduler."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.bitaxe.const import DATA_SCHEDULER, DOMAIN
+from custom_components.bitaxe.scheduler import BitAxeFleetScheduler
+
+from .conftest import FleetSimulator, SetupMiners
+
+
+async def test_polls_every_device_each_interval(
+    hass: HomeAssistant, fleet: FleetSimulator, setup_miners: SetupMiners
+) -> None:
+    """Each device is polled about once per scan interval, out of phase."""
+    await setup_miners(scan_interval=0.5)
+    before = [miner.requests for miner in fleet.miners]
+    await asyncio.sleep(2.1)
+    polls = [miner.requests - count for miner, count in zip(fleet.miners, before)]
+    assert all(3 <= count <= 5 for count in polls)
+
+    scheduler: BitAxeFleetScheduler = hass.data[DATA_SCHEDULER]
+    assert scheduler.device_count == 4
+    due = sorted(due for due, _, _ in scheduler._heap)
+    assert len(set(due)) == len(due)
+
+
+async def test_concurrency_is_capped(
+    hass: HomeAssistant,
+    fleet: FleetSimulator,
+    setup_miners: SetupMiners,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """No more polls than max_concurrent run at the same time."""
+    await setup_miners(scan_interval=3600)
+    coordinators = hass.data[DOMAIN]
+    default: BitAxeFleetScheduler = hass.data[DATA_SCHEDULER]
+    for entry_id in coordinators:
+        default.async_remove(entry_id)
+
+    fleet.profile.latency = 0.1
+    inflight = peak = 0
+    miner_class = type(fleet.miners[0])
+    network = miner_class._async_network
+
+    async def _async_network(miner) -> None:
+        nonlocal inflight, peak
+        inflight += 1
+        peak = max(peak, inflight)
+        try:
+            await network(miner)
+        finally:
+            inflight -= 1
+
+    monkeypatch.setattr(miner_class, "_async_network", _async_network)
+    scheduler = BitAxeFleetScheduler(hass, max_concurrent=2)
+    for entry_id, coordinator in coordinators.items():
+        scheduler.async_add(entry_id, coordinator)
+        scheduler.async_reschedule(entry_id)
+    scheduler.async_start()
+    await asyncio.sleep(0.5)
+    scheduler.async_stop()
+
+    assert scheduler.polls_total == 4
+    assert peak == 2
+
+
+async def test_reschedule_polls_now(
+    hass: HomeAssistant, fleet: FleetSimulator, setup_miners: SetupMiners
+) -> None:
+    """A rescheduled device is polled right away, and only once."""
+    await setup_miners(scan_interval=3600)
+    await asyncio.sleep(0.1)
+    miner = fleet.miners[1]
+    before = miner.requests
+
+    scheduler: BitAxeFleetScheduler = hass.data[DATA_SCHEDULER]
+    scheduler.async_reschedule("miner1")
+    scheduler.async_reschedule("miner1")
+    await asyncio.sleep(0.2)
+    assert miner.requests == before + 1
+
+
+async def test_removed_device_is_not_polled(
+    hass: HomeAssistant, fleet: FleetSimulator, setup_miners: SetupMiners
+) -> None:
+    """Removing a device drops the poll already on the heap."""
+    await setup_miners(scan_interval=0.3)
+    scheduler: BitAxeFleetScheduler = hass.data[DATA_SCHEDULER]
+    scheduler.async_remove("miner2")
+    before = fleet.miners[2].requests
+    await asyncio.sleep(0.8)
+    assert fleet.miners[2].requests == before
+    assert scheduler.device_count == 3
+
+
+async def test_resume_skips_unloaded_entry(
+    hass: HomeAssistant, fleet: FleetSimulator, setup_miners: SetupMiners
+) -> None:
+    """Polling only resumes for a coordinator that is still loaded."""
+    entries = await setup_miners(scan_interval=3600)
+    scheduler: BitAxeFleetScheduler = hass.data[DATA_SCHEDULER]
+    coordinator = hass.data[DOMAIN]["miner0"]
+
+    scheduler.async_remove("miner0")
+    scheduler.async_resume("miner0", coordinator)
+    assert scheduler.device_count == 4
+
+    scheduler.async_remove("miner0")
+    assert await hass.config_entries.async_unload(entries[0].entry_id)
+    scheduler.async_resume("miner0", coordinator)
+    assert scheduler.device_count == 3
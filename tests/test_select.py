@@ -0,0 +1,47 @@
+"""Tests for the BitAxe selects."""
+from __future__ import annotations
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.bitaxe.api import BitaxeClient, BitaxeConnectionError
+from custom_components.bitaxe.const import DOMAIN
+
+from .conftest import FleetSimulator, SetupMiners, entity_id_of
+
+
+async def test_options_are_fetched_again_after_a_failure(
+    hass: HomeAssistant,
+    fleet: FleetSimulator,
+    setup_miners: SetupMiners,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Capabilities the device did not answer with are asked for again."""
+    get_asic_info = BitaxeClient.async_get_asic_info
+    calls: list[str] = []
+
+    async def _async_get_asic_info(client: BitaxeClient):
+        calls.append(client.host)
+        if len(calls) == 1:
+            raise BitaxeConnectionError("Connection reset")
+        return await get_asic_info(client)
+
+    monkeypatch.setattr(BitaxeClient, "async_get_asic_info", _async_get_asic_info)
+    (entry,) = await setup_miners(1, scan_interval=3600)
+    await hass.async_block_till_done()
+    entity_id = entity_id_of(hass, entry, "frequency", "select")
+    assert len(calls) == 1
+    fallback = hass.states.get(entity_id).attributes["options"]
+
+    await hass.data[DOMAIN]["miner0"].async_refresh()
+    await hass.async_block_till_done()
+    assert len(calls) == 2
+    options = hass.states.get(entity_id).attributes["options"]
+    assert options != fallback
+    assert str(fleet.miners[0].settings["frequency"]) in options
+
+    # Cached from now on
+    await hass.data[DOMAIN]["miner0"].async_refresh()
+    await hass.async_block_till_done()
+    assert len(calls) == 2
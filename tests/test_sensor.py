@@ -0,0 +1,109 @@
+"""Tests for the BitAxe sensors."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from pytest_homeassistant_custom_component.common import async_capture_events
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.bitaxe.const import DOMAIN, EVENT_REBOOT
+
+from .conftest import FleetSimulator, SetupMiners, entity_id_of
+
+
+@pytest.fixture
+def temps(fleet: FleetSimulator, monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """Make the miners report the last temperature in the returned list."""
+    reported = [55.0]
+    miner_class = type(fleet.miners[0])
+    system_info = miner_class.system_info
+
+    def _system_info(miner):
+        return {**system_info(miner), "temp": reported[-1]}
+
+    monkeypatch.setattr(miner_class, "system_info", _system_info)
+    return reported
+
+
+async def _async_poll(hass: HomeAssistant, temps: list[float], temp: float) -> None:
+    """Report a temperature and poll it."""
+    temps.append(temp)
+    await hass.data[DOMAIN]["miner0"].async_refresh()
+    await hass.async_block_till_done()
+
+
+async def test_deadband_filters_small_changes(
+    hass: HomeAssistant, setup_miners: SetupMiners, temps: list[float]
+) -> None:
+    """A reading is only published once it moves past the deadband."""
+    [entry] = await setup_miners(1, scan_interval=3600)
+    entity_id = entity_id_of(hass, entry, "temp")
+    assert hass.states.get(entity_id).state == "55.0"
+
+    for temp in (55.4, 54.6, 55.5):
+        await _async_poll(hass, temps, temp)
+        assert hass.states.get(entity_id).state == "55.0"
+    await _async_poll(hass, temps, 55.6)
+    assert hass.states.get(entity_id).state == "55.6"
+    await _async_poll(hass, temps, 55.2)
+    assert hass.states.get(entity_id).state == "55.6"
+
+
+async def test_deadband_option(
+    hass: HomeAssistant, setup_miners: SetupMiners, temps: list[float]
+) -> None:
+    """A deadband of 0 publishes every change."""
+    [entry] = await setup_miners(1, scan_interval=3600, deadband_temp=0)
+    entity_id = entity_id_of(hass, entry, "temp")
+    await _async_poll(hass, temps, 55.1)
+    assert hass.states.get(entity_id).state == "55.1"
+
+
+async def test_max_age_republishes(
+    hass: HomeAssistant, setup_miners: SetupMiners, temps: list[float]
+) -> None:
+    """A reading within the deadband is published once the state is too old."""
+    [entry] = await setup_miners(1, scan_interval=3600, max_age=0.2)
+    entity_id = entity_id_of(hass, entry, "temp")
+    await _async_poll(hass, temps, 55.3)
+    assert hass.states.get(entity_id).state == "55.0"
+    await asyncio.sleep(0.3)
+    await _async_poll(hass, temps, 55.4)
+    assert hass.states.get(entity_id).state == "55.4"
+
+
+async def test_reboot_is_detected(
+    hass: HomeAssistant, fleet: FleetSimulator, setup_miners: SetupMiners
+) -> None:
+    """Uptime going back fires one reboot event and moves the last boot."""
+    [entry] = await setup_miners(1, scan_interval=3600)
+    coordinator = hass.data[DOMAIN]["miner0"]
+    entity_id = entity_id_of(hass, entry, "last_boot")
+    events = async_capture_events(hass, EVENT_REBOOT)
+    boot = hass.states.get(entity_id).state
+
+    for _ in range(3):
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+    assert not events
+    assert hass.states.get(entity_id).state == boot
+
+    # Booted ten minutes ago: uptime going up is no reboot, only a late boot
+    fleet.profile.restart_delay = 0.2
+    fleet.miners[0]._booted -= 600
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert not events
+    boot = hass.states.get(entity_id).state
+
+    fleet.miners[0].restart()
+    await asyncio.sleep(0.3)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert len(events) == 1
+    assert events[0].data["entry_id"] == entry.entry_id
+    assert events[0].data["host"] == fleet.address(0)
+    assert hass.states.get(entity_id).state != boot
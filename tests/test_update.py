@@ -0,0 +1,70 @@
+"""Tests for the BitAxe firmware update entity."""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant, callback
+
+from custom_components.bitaxe import rollout
+from custom_components.bitaxe.const import DOMAIN, SERVICE_UPDATE_FIRMWARE
+
+from .conftest import FleetSimulator, SetupMiners
+
+
+def _firmware_image(version: str, size: int) -> bytes:
+    """Return an ESP32 image with an app descriptor holding `version`."""
+    header = bytearray(b"\xe9" + bytes(31))
+    header += (0xABCD5432).to_bytes(4, "little") + bytes(12)
+    header += version.encode().ljust(32, b"\0") + b"esp-miner".ljust(32, b"\0")
+    return bytes(header) + os.urandom(size - len(header))
+
+
+async def test_upload_progress(
+    hass: HomeAssistant,
+    fleet: FleetSimulator,
+    setup_miners: SetupMiners,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """The entity is in progress from the start of the upload until the reboot."""
+    await setup_miners(1, scan_interval=3600)
+    monkeypatch.setattr(rollout, "ROLLOUT_POLL_INTERVAL", 0.05)
+    fleet.profile.restart_delay = 0.2
+    # Uptime is whole seconds, and a fresh miner's 0 s would pass for a reboot
+    fleet.miners[0]._booted -= 60
+    image = tmp_path / "esp-miner.bin"
+    image.write_bytes(_firmware_image("v9.9.9", 1_000_000))
+    hass.config.allowlist_external_dirs = {str(tmp_path)}
+    (entity_id,) = hass.states.async_entity_ids("update")
+    progress: list[bool | int | None] = []
+
+    @callback
+    def _async_state_changed(event: Event) -> None:
+        if event.data["entity_id"] == entity_id and event.data["new_state"]:
+            progress.append(event.data["new_state"].attributes.get("in_progress"))
+
+    hass.bus.async_listen(EVENT_STATE_CHANGED, _async_state_changed)
+    result = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_UPDATE_FIRMWARE,
+        {"file": str(image), "timeout": 10},
+        blocking=True,
+        return_response=True,
+    )
+    await hass.async_block_till_done()
+    assert result["summary"] == {"ok": 1}
+    assert fleet.miners[0].version == "v9.9.9"
+
+    # Staging the image is written first, then the upload starts at 0 %
+    started = progress.index(True)
+    assert not any(progress[:started])
+    percentages = progress[started + 1 : -1]
+    assert percentages == sorted(percentages)
+    assert 0 not in percentages
+    assert percentages[-1] == 100
+    assert progress[-1] is False
+    assert hass.states.get(entity_id).attributes["installed_version"] == "v9.9.9"